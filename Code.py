@@ -1,995 +1,4621 @@
-import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
-import random
-import json
-import base64
-from io import BytesIO
-import hashlib
-import sqlite3
-from dataclasses import dataclass
-from typing import Optional, List, Dict
-import time
-
-# Configuration de la page
-st.set_page_config(
-    page_title="École Ivoirienne - Gestion Scolaire",
-    page_icon="🏫",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# ============================================
-# STYLE CSS - Charte graphique
-# ============================================
-
-st.markdown("""
-<style>
-    :root {
-        --primary-100: #d4eaf7;
-        --primary-200: #b6ccd8;
-        --primary-300: #3b3c3d;
-        --accent-100: #71c4ef;
-        --accent-200: #00668c;
-        --text-100: #1d1c1c;
-        --text-200: #313d44;
-        --background-100: #fffefb;
-        --background-200: #f5f4f1;
-        --background-300: #cccbc8;
-    }
-    
-    .main {
-        background-color: var(--background-100);
-    }
-    
-    .stApp {
-        background-color: var(--background-100);
-    }
-    
-    h1, h2, h3, h4 {
-        color: var(--primary-300) !important;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    
-    .css-1d391kg {
-        background-color: var(--background-100);
-    }
-    
-    .stButton > button {
-        background-color: var(--accent-100);
-        color: white;
-        border: none;
-        padding: 0.5rem 2rem;
-        border-radius: 4px;
-        font-weight: 600;
-    }
-    
-    .stButton > button:hover {
-        background-color: var(--accent-200);
-        color: white;
-    }
-    
-    .card {
-        background-color: var(--background-200);
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 5px solid var(--accent-100);
-        margin-bottom: 1rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    .sidebar .sidebar-content {
-        background-color: var(--background-200);
-    }
-    
-    .header-container {
-        background: linear-gradient(135deg, var(--accent-100), var(--accent-200));
-        padding: 2rem;
-        border-radius: 10px;
-        color: white;
-        margin-bottom: 2rem;
-    }
-    
-    .success-message {
-        background-color: #d4edda;
-        color: #155724;
-        padding: 1rem;
-        border-radius: 5px;
-        border: 1px solid #c3e6cb;
-        margin: 1rem 0;
-    }
-    
-    .warning-message {
-        background-color: #fff3cd;
-        color: #856404;
-        padding: 1rem;
-        border-radius: 5px;
-        border: 1px solid #ffeaa7;
-        margin: 1rem 0;
-    }
-    
-    .info-message {
-        background-color: var(--primary-100);
-        color: var(--primary-300);
-        padding: 1rem;
-        border-radius: 5px;
-        border: 1px solid var(--primary-200);
-        margin: 1rem 0;
-    }
-    
-    .stat-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        text-align: center;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        border-top: 4px solid var(--accent-100);
-    }
-    
-    .subject-badge {
-        display: inline-block;
-        padding: 0.25rem 0.75rem;
-        background-color: var(--accent-100);
-        color: white;
-        border-radius: 15px;
-        font-size: 0.85rem;
-        margin: 0.25rem;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# ============================================
-# CLASSES ET DONNÉES SIMULÉES
-# ============================================
-
-@dataclass
-class User:
-    username: str
-    password_hash: str
-    role: str  # 'parent', 'enseignant', 'admin'
-    nom: str
-    prenom: str
-    email: str
-    telephone: str
-    
-@dataclass
-class Eleve:
-    id: int
-    nom: str
-    prenom: str
-    classe: str  # '6ème A', 'Terminale D', etc.
-    date_naissance: str
-    parent_id: str
-    
-@dataclass
-class Note:
-    id: int
-    eleve_id: int
-    matiere: str
-    note: float
-    coefficient: int
-    type_note: str  # 'Devoir', 'Composition', 'Oral'
-    date: str
-    enseignant: str
-    
-@dataclass
-class Activite:
-    id: int
-    titre: str
-    description: str
-    type_activite: str  # 'Sortie', 'Culturelle', 'Sportive', 'Pédagogique'
-    date: str
-    heure: str
-    lieu: str
-    organisateur: str
-    classes_concernées: List[str]
-
-class SchoolManagementSystem:
-    def __init__(self):
-        self.users = {}
-        self.eleves = []
-        self.notes = []
-        self.activites = []
-        self.emplois_du_temps = {}
-        self.init_demo_data()
-        
-    def init_demo_data(self):
-        # Données de démonstration pour une école ivoirienne
-        ivoirien_noms = ['Kouamé', 'Koné', 'Yao', 'Touré', 'Diaby', 
-                        'Cissé', 'Bamba', 'Koffi', 'Soro', 'Doumbia']
-        ivoirien_prenoms = ['Aya', 'Moussa', 'Fatou', 'Jean', 'Marie',
-                           'Paul', 'Aminata', 'Mohamed', 'Rokia', 'Sékou']
-        
-        # Classes typiques ivoiriennes
-        classes = [
-            '6ème A', '6ème B',
-            '5ème A', '5ème B',
-            '4ème A', '4ème B',
-            '3ème A', '3ème B',
-            'Seconde A', 'Seconde C',
-            'Première A', 'Première D',
-            'Terminale A', 'Terminale D'
-        ]
-        
-        # Matières selon le système ivoirien
-        self.matieres = {
-            '6ème-5ème': ['Mathématiques', 'Français', 'Anglais', 'Histoire-Géo', 'SVT', 'EPS'],
-            '4ème-3ème': ['Mathématiques', 'Français', 'Anglais', 'Histoire-Géo', 'SVT', 'Physique-Chimie', 'EPS'],
-            'Lycée': ['Mathématiques', 'Philosophie', 'Français', 'Anglais', 'Histoire-Géo', 
-                     'SVT', 'Physique-Chimie', 'EPS', 'Spécialité']
-        }
-        
-        # Création d'élèves
-        for i in range(1, 31):
-            nom = random.choice(ivoirien_noms)
-            prenom = random.choice(ivoirien_prenoms)
-            classe = random.choice(classes)
-            eleve = Eleve(
-                id=i,
-                nom=nom,
-                prenom=prenom,
-                classe=classe,
-                date_naissance=f"{random.randint(2004, 2012)}-{random.randint(1,12):02d}-{random.randint(1,28):02d}",
-                parent_id=f"parent_{i%5+1}"
-            )
-            self.eleves.append(eleve)
-            
-            # Création de notes pour chaque élève
-            matieres_eleve = self.get_matieres_by_classe(classe)
-            for matiere in matieres_eleve:
-                for _ in range(3):  # 3 notes par matière
-                    note = Note(
-                        id=len(self.notes)+1,
-                        eleve_id=i,
-                        matiere=matiere,
-                        note=random.uniform(8, 19),
-                        coefficient=random.choice([1, 2, 3]),
-                        type_note=random.choice(['Devoir', 'Composition', 'Oral']),
-                        date=f"2024-{random.randint(1,6):02d}-{random.randint(1,28):02d}",
-                        enseignant=f"Prof. {random.choice(['Koné', 'Traoré', 'Yao', 'Cissé'])}"
-                    )
-                    self.notes.append(note)
-        
-        # Création d'activités
-        activites_ecole = [
-            ("Sortie au Musée des Civilisations", "Visite culturelle", "Culturelle", "2024-04-15", "09:00", "Musée, Plateau"),
-            ("Tournoi de football inter-classes", "Compétition sportive", "Sportive", "2024-04-20", "14:00", "Stade municipal"),
-            ("Journée portes ouvertes", "Présentation des filières", "Pédagogique", "2024-05-10", "08:30", "École"),
-            ("Séminaire d'orientation", "Orientation après le BAC", "Pédagogique", "2024-05-25", "10:00", "Salle polyvalente"),
-            ("Fête de fin d'année", "Spectacle et remise des prix", "Culturelle", "2024-06-30", "16:00", "Cour de l'école")
-        ]
-        
-        for i, (titre, desc, type_a, date, heure, lieu) in enumerate(activites_ecole):
-            activite = Activite(
-                id=i+1,
-                titre=titre,
-                description=desc,
-                type_activite=type_a,
-                date=date,
-                heure=heure,
-                lieu=lieu,
-                organisateur="Direction de l'école",
-                classes_concernées=random.sample(classes, 5)
-            )
-            self.activites.append(activite)
-        
-        # Création d'utilisateurs de démonstration
-        demo_users = [
-            User("parent1", self.hash_password("pass123"), "parent", "Kouamé", "Aminata", "parent1@example.ci", "07 12 34 56 78"),
-            User("prof1", self.hash_password("prof123"), "enseignant", "Yao", "Koffi", "prof1@ecole.ci", "05 23 45 67 89"),
-            User("admin", self.hash_password("admin123"), "admin", "Admin", "System", "admin@ecole.ci", "01 23 45 67 89"),
-        ]
-        
-        for user in demo_users:
-            self.users[user.username] = user
-    
-    def hash_password(self, password):
-        return hashlib.sha256(password.encode()).hexdigest()
-    
-    def get_matieres_by_classe(self, classe):
-        if "6ème" in classe or "5ème" in classe:
-            return self.matieres['6ème-5ème']
-        elif "4ème" in classe or "3ème" in classe:
-            return self.matieres['4ème-3ème']
-        else:
-            return self.matieres['Lycée']
-    
-    def get_eleves_by_parent(self, parent_id):
-        return [e for e in self.eleves if e.parent_id == parent_id]
-    
-    def get_notes_by_eleve(self, eleve_id):
-        return [n for n in self.notes if n.eleve_id == eleve_id]
-    
-    def get_moyenne_by_eleve(self, eleve_id):
-        notes_eleve = self.get_notes_by_eleve(eleve_id)
-        if not notes_eleve:
-            return 0
-        
-        total_pondere = sum(n.note * n.coefficient for n in notes_eleve)
-        total_coeff = sum(n.coefficient for n in notes_eleve)
-        
-        return round(total_pondere / total_coeff, 2) if total_coeff > 0 else 0
-    
-    def get_moyenne_by_matiere(self, eleve_id, matiere):
-        notes_matiere = [n for n in self.notes if n.eleve_id == eleve_id and n.matiere == matiere]
-        if not notes_matiere:
-            return 0
-        
-        total_pondere = sum(n.note * n.coefficient for n in notes_matiere)
-        total_coeff = sum(n.coefficient for n in notes_matiere)
-        
-        return round(total_pondere / total_coeff, 2) if total_coeff > 0 else 0
-
-# ============================================
-# INITIALISATION DE L'APPLICATION
-# ============================================
-
-if 'system' not in st.session_state:
-    st.session_state.system = SchoolManagementSystem()
-    st.session_state.logged_in = False
-    st.session_state.current_user = None
-    st.session_state.selected_eleve = None
-
-system = st.session_state.system
-
-# ============================================
-# FONCTIONS UTILITAIRES
-# ============================================
-
-def display_header():
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        st.markdown(f"""
-        <div class="header-container">
-            <h1>🏫 École Excellence Ivoirienne</h1>
-            <h3>De la 6ème à la Terminale - Système de Gestion Scolaire</h3>
-            <p>Plateforme officielle de suivi scolaire - Abidjan, Côte d'Ivoire</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        if st.session_state.logged_in:
-            user = st.session_state.current_user
-            st.info(f"👤 Connecté en tant que: {user.prenom} {user.nom}")
-            if st.button("Déconnexion"):
-                st.session_state.logged_in = False
-                st.session_state.current_user = None
-                st.rerun()
-
-def login_form():
-    st.markdown("""
-    <div style='text-align: center; padding: 2rem;'>
-        <h2>🔐 Connexion à la plateforme</h2>
-        <p>Accédez aux informations scolaires de vos enfants</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        with st.container():
-            username = st.text_input("Nom d'utilisateur")
-            password = st.text_input("Mot de passe", type="password")
-            
-            if st.button("Se connecter", type="primary", use_container_width=True):
-                if username in system.users:
-                    user = system.users[username]
-                    if user.password_hash == system.hash_password(password):
-                        st.session_state.logged_in = True
-                        st.session_state.current_user = user
-                        st.success(f"Connexion réussie ! Bienvenue {user.prenom} {user.nom}")
-                        time.sleep(1)
-                        st.rerun()
-                    else:
-                        st.error("Mot de passe incorrect")
-                else:
-                    st.error("Utilisateur non trouvé")
-            
-            st.markdown("---")
-            st.markdown("""
-            <div class='info-message'>
-                <h4>🔑 Identifiants de démonstration</h4>
-                <p><strong>Parent :</strong> parent1 / pass123</p>
-                <p><strong>Enseignant :</strong> prof1 / prof123</p>
-                <p><strong>Administrateur :</strong> admin / admin123</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-def parent_dashboard():
-    user = st.session_state.current_user
-    
-    # Titre du tableau de bord
-    st.markdown(f"""
-    <div style='margin-bottom: 2rem;'>
-        <h2>👨‍👩‍👧‍👦 Tableau de bord Parent - {user.prenom} {user.nom}</h2>
-        <p>Suivez la scolarité de vos enfants</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Récupérer les élèves associés au parent
-    eleves_parent = system.get_eleves_by_parent(user.username)
-    
-    if not eleves_parent:
-        st.warning("Aucun élève n'est associé à votre compte.")
-        return
-    
-    # Sélection de l'élève à afficher
-    eleve_options = {f"{e.prenom} {e.nom} - {e.classe}": e for e in eleves_parent}
-    selected_eleve_name = st.selectbox(
-        "Sélectionnez un élève :",
-        list(eleve_options.keys())
-    )
-    
-    selected_eleve = eleve_options[selected_eleve_name]
-    st.session_state.selected_eleve = selected_eleve
-    
-    # Statistiques rapides
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        notes_eleve = system.get_notes_by_eleve(selected_eleve.id)
-        moyenne = system.get_moyenne_by_eleve(selected_eleve.id)
-        st.markdown(f"""
-        <div class='stat-card'>
-            <h3>{moyenne}/20</h3>
-            <p>Moyenne générale</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class='stat-card'>
-            <h3>{len(notes_eleve)}</h3>
-            <p>Notes enregistrées</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class='stat-card'>
-            <h3>{selected_eleve.classe}</h3>
-            <p>Classe</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        # Calcul de la position (simulation)
-        position = random.randint(1, 35)
-        st.markdown(f"""
-        <div class='stat-card'>
-            <h3>{position}e/{position+20}</h3>
-            <p>Rang dans la classe</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    # Onglets pour les différentes fonctionnalités
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Notes et résultats", "📅 Emploi du temps", "📢 Activités scolaires", "📋 Informations"])
-    
-    with tab1:
-        display_notes_tab(selected_eleve)
-    
-    with tab2:
-        display_emploi_du_temps(selected_eleve)
-    
-    with tab3:
-        display_activites_scolaires()
-    
-    with tab4:
-        display_informations_eleve(selected_eleve)
-
-def display_notes_tab(eleve):
-    st.markdown(f"### 📊 Notes de {eleve.prenom} {eleve.nom} - {eleve.classe}")
-    
-    # Graphique des moyennes par matière
-    matieres = system.get_matieres_by_classe(eleve.classe)
-    moyennes_matieres = []
-    
-    for matiere in matieres:
-        moyenne = system.get_moyenne_by_matiere(eleve.id, matiere)
-        moyennes_matieres.append({
-            'matiere': matiere,
-            'moyenne': moyenne
-        })
-    
-    df_moyennes = pd.DataFrame(moyennes_matieres)
-    
-    if not df_moyennes.empty:
-        fig = px.bar(df_moyennes, x='matiere', y='moyenne',
-                    title=f'Moyennes par matière - {eleve.classe}',
-                    color='moyenne',
-                    color_continuous_scale='Blues',
-                    range_y=[0, 20])
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Détail des notes
-    st.markdown("### Détail des notes")
-    notes_eleve = system.get_notes_by_eleve(eleve.id)
-    
-    if notes_eleve:
-        notes_data = []
-        for note in notes_eleve:
-            notes_data.append({
-                'Matière': note.matiere,
-                'Note': note.note,
-                'Coefficient': note.coefficient,
-                'Type': note.type_note,
-                'Date': note.date,
-                'Enseignant': note.enseignant
-            })
-        
-        df_notes = pd.DataFrame(notes_data)
-        df_notes = df_notes.sort_values('Date', ascending=False)
-        
-        # Grouper par matière
-        for matiere in df_notes['Matière'].unique():
-            with st.expander(f"📚 {matiere}"):
-                df_matiere = df_notes[df_notes['Matière'] == matiere]
-                st.dataframe(df_matiere, use_container_width=True)
-                
-                # Calcul moyenne de la matière
-                if not df_matiere.empty:
-                    moyenne_matiere = system.get_moyenne_by_matiere(eleve.id, matiere)
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric(f"Moyenne {matiere}", f"{moyenne_matiere}/20")
-                    with col2:
-                        appreciation = "Excellent" if moyenne_matiere >= 16 else \
-                                     "Très bien" if moyenne_matiere >= 14 else \
-                                     "Bien" if moyenne_matiere >= 12 else \
-                                     "Assez bien" if moyenne_matiere >= 10 else \
-                                     "Passable" if moyenne_matiere >= 8 else "Insuffisant"
-                        st.metric("Appréciation", appreciation)
-        
-        # Téléchargement du bulletin (simulé)
-        st.markdown("---")
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("📄 Générer le bulletin PDF", use_container_width=True):
-                st.success("Bulletin généré avec succès ! (Fonctionnalité de démonstration)")
-        with col2:
-            if st.button("📊 Voir l'évolution", use_container_width=True):
-                st.info("Fonctionnalité d'évolution temporelle en développement")
-    else:
-        st.info(f"Aucune note disponible pour {eleve.prenom} {eleve.nom}")
-
-def display_emploi_du_temps(eleve):
-    st.markdown(f"### 📅 Emploi du temps - {eleve.classe}")
-    
-    # Emploi du temps simulé pour une école ivoirienne
-    jours = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi"]
-    creneaux = ["8h-10h", "10h-12h", "Pause", "14h-16h", "16h-18h"]
-    
-    # Matières selon la classe
-    matieres = system.get_matieres_by_classe(eleve.classe)
-    
-    # Génération d'un emploi du temps aléatoire mais cohérent
-    emploi_data = []
-    for jour in jours:
-        if jour == "Samedi":  # Demi-journée le samedi
-            jour_creneaux = creneaux[:2]
-        else:
-            jour_creneaux = creneaux
-        
-        for creneau in jour_creneaux:
-            if creneau != "Pause":
-                if "6ème" in eleve.classe or "5ème" in eleve.classe:
-                    matiere = random.choice(matieres)
-                    salle = f"Salle {random.randint(1, 20)}"
-                    prof = f"Prof. {random.choice(['Koné', 'Traoré', 'Yao'])}"
-                elif "4ème" in eleve.classe or "3ème" in eleve.classe:
-                    matiere = random.choice(matieres)
-                    salle = f"Labo {random.choice(['A', 'B', 'C'])}" if matiere in ['SVT', 'Physique-Chimie'] else f"Salle {random.randint(20, 30)}"
-                    prof = f"Prof. {random.choice(['Cissé', 'Bamba', 'Diaby'])}"
-                else:  # Lycée
-                    matiere = random.choice(matieres)
-                    salle = f"Amphi {random.randint(1, 3)}" if matiere == "Philosophie" else f"Salle {random.randint(30, 40)}"
-                    prof = f"Prof. {random.choice(['Yao', 'Touré', 'Kouamé'])}"
-                
-                emploi_data.append({
-                    'Jour': jour,
-                    'Créneau': creneau,
-                    'Matière': matiere,
-                    'Enseignant': prof,
-                    'Salle': salle
-                })
-    
-    df_emploi = pd.DataFrame(emploi_data)
-    
-    # Affichage sous forme de tableau
-    st.dataframe(
-        df_emploi,
-        column_config={
-            "Jour": st.column_config.TextColumn("Jour"),
-            "Créneau": st.column_config.TextColumn("Horaire"),
-            "Matière": st.column_config.TextColumn("Matière"),
-            "Enseignant": st.column_config.TextColumn("Professeur"),
-            "Salle": st.column_config.TextColumn("Salle")
-        },
-        hide_index=True,
-        use_container_width=True
-    )
-    
-    # Légende
-    st.markdown("""
-    <div class='info-message'>
-        <p><strong>Note :</strong> L'emploi du temps est actualisé chaque semaine. 
-        Les modifications sont notifiées par SMS aux parents.</p>
-    </div>
-    """, unsafe_allow_html=True)
-
-def display_activites_scolaires():
-    st.markdown("### 📢 Activités et Événements de l'École")
-    
-    # Filtrer les activités à venir
-    activites_a_venir = [a for a in system.activites if a.date >= "2024-04-01"]
-    
-    if not activites_a_venir:
-        st.info("Aucune activité à venir pour le moment.")
-        return
-    
-    for activite in activites_a_venir:
-        with st.container():
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.markdown(f"""
-                <div class='card'>
-                    <h4>{activite.titre}</h4>
-                    <p><strong>📅 Date :</strong> {activite.date} à {activite.heure}</p>
-                    <p><strong>📍 Lieu :</strong> {activite.lieu}</p>
-                    <p><strong>📋 Description :</strong> {activite.description}</p>
-                    <p><strong>👥 Classes concernées :</strong> {', '.join(activite.classes_concernées[:3])}...</p>
-                    <span class='subject-badge'>{activite.type_activite}</span>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                if st.button("S'inscrire", key=f"inscrire_{activite.id}"):
-                    st.success(f"Inscription enregistrée pour {activite.titre}")
-
-def display_informations_eleve(eleve):
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"""
-        <div class='card'>
-            <h4>👤 Informations personnelles</h4>
-            <p><strong>Nom complet :</strong> {eleve.prenom} {eleve.nom}</p>
-            <p><strong>Classe :</strong> {eleve.classe}</p>
-            <p><strong>Date de naissance :</strong> {eleve.date_naissance}</p>
-            <p><strong>Année scolaire :</strong> 2023-2024</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class='card'>
-            <h4>📚 Matières étudiées</h4>
-            <div style='margin-top: 1rem;'>
-        """, unsafe_allow_html=True)
-        
-        matieres = system.get_matieres_by_classe(eleve.classe)
-        for matiere in matieres:
-            st.markdown(f'<span class="subject-badge">{matiere}</span>', unsafe_allow_html=True)
-        
-        st.markdown("</div></div>", unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class='card'>
-            <h4>🏫 Informations administratives</h4>
-            <p><strong>Établissement :</strong> École Excellence Ivoirienne</p>
-            <p><strong>Adresse :</strong> Rue des Écoles, Cocody, Abidjan</p>
-            <p><strong>Téléphone :</strong> 27 22 40 00 00</p>
-            <p><strong>Email :</strong> contact@excellence-ecole.ci</p>
-            <p><strong>Directeur :</strong> Dr. Paul Yao</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class='card'>
-            <h4>📞 Contacts d'urgence</h4>
-            <p><strong>Infirmerie scolaire :</strong> 27 22 40 00 01</p>
-            <p><strong>Vie scolaire :</strong> 27 22 40 00 02</p>
-            <p><strong>Conseiller d'orientation :</strong> 27 22 40 00 03</p>
-            <p><strong>Urgences :</strong> 111 ou 185</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-def teacher_dashboard():
-    st.markdown("""
-    <div style='margin-bottom: 2rem;'>
-        <h2>👨‍🏫 Tableau de bord Enseignant</h2>
-        <p>Gestion des notes et suivi des élèves</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    tab1, tab2, tab3 = st.tabs(["📝 Saisie des notes", "👥 Gestion des classes", "📊 Statistiques"])
-    
-    with tab1:
-        st.markdown("### Saisie des notes")
-        
-        # Sélection de la classe
-        classes = sorted(list(set([e.classe for e in system.eleves])))
-        selected_classe = st.selectbox("Sélectionnez une classe :", classes)
-        
-        # Sélection de la matière
-        matieres = system.get_matieres_by_classe(selected_classe)
-        selected_matiere = st.selectbox("Sélectionnez une matière :", matieres)
-        
-        # Liste des élèves de la classe
-        eleves_classe = [e for e in system.eleves if e.classe == selected_classe]
-        
-        if eleves_classe:
-            st.markdown(f"### Élèves de {selected_classe} - {selected_matiere}")
-            
-            with st.form("saisie_notes"):
-                notes_data = []
-                for eleve in eleves_classe[:10]:  # Limité à 10 pour la démo
-                    col1, col2, col3 = st.columns([3, 2, 1])
-                    with col1:
-                        st.write(f"{eleve.prenom} {eleve.nom}")
-                    with col2:
-                        note = st.number_input(
-                            f"Note {eleve.prenom}",
-                            min_value=0.0,
-                            max_value=20.0,
-                            value=10.0,
-                            step=0.25,
-                            key=f"note_{eleve.id}"
-                        )
-                    with col3:
-                        coeff = st.selectbox(
-                            "Coeff",
-                            [1, 2, 3],
-                            key=f"coeff_{eleve.id}"
-                        )
-                    
-                    notes_data.append({
-                        'eleve': eleve,
-                        'note': note,
-                        'coeff': coeff
-                    })
-                
-                submitted = st.form_submit_button("💾 Enregistrer les notes")
-                if submitted:
-                    st.success("Notes enregistrées avec succès !")
-                    # Ici, normalement, on ajouterait les notes au système
-        else:
-            st.info("Aucun élève dans cette classe.")
-    
-    with tab2:
-        st.markdown("### Gestion des classes")
-        
-        # Affichage des classes
-        for classe in classes:
-            with st.expander(f"🎓 {classe}"):
-                eleves_classe = [e for e in system.eleves if e.classe == classe]
-                df_eleves = pd.DataFrame([{
-                    'Nom': f"{e.prenom} {e.nom}",
-                    'Date naissance': e.date_naissance
-                } for e in eleves_classe])
-                
-                st.dataframe(df_eleves, use_container_width=True)
-                st.metric("Effectif", len(eleves_classe))
-    
-    with tab3:
-        st.markdown("### Statistiques par classe")
-        
-        selected_stats_classe = st.selectbox("Classe pour statistiques :", classes)
-        
-        if selected_stats_classe:
-            eleves_classe = [e for e in system.eleves if e.classe == selected_stats_classe]
-            moyennes = []
-            
-            for eleve in eleves_classe:
-                moyenne = system.get_moyenne_by_eleve(eleve.id)
-                moyennes.append(moyenne)
-            
-            if moyennes:
-                df_stats = pd.DataFrame({'Moyennes': moyennes})
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Moyenne de la classe", f"{sum(moyennes)/len(moyennes):.2f}/20")
-                    st.metric("Meilleure moyenne", f"{max(moyennes):.2f}/20")
-                    st.metric("Moyenne la plus basse", f"{min(moyennes):.2f}/20")
-                
-                with col2:
-                    fig = px.histogram(df_stats, x='Moyennes', nbins=10,
-                                     title=f"Distribution des moyennes - {selected_stats_classe}")
-                    st.plotly_chart(fig, use_container_width=True)
-
-def admin_dashboard():
-    st.markdown("""
-    <div style='margin-bottom: 2rem;'>
-        <h2>⚙️ Tableau de bord Administrateur</h2>
-        <p>Gestion complète du système scolaire</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    tab1, tab2, tab3, tab4 = st.tabs(["👥 Utilisateurs", "🏫 Élèves", "📈 Statistiques", "⚙️ Configuration"])
-    
-    with tab1:
-        st.markdown("### Gestion des utilisateurs")
-        
-        # Statistiques
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            parents_count = len([u for u in system.users.values() if u.role == 'parent'])
-            st.metric("Parents", parents_count)
-        with col2:
-            teachers_count = len([u for u in system.users.values() if u.role == 'enseignant'])
-            st.metric("Enseignants", teachers_count)
-        with col3:
-            st.metric("Élèves", len(system.eleves))
-        
-        # Liste des utilisateurs
-        users_data = []
-        for username, user in system.users.items():
-            users_data.append({
-                'Username': username,
-                'Nom': f"{user.prenom} {user.nom}",
-                'Rôle': user.role,
-                'Email': user.email,
-                'Téléphone': user.telephone
-            })
-        
-        df_users = pd.DataFrame(users_data)
-        st.dataframe(df_users, use_container_width=True)
-        
-        # Ajout d'utilisateur (démonstration)
-        st.markdown("### Ajouter un utilisateur")
-        with st.form("add_user"):
-            col1, col2 = st.columns(2)
-            with col1:
-                new_username = st.text_input("Nom d'utilisateur")
-                new_password = st.text_input("Mot de passe", type="password")
-                new_role = st.selectbox("Rôle", ["parent", "enseignant", "admin"])
-            with col2:
-                new_nom = st.text_input("Nom")
-                new_prenom = st.text_input("Prénom")
-                new_email = st.text_input("Email")
-            
-            if st.form_submit_button("➕ Ajouter l'utilisateur"):
-                st.success("Utilisateur ajouté avec succès ! (démonstration)")
-    
-    with tab2:
-        st.markdown("### Gestion des élèves")
-        
-        # Filtres
-        col1, col2 = st.columns(2)
-        with col1:
-            filter_classe = st.multiselect("Filtrer par classe", 
-                                         sorted(list(set([e.classe for e in system.eleves]))))
-        with col2:
-            search_name = st.text_input("Rechercher par nom")
-        
-        # Affichage des élèves
-        eleves_filtres = system.eleves
-        if filter_classe:
-            eleves_filtres = [e for e in eleves_filtres if e.classe in filter_classe]
-        if search_name:
-            eleves_filtres = [e for e in eleves_filtres if search_name.lower() in f"{e.nom} {e.prenom}".lower()]
-        
-        if eleves_filtres:
-            eleves_data = []
-            for eleve in eleves_filtres[:50]:  # Limité à 50 pour la démo
-                moyenne = system.get_moyenne_by_eleve(eleve.id)
-                eleves_data.append({
-                    'ID': eleve.id,
-                    'Nom': f"{eleve.prenom} {eleve.nom}",
-                    'Classe': eleve.classe,
-                    'Date naissance': eleve.date_naissance,
-                    'Moyenne': moyenne
-                })
-            
-            df_eleves = pd.DataFrame(eleves_data)
-            st.dataframe(
-                df_eleves,
-                column_config={
-                    "Moyenne": st.column_config.ProgressColumn(
-                        "Moyenne",
-                        help="Moyenne générale de l'élève",
-                        format="%.2f",
-                        min_value=0,
-                        max_value=20,
-                    ),
-                },
-                use_container_width=True
-            )
-        else:
-            st.info("Aucun élève trouvé avec ces filtres.")
-    
-    with tab3:
-        st.markdown("### Statistiques générales")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            total_eleves = len(system.eleves)
-            st.metric("Total élèves", total_eleves)
-        
-        with col2:
-            total_notes = len(system.notes)
-            st.metric("Total notes", total_notes)
-        
-        with col3:
-            total_activites = len(system.activites)
-            st.metric("Activités", total_activites)
-        
-        with col4:
-            # Calcul de la moyenne générale de l'école
-            moyennes = [system.get_moyenne_by_eleve(e.id) for e in system.eleves]
-            moyenne_ecole = sum(moyennes) / len(moyennes) if moyennes else 0
-            st.metric("Moyenne école", f"{moyenne_ecole:.2f}/20")
-        
-        # Graphique de répartition par classe
-        st.markdown("### Répartition par classe")
-        classes_count = {}
-        for eleve in system.eleves:
-            classes_count[eleve.classe] = classes_count.get(eleve.classe, 0) + 1
-        
-        df_classes = pd.DataFrame(list(classes_count.items()), columns=['Classe', 'Effectif'])
-        df_classes = df_classes.sort_values('Effectif', ascending=False)
-        
-        fig = px.bar(df_classes, x='Classe', y='Effectif',
-                    title="Effectif par classe",
-                    color='Effectif',
-                    color_continuous_scale='Blues')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with tab4:
-        st.markdown("### Configuration du système")
-        
-        st.info("Cette section permet de configurer les paramètres généraux de l'application.")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### Paramètres généraux")
-            annee_scolaire = st.text_input("Année scolaire", "2023-2024")
-            nom_ecole = st.text_input("Nom de l'école", "École Excellence Ivoirienne")
-            ville = st.text_input("Ville", "Abidjan")
-            
-            st.markdown("#### Notifications")
-            notif_email = st.checkbox("Activer notifications email", True)
-            notif_sms = st.checkbox("Activer notifications SMS", True)
-        
-        with col2:
-            st.markdown("#### Paramètres académiques")
-            date_rentree = st.date_input("Date de rentrée", datetime(2024, 9, 2))
-            date_vacances = st.date_input("Début des vacances", datetime(2024, 12, 21))
-            
-            st.markdown("#### Sécurité")
-            session_timeout = st.slider("Timeout session (minutes)", 15, 120, 30)
-            force_complex_password = st.checkbox("Forcer mots de passe complexes", True)
-        
-        if st.button("💾 Sauvegarder la configuration", use_container_width=True):
-            st.success("Configuration sauvegardée avec succès !")
-
-# ============================================
-# APPLICATION PRINCIPALE
-# ============================================
-
-def main():
-    display_header()
-    
-    if not st.session_state.logged_in:
-        login_form()
-    else:
-        user = st.session_state.current_user
-        
-        # Navigation selon le rôle
-        if user.role == 'parent':
-            parent_dashboard()
-        elif user.role == 'enseignant':
-            teacher_dashboard()
-        elif user.role == 'admin':
-            admin_dashboard()
-        else:
-            st.error("Rôle utilisateur non reconnu")
-
-if __name__ == "__main__":
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+import plotly.express as px
+from datetime import datetime, date, timedelta, time as dtime
+import random
+import json
+import mmap
+import base64
+from io import BytesIO, StringIO, TextIOWrapper
+import csv
+import hashlib
+import hmac
+import secrets
+import math
+import sqlite3
+from dataclasses import dataclass, replace
+from typing import Optional, List, Dict
+from collections import Counter, defaultdict, deque, OrderedDict
+import bisect
+import heapq
+import re
+import unicodedata
+import time
+import cProfile
+import pstats
+import threading
+import gc
+import os
+import asyncio
+import smtplib
+from email.message import EmailMessage
+import sys
+import queue
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from operator import attrgetter
+import tempfile
+
+from bulletins import appreciation, construire_bulletin, generer_bulletins_zip, nom_fichier_bulletin
+
+# Nombre d'élèves par page dans le formulaire de saisie des notes
+TAILLE_PAGE_SAISIE = 25
+
+ANNEE_SCOLAIRE = "2023-2024"
+NOM_ETABLISSEMENT = "École Excellence Ivoirienne"
+
+# Import de fichiers : lignes validées et écrites par blocs, erreurs détaillées plafonnées
+TAILLE_BLOC_IMPORT = 5000
+MAX_ERREURS_IMPORT = 10_000
+
+# Évolution des moyennes : nombre de périodes (mois ou trimestres) de la vue glissante
+FENETRE_GLISSANTE = 3
+
+# Base SQLite persistante (optionnelle). Sans cette variable, les données
+# restent en mémoire et sont régénérées à chaque démarrage.
+DB_PATH = os.environ.get("ECOLE_DB_PATH")
+
+# Sans base SQLite : dossier du journal et des instantanés (optionnel) qui
+# conservent les données en mémoire d'un démarrage à l'autre
+JOURNAL_DIR = os.environ.get("ECOLE_JOURNAL_DIR")
+OPERATIONS_PAR_INSTANTANE = int(os.environ.get("ECOLE_OPERATIONS_PAR_INSTANTANE", "5000"))
+
+# Boîte d'envoi des notifications : dans la base principale par défaut, à
+# côté du journal sans base SQLite, en mémoire sinon
+BOITE_ENVOI_PATH = os.environ.get(
+    "ECOLE_BOITE_ENVOI_PATH",
+    DB_PATH or (os.path.join(JOURNAL_DIR, "notifications.db") if JOURNAL_DIR else ":memory:"))
+
+# Graine de la génération des emplois du temps (reproductible d'un démarrage à l'autre)
+SEED_EMPLOI_DU_TEMPS = int(os.environ.get("ECOLE_SEED_EMPLOI_DU_TEMPS", "2024"))
+
+# Configuration de la page
+st.set_page_config(
+    page_title="École Ivoirienne - Gestion Scolaire",
+    page_icon="🏫",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# ============================================
+# STYLE CSS - Charte graphique
+# ============================================
+
+st.markdown("""
+<style>
+    :root {
+        --primary-100: #d4eaf7;
+        --primary-200: #b6ccd8;
+        --primary-300: #3b3c3d;
+        --accent-100: #71c4ef;
+        --accent-200: #00668c;
+        --text-100: #1d1c1c;
+        --text-200: #313d44;
+        --background-100: #fffefb;
+        --background-200: #f5f4f1;
+        --background-300: #cccbc8;
+    }
+    
+    .main {
+        background-color: var(--background-100);
+    }
+    
+    .stApp {
+        background-color: var(--background-100);
+    }
+    
+    h1, h2, h3, h4 {
+        color: var(--primary-300) !important;
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    }
+    
+    .css-1d391kg {
+        background-color: var(--background-100);
+    }
+    
+    .stButton > button {
+        background-color: var(--accent-100);
+        color: white;
+        border: none;
+        padding: 0.5rem 2rem;
+        border-radius: 4px;
+        font-weight: 600;
+    }
+    
+    .stButton > button:hover {
+        background-color: var(--accent-200);
+        color: white;
+    }
+    
+    .card {
+        background-color: var(--background-200);
+        padding: 1.5rem;
+        border-radius: 10px;
+        border-left: 5px solid var(--accent-100);
+        margin-bottom: 1rem;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    }
+    
+    .sidebar .sidebar-content {
+        background-color: var(--background-200);
+    }
+    
+    .header-container {
+        background: linear-gradient(135deg, var(--accent-100), var(--accent-200));
+        padding: 2rem;
+        border-radius: 10px;
+        color: white;
+        margin-bottom: 2rem;
+    }
+    
+    .success-message {
+        background-color: #d4edda;
+        color: #155724;
+        padding: 1rem;
+        border-radius: 5px;
+        border: 1px solid #c3e6cb;
+        margin: 1rem 0;
+    }
+    
+    .warning-message {
+        background-color: #fff3cd;
+        color: #856404;
+        padding: 1rem;
+        border-radius: 5px;
+        border: 1px solid #ffeaa7;
+        margin: 1rem 0;
+    }
+    
+    .info-message {
+        background-color: var(--primary-100);
+        color: var(--primary-300);
+        padding: 1rem;
+        border-radius: 5px;
+        border: 1px solid var(--primary-200);
+        margin: 1rem 0;
+    }
+    
+    .stat-card {
+        background: white;
+        padding: 1.5rem;
+        border-radius: 10px;
+        text-align: center;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        border-top: 4px solid var(--accent-100);
+    }
+    
+    .subject-badge {
+        display: inline-block;
+        padding: 0.25rem 0.75rem;
+        background-color: var(--accent-100);
+        color: white;
+        border-radius: 15px;
+        font-size: 0.85rem;
+        margin: 0.25rem;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+# ============================================
+# MESURES DE PERFORMANCE
+# ============================================
+
+class MesuresPerformance:
+    # Durées par section (tableaux de bord, onglets, requêtes du système) :
+    # nombre d'appels, total, et les dernières durées pour p50 / p95.
+    TAILLE_FENETRE = 5000
+    
+    def __init__(self, actif=True):
+        self.actif = actif
+        self._lock = threading.Lock()
+        self.reinitialiser()
+    
+    def reinitialiser(self):
+        with self._lock:
+            self._durees = {}
+            self._appels = defaultdict(int)
+            self._totaux = defaultdict(float)
+            self.depuis = datetime.now()
+    
+    def enregistrer(self, nom, duree):
+        with self._lock:
+            durees = self._durees.get(nom)
+            if durees is None:
+                durees = self._durees[nom] = deque(maxlen=self.TAILLE_FENETRE)
+            durees.append(duree)
+            self._appels[nom] += 1
+            self._totaux[nom] += duree
+    
+    @contextmanager
+    def mesurer(self, nom):
+        if not self.actif:
+            yield
+            return
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.enregistrer(nom, time.perf_counter() - debut)
+    
+    def tableau(self):
+        with self._lock:
+            fenetres = {nom: np.fromiter(durees, dtype=np.float64) for nom, durees in self._durees.items()}
+            appels, totaux = dict(self._appels), dict(self._totaux)
+        lignes = [{
+            'Section': nom,
+            'Appels': appels[nom],
+            'Total (s)': round(totaux[nom], 3),
+            'p50 (ms)': round(float(np.percentile(durees, 50)) * 1000, 3),
+            'p95 (ms)': round(float(np.percentile(durees, 95)) * 1000, 3),
+            'Max (ms)': round(float(durees.max()) * 1000, 3),
+        } for nom, durees in fenetres.items()]
+        colonnes = ['Section', 'Appels', 'Total (s)', 'p50 (ms)', 'p95 (ms)', 'Max (ms)']
+        return pd.DataFrame(lignes, columns=colonnes).sort_values('Total (s)', ascending=False,
+                                                                  ignore_index=True)
+
+@st.cache_resource
+def get_mesures():
+    # Partagées par toutes les sessions, comme le système
+    return MesuresPerformance(actif=os.environ.get("ECOLE_MESURES", "1") != "0")
+
+MESURES = get_mesures()
+
+def chronometre(nom):
+    # Décorateur : MESURES est relu à chaque appel (le script est réexécuté
+    # à chaque rerun, mais get_mesures renvoie toujours le même objet)
+    def decorateur(fonction):
+        @wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not MESURES.actif:
+                return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                MESURES.enregistrer(nom, time.perf_counter() - debut)
+        return enveloppe
+    return decorateur
+
+# ============================================
+# CACHE D'AFFICHAGE
+# ============================================
+
+# Taille maximale du cache des vues par élève (DataFrames et figures)
+CACHE_AFFICHAGE_MO = int(os.environ.get("ECOLE_CACHE_AFFICHAGE_MO", "64"))
+
+class CacheVersionne:
+    # Cache LRU borné en octets. Chaque entrée porte la version des données
+    # dont elle est tirée : une autre version vaut absence, et l'entrée
+    # périmée est remplacée au put suivant.
+    def __init__(self, max_octets):
+        self.max_octets = max_octets
+        self.octets = 0
+        self.succes = 0
+        self.echecs = 0
+        self._entrees = OrderedDict()  # cle -> (version, valeur, taille)
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entrees)
+    
+    def get(self, cle, version):
+        with self._lock:
+            entree = self._entrees.get(cle)
+            if entree is None or entree[0] != version:
+                self.echecs += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[1]
+    
+    def put(self, cle, version, valeur, taille):
+        with self._lock:
+            ancienne = self._entrees.pop(cle, None)
+            if ancienne is not None:
+                self.octets -= ancienne[2]
+            if taille <= self.max_octets:
+                self._entrees[cle] = (version, valeur, taille)
+                self.octets += taille
+                while self.octets > self.max_octets:
+                    _, (_, _, taille_evincee) = self._entrees.popitem(last=False)
+                    self.octets -= taille_evincee
+        return valeur
+    
+    def vider(self):
+        with self._lock:
+            self._entrees.clear()
+            self.octets = 0
+
+# ============================================
+# AUTHENTIFICATION
+# ============================================
+# Le mot de passe n'est vérifié (PBKDF2 salé, coûteux à dessein) qu'au
+# moment de la connexion ; la session reçoit alors un jeton, et chaque
+# rafraîchissement ne fait plus qu'une recherche de ce jeton.
+
+ITERATIONS_KDF = int(os.environ.get("ECOLE_ITERATIONS_KDF", "310000"))
+DUREE_SESSION_S = int(os.environ.get("ECOLE_DUREE_SESSION_S", str(8 * 3600)))
+# Au-delà de MAX_ECHECS_CONNEXION échecs, les tentatives sont refusées
+# pendant BLOCAGE_INITIAL_S secondes, durée doublée à chaque nouvel échec
+MAX_ECHECS_CONNEXION = 5
+BLOCAGE_INITIAL_S = 30
+BLOCAGE_MAX_S = 900
+
+class SessionsActives:
+    def __init__(self, duree=DUREE_SESSION_S):
+        self.duree = duree
+        # Dernière activité plutôt qu'une échéance : une nouvelle durée
+        # (réglée dans la configuration) s'applique aussi aux sessions ouvertes
+        self._sessions = {}  # jeton -> (username, dernière activité)
+        self._lock = threading.Lock()
+    
+    def ouvrir(self, username):
+        jeton = secrets.token_urlsafe(32)
+        maintenant = time.monotonic()
+        with self._lock:
+            self._purger(maintenant)
+            self._sessions[jeton] = (username, maintenant)
+        return jeton
+    
+    def utilisateur(self, jeton):
+        # Expiration glissante : chaque utilisation prolonge la session
+        if not jeton:
+            return None
+        maintenant = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(jeton)
+            if session is None or maintenant - session[1] > self.duree:
+                self._sessions.pop(jeton, None)
+                return None
+            self._sessions[jeton] = (session[0], maintenant)
+            return session[0]
+    
+    def fermer(self, jeton):
+        with self._lock:
+            self._sessions.pop(jeton, None)
+    
+    def _purger(self, maintenant):
+        expirees = [jeton for jeton, (_, activite) in self._sessions.items()
+                    if maintenant - activite > self.duree]
+        for jeton in expirees:
+            del self._sessions[jeton]
+    
+    def __len__(self):
+        return len(self._sessions)
+
+class LimiteurTentatives:
+    # Échecs comptés par utilisateur et par client (adresse IP). Un blocage
+    # est une simple échéance : la tentative est refusée immédiatement, sans
+    # jamais faire attendre le thread du script.
+    def __init__(self, max_echecs=MAX_ECHECS_CONNEXION, blocage_initial=BLOCAGE_INITIAL_S,
+                 blocage_max=BLOCAGE_MAX_S):
+        self.max_echecs = max_echecs
+        self.blocage_initial = blocage_initial
+        self.blocage_max = blocage_max
+        self._echecs = {}  # clé -> (nombre d'échecs, fin du blocage, dernier échec)
+        self._lock = threading.Lock()
+    
+    def attente(self, cles):
+        # Secondes restantes avant la prochaine tentative autorisée (0 si aucune)
+        maintenant = time.monotonic()
+        with self._lock:
+            return max([self._echecs[cle][1] - maintenant for cle in cles if cle in self._echecs] + [0])
+    
+    def echec(self, cles):
+        maintenant = time.monotonic()
+        with self._lock:
+            for cle in cles:
+                nombre, _, dernier = self._echecs.get(cle, (0, 0, maintenant))
+                # Les échecs anciens sont oubliés
+                if maintenant - dernier > self.blocage_max:
+                    nombre = 0
+                nombre += 1
+                fin = 0
+                if nombre >= self.max_echecs:
+                    fin = maintenant + min(self.blocage_initial * 2 ** (nombre - self.max_echecs), self.blocage_max)
+                self._echecs[cle] = (nombre, fin, maintenant)
+            if len(self._echecs) > 10000:
+                self._echecs = {cle: echec for cle, echec in self._echecs.items()
+                                if maintenant - echec[2] <= self.blocage_max}
+    
+    def succes(self, cles):
+        with self._lock:
+            for cle in cles:
+                self._echecs.pop(cle, None)
+
+# ============================================
+# CLASSES ET DONNÉES SIMULÉES
+# ============================================
+# Enregistrements à __slots__ : pas de __dict__ par instance, ce qui compte
+# pour les notes, conservées par millions.
+
+@dataclass(slots=True)
+class User:
+    username: str
+    password_hash: str
+    role: str  # 'parent', 'enseignant', 'admin'
+    nom: str
+    prenom: str
+    email: str
+    telephone: str
+    
+@dataclass(slots=True)
+class Eleve:
+    id: int
+    nom: str
+    prenom: str
+    classe: str  # '6ème A', 'Terminale D', etc.
+    date_naissance: str
+    parent_id: str
+    
+@dataclass(slots=True)
+class Note:
+    id: int
+    eleve_id: int
+    matiere: str
+    note: float
+    coefficient: int
+    type_note: str  # 'Devoir', 'Composition', 'Oral'
+    date: str
+    enseignant: str
+    
+@dataclass(slots=True)
+class Activite:
+    id: int
+    titre: str
+    description: str
+    type_activite: str  # 'Sortie', 'Culturelle', 'Sportive', 'Pédagogique'
+    date: date
+    heure: Optional[dtime]
+    lieu: str
+    organisateur: str
+    classes_concernées: List[str]
+
+CHAMPS_NOTE_MODIFIABLES = {'matiere', 'note', 'coefficient', 'type_note', 'date', 'enseignant'}
+# Champs qui ne prennent que quelques valeurs distinctes : une seule chaîne
+# partagée (sys.intern) par valeur plutôt qu'une copie par note
+CHAMPS_NOTE_CATEGORIELS = ('matiere', 'type_note', 'date', 'enseignant')
+
+def compacter_note(champs):
+    return {champ: sys.intern(valeur) if champ in CHAMPS_NOTE_CATEGORIELS and type(valeur) is str else valeur
+            for champ, valeur in champs.items()}
+
+def calcul_moyenne(total_pondere, total_coeff):
+    return round(total_pondere / total_coeff, 2) if total_coeff > 0 else 0
+
+def format_rang(rang, ex_aequo, effectif):
+    if rang is None:
+        return f"-/{effectif}"
+    return f"{rang}{'er' if rang == 1 else 'e'}{' ex æquo' if ex_aequo else ''}/{effectif}"
+
+def lire_date(valeur):
+    # date ou 'AAAA-MM-JJ' -> date
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    return valeur if isinstance(valeur, date) else date.fromisoformat(str(valeur)[:10])
+
+def lire_heure(valeur):
+    # heure ou 'HH:MM' -> heure (None si absente)
+    if valeur is None or valeur == "" or isinstance(valeur, dtime):
+        return valeur or None
+    return dtime.fromisoformat(str(valeur))
+
+def enregistrement(objet):
+    # Champs d'un User, Eleve, Note ou Activite dans l'ordre de déclaration,
+    # dates et heures en texte : une ligne du journal ou de l'instantané
+    return [valeur.isoformat(timespec='minutes') if isinstance(valeur, dtime) else
+            valeur.isoformat() if isinstance(valeur, date) else valeur
+            for valeur in map(objet.__getattribute__, objet.__slots__)]
+
+def date_en_entier(date):
+    # 'AAAA-MM-JJ' -> AAAAMMJJ (0 si la date est illisible)
+    try:
+        return int(date[:4]) * 10000 + int(date[5:7]) * 100 + int(date[8:10])
+    except (TypeError, ValueError):
+        return 0
+
+@contextmanager
+def ramasse_miettes_suspendu():
+    # Chargement en masse d'objets sans cycle : le ramasse-miettes n'aurait
+    # rien à libérer mais reparcourrait tout le tas à chaque collecte
+    actif = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if actif:
+            gc.enable()
+
+def groupe_de_classe(classe):
+    if "6ème" in classe or "5ème" in classe:
+        return '6ème-5ème'
+    elif "4ème" in classe or "3ème" in classe:
+        return '4ème-3ème'
+    else:
+        return 'Lycée'
+
+def assembler_statistiques(df_eleves, df_matieres):
+    # df_eleves : eleve_id, classe, moyenne (0 pour un élève sans note)
+    # df_matieres : classe, matiere, moyenne
+    df_classes = df_eleves.groupby('classe', observed=True)['moyenne'].agg(
+        effectif='count', moyenne='mean', min='min', max='max').reset_index()
+    df_classes['classe'] = df_classes['classe'].astype(str)
+    df_classes = df_classes.sort_values('classe', ignore_index=True)
+    distribution, _ = np.histogram(df_eleves['moyenne'].to_numpy(), bins=20, range=(0, 20))
+    return {
+        'eleves': df_eleves,
+        'classes': df_classes,
+        'matieres': df_matieres,
+        'ecole': float(df_eleves['moyenne'].mean()) if len(df_eleves) else 0,
+        'distribution': distribution,
+    }
+
+class SchoolManagementSystem:
+    def __init__(self, store=None, colonnes=True, parametres=None, journal=None):
+        # Une seule instance est partagée par toutes les sessions Streamlit :
+        # les écritures passent par les méthodes add_* sous ce verrou.
+        self.lock = threading.RLock()
+        # Avec un store SQLite, les notes restent sur disque (requêtes indexées) ;
+        # seuls les utilisateurs, élèves et activités sont chargés en mémoire.
+        # Sans store, un journal (facultatif) rend les données en mémoire durables.
+        if store is not None and journal is not None:
+            raise ValueError("Le journal ne s'utilise qu'avec les données en mémoire")
+        self.store = store
+        self.journal = None
+        self.users = {}
+        self.eleves = []
+        self.activites = []
+        self.emplois_du_temps = EmploiDuTemps(seed=SEED_EMPLOI_DU_TEMPS)
+        
+        # Index secondaires, mis à jour à chaque ajout : une recherche coûte
+        # O(taille du résultat) et non plus un parcours complet des listes
+        self._notes_par_eleve = defaultdict(list)
+        self._notes_par_eleve_matiere = defaultdict(list)
+        self._eleves_par_classe = defaultdict(list)
+        self._eleves_par_parent = defaultdict(list)
+        self._eleves_par_id = {}
+        # Notes en mémoire par identifiant : c'est la liste des notes (voir
+        # la propriété notes), une suppression ne parcourt rien
+        self._notes_par_id = {}
+        self._prochain_id_note = 1
+        
+        # Après un instantané binaire, les notes restent dans la projection
+        # mmap (NotesFigees) ; celles d'un élève ne deviennent des objets Note
+        # indexés qu'à la première écriture qui le concerne
+        self.notes_figees = None
+        self._eleves_figes = set()
+        self._nb_notes_figees = 0
+        
+        # Calendrier des activités : clés (date, heure, id) triées, pour toute
+        # l'école et par classe concernée (index inversé) ; « à venir » n'est
+        # qu'une recherche par dichotomie. Une activité sans classe concerne
+        # tout le monde et se range sous la clé None.
+        self._activites_par_id = {}
+        self._calendrier = []
+        self._calendrier_par_classe = defaultdict(list)
+        
+        # Sommes courantes (Σ note × coeff, Σ coeff) par élève et par
+        # (élève, matière) : les moyennes se lisent en temps constant.
+        # Les tuples sont remplacés d'un bloc pour rester cohérents en lecture.
+        self._sommes_eleve = {}
+        self._sommes_matiere = {}
+        
+        # Classement par classe : liste triée de (-moyenne, eleve_id) tenue à
+        # jour à chaque note ; le rang se lit par dichotomie en O(log n)
+        self._classements = defaultdict(list)
+        self._cle_classement = {}
+        
+        # Ordres de parcours de tous les élèves (par nom, par classe, par
+        # moyenne) pour la pagination : une page n'est qu'une tranche de liste
+        self._cle_nom = {}
+        self._ordre_nom = []
+        self._ordre_classe = []
+        self._ordre_moyenne = []
+        
+        # Copie colonnaire des notes (optionnelle) pour les statistiques
+        # globales vectorisées, recalculées seulement si les données changent
+        self.colonnes = ColumnarNoteStore() if colonnes else None
+        self._version = 0
+        self._cache_statistiques = None
+        
+        # Version des notes de chaque élève : les vues mises en cache pour un
+        # élève ne sont invalidées que si ses propres notes changent
+        self._versions_eleve = defaultdict(int)
+        self.cache_affichage = CacheVersionne(CACHE_AFFICHAGE_MO * 1024 * 1024)
+        self.sessions = SessionsActives()
+        self.tentatives = LimiteurTentatives()
+        
+        # Service de notifications des parents (branché par get_system) : rien
+        # n'est envoyé pendant le chargement des données
+        self.notifications = None
+        
+        # Recherche d'élèves par nom, prénom, classe ou identifiant
+        self.recherche = IndexRecherche()
+        
+        # Moyennes par mois des élèves et classes consultés (« Voir l'évolution »)
+        self.evolution = EvolutionNotes()
+        
+        # Statistiques (classe, matière, trimestre) des classes consultées
+        self.cube_statistiques = CubeStatistiques()
+        
+        # Matières selon le système ivoirien
+        self.matieres = {
+            '6ème-5ème': ['Mathématiques', 'Français', 'Anglais', 'Histoire-Géo', 'SVT', 'EPS'],
+            '4ème-3ème': ['Mathématiques', 'Français', 'Anglais', 'Histoire-Géo', 'SVT', 'Physique-Chimie', 'EPS'],
+            'Lycée': ['Mathématiques', 'Philosophie', 'Français', 'Anglais', 'Histoire-Géo', 
+                     'SVT', 'Physique-Chimie', 'EPS', 'Spécialité']
+        }
+        
+        if journal is not None and journal.existe():
+            self._restaurer(*journal.lire())
+        elif store is None or store.is_empty():
+            self.init_demo_data(parametres)
+        else:
+            self.users = store.load_users()
+            self.eleves = store.load_eleves()
+            self.activites = store.load_activites()
+            for activite in self.activites:
+                self._indexer_activite(activite)
+            for eleve in self.eleves:
+                self._indexer_eleve(eleve)
+            self.recherche.ajouter(self.eleves)
+            self._charger_sommes(store.iter_notes_colonnes())
+            self._ordonner(self.eleves)
+            self.emplois_du_temps.charger(store.load_emplois_du_temps())
+        
+        # Emplois du temps générés une seule fois ; une nouvelle classe reçoit
+        # le sien à la première consultation
+        self._generer_emplois_du_temps(self.get_classes())
+        
+        if journal is not None:
+            # Le chargement lui-même n'est pas journalisé. Premier démarrage :
+            # instantané des données générées avant toute autre écriture.
+            nouveau = not journal.existe()
+            journal.ouvrir()
+            self.journal = journal
+            if nouveau:
+                self.instantane(attendre=True)
+        
+    def init_demo_data(self, parametres=None):
+        # Données de démonstration pour une école ivoirienne, reproductibles :
+        # taille et graine réglables (ParametresGeneration, variables ECOLE_*)
+        parametres = parametres or ParametresGeneration.depuis_environnement()
+        self.charger_donnees(generer_donnees(parametres, self.matieres))
+        
+        # Création d'utilisateurs de démonstration
+        demo_users = [
+            User("parent1", self.hash_password("pass123"), "parent", "Kouamé", "Aminata", "parent1@example.ci", "07 12 34 56 78"),
+            User("prof1", self.hash_password("prof123"), "enseignant", "Yao", "Koffi", "prof1@ecole.ci", "05 23 45 67 89"),
+            User("admin", self.hash_password("admin123"), "admin", "Admin", "System", "admin@ecole.ci", "01 23 45 67 89"),
+        ]
+        
+        for user in demo_users:
+            self.add_user(user)
+    
+    # --- Écritures (thread-safe) ---
+    # Les ajouts se font par append, ce qui reste sûr pour les lecteurs qui
+    # parcourent les listes sans verrou. Le dictionnaire des utilisateurs
+    # est remplacé (copie sur écriture) pour ne jamais être modifié pendant
+    # qu'une autre session l'itère.
+    
+    def add_user(self, user):
+        with self.lock:
+            if self.store is not None:
+                self.store.insert_user(user)
+            self._journaliser('utilisateur', enregistrement(user))
+            users = dict(self.users)
+            users[user.username] = user
+            self.users = users
+        return user
+    
+    # --- Journal et instantanés (données en mémoire) ---
+    
+    def _journaliser(self, operation, donnees):
+        # Appelée sous le verrou, avant de modifier la mémoire : l'instantané
+        # éventuel est pris entre deux opérations complètes
+        if self.journal is None:
+            return
+        if self.journal.depuis_instantane >= OPERATIONS_PAR_INSTANTANE and \
+                not self.journal.instantane_en_cours():
+            self.journal.ecrire_instantane(self._capturer_instantane())
+        self.journal.ecrire(operation, donnees)
+    
+    def instantane(self, attendre=False):
+        with self.lock:
+            if self.journal is not None:
+                self.journal.ecrire_instantane(self._capturer_instantane(), attendre)
+    
+    def _capturer_instantane(self):
+        # Sous le verrou, seulement des copies de listes : les élèves, notes et
+        # activités ne font que s'ajouter, les utilisateurs sont copiés sur
+        # écriture et les notes figées ne changent pas. Le reste se fait dans
+        # le thread du journal. Une note modifiée entre-temps peut y figurer
+        # avec ses nouvelles valeurs : la modification, rejouée depuis le
+        # journal, redonne le même état.
+        entete = {
+            'sequence': self.journal.sequence,
+            'prochain_id_note': self._prochain_id_note,
+            'utilisateurs': [enregistrement(user) for user in self.users.values()],
+            'activites': [enregistrement(activite) for activite in self.activites],
+            'emplois_du_temps': [(classe, jour, creneau, c['matiere'], c['enseignant'], c['salle'])
+                                 for classe, cours in self.emplois_du_temps.cours.items()
+                                 for (jour, creneau), c in cours.items()],
+        }
+        eleves, notes = list(self.eleves), list(self.notes)
+        figees, eleves_figes = self.notes_figees, np.fromiter(self._eleves_figes, dtype=np.int64)
+        
+        def preparer():
+            chaines, colonnes = {}, {}
+            
+            def coder(nom, valeurs, connues=()):
+                # Codes dans le dictionnaire de chaînes nom, qui commence par connues
+                codes, distinctes = pd.factorize(np.fromiter(valeurs, dtype=object, count=-1))
+                chaines[nom] = list(connues)
+                position = {chaine: i for i, chaine in enumerate(chaines[nom])}
+                correspondance = np.array([position.setdefault(chaine, len(position)) for chaine in distinctes],
+                                          dtype=np.int32)
+                chaines[nom] = list(position)
+                return correspondance[codes] if len(codes) else np.zeros(0, dtype=np.int32)
+            
+            colonnes['eleves.id'] = np.fromiter((e.id for e in eleves), dtype=np.int64, count=len(eleves))
+            for champ in Eleve.__slots__[1:]:
+                colonnes[f'eleves.{champ}'] = coder(f'eleves.{champ}', map(attrgetter(champ), eleves))
+            
+            # Notes figées des élèves toujours figés, puis notes en mémoire,
+            # réunies dans l'ordre des identifiants
+            lignes = np.flatnonzero(np.isin(figees.eleve_id, eleves_figes)) if figees is not None else []
+            for champ in Note.__slots__:
+                valeurs = map(attrgetter(champ), notes)
+                if champ in CHAMPS_NOTE_CATEGORIELS:
+                    connues = figees.chaines[champ] if figees is not None else ()
+                    nouvelles = coder(f'notes.{champ}', valeurs, connues)
+                    anciennes = figees.codes[champ][lignes] if figees is not None else nouvelles[:0]
+                else:
+                    dtype = np.float64 if champ == 'note' else np.int64
+                    nouvelles = np.fromiter(valeurs, dtype=dtype, count=len(notes))
+                    anciennes = getattr(figees, champ)[lignes] if figees is not None else nouvelles[:0]
+                colonnes[f'notes.{champ}'] = np.concatenate([anciennes, nouvelles])
+            ordre = np.argsort(colonnes['notes.id'], kind='stable')
+            for champ in Note.__slots__:
+                colonnes[f'notes.{champ}'] = colonnes[f'notes.{champ}'][ordre]
+            
+            # Index CSR par élève
+            eleve_ids = colonnes['notes.eleve_id']
+            par_eleve = np.argsort(eleve_ids, kind='stable')
+            nb = int(max(eleve_ids.max(initial=0), colonnes['eleves.id'].max(initial=0))) + 2
+            colonnes['notes.par_eleve'] = par_eleve.astype(np.int64)
+            colonnes['notes.debut_eleve'] = np.searchsorted(eleve_ids[par_eleve], np.arange(nb)).astype(np.int64)
+            return {**entete, 'chaines': chaines}, colonnes
+        return preparer
+    
+    def _restaurer(self, instantane, operations):
+        with self.lock, ramasse_miettes_suspendu():
+            if instantane is not None:
+                self._charger_instantane(*instantane)
+            for operation in operations:
+                self._rejouer(operation)
+    
+    def _charger_instantane(self, entete, colonnes):
+        self.users = {ligne[0]: User(*ligne) for ligne in entete['utilisateurs']}
+        for ligne in entete['activites']:
+            activite = Activite(*ligne)
+            activite.date, activite.heure = lire_date(activite.date), lire_heure(activite.heure)
+            self.activites.append(activite)
+            self._indexer_activite(activite)
+        
+        chaines = entete['chaines']
+        champs = [colonnes['eleves.id'].tolist()] + [
+            np.array(list(map(sys.intern, chaines[f'eleves.{champ}'])), dtype=object)[colonnes[f'eleves.{champ}']].tolist()
+            for champ in Eleve.__slots__[1:]]
+        eleves = list(map(Eleve, *champs))
+        self.eleves.extend(eleves)
+        for eleve in eleves:
+            self._indexer_eleve(eleve)
+        self.recherche.ajouter(eleves)
+        
+        # Les notes restent dans le fichier ; seules les sommes sont calculées
+        figees = NotesFigees(colonnes, chaines)
+        self.notes_figees = figees
+        self._eleves_figes = set(figees.eleves().tolist())
+        self._nb_notes_figees = len(figees)
+        if len(figees):
+            self._charger_sommes([(figees.id, figees.eleve_id, figees.decoder('matiere'), figees.note,
+                                   figees.coefficient, figees.decoder('date'))])
+        self._prochain_id_note = entete['prochain_id_note']
+        self._ordonner(eleves)
+        self.emplois_du_temps.charger(entete['emplois_du_temps'])
+        self._version += 1
+    
+    def _detacher(self, eleve_id):
+        # Avant une écriture : les notes figées de l'élève deviennent des objets
+        # Note ordinaires, indexés comme les autres
+        if eleve_id in self._eleves_figes:
+            notes = self.notes_figees.notes_de(eleve_id)
+            for n in notes:
+                self._indexer_note(n)
+            self._eleves_figes.discard(eleve_id)
+            self._nb_notes_figees -= len(notes)
+    
+    def _note_en_memoire(self, note_id):
+        # KeyError si la note n'existe pas
+        if note_id not in self._notes_par_id and self.notes_figees is not None:
+            eleve_id = self.notes_figees.eleve_de(note_id)
+            if eleve_id is not None:
+                self._detacher(eleve_id)
+        return self._notes_par_id[note_id]
+    
+    def _rejouer(self, operation):
+        # Les identifiants sont réattribués dans le même ordre qu'à l'origine :
+        # une différence signale un journal qui ne suit pas l'instantané
+        nom, donnees = operation['op'], operation['d']
+        attendus = obtenus = None
+        if nom == 'utilisateur':
+            self.add_user(User(*donnees))
+        elif nom == 'eleves':
+            attendus = [ligne[0] for ligne in donnees]
+            obtenus = [e.id for e in self.add_eleves([dict(zip(Eleve.__slots__[1:], ligne[1:]))
+                                                      for ligne in donnees])]
+        elif nom == 'notes':
+            attendus = [ligne[0] for ligne in donnees]
+            obtenus = [n.id for n in self.add_notes([dict(zip(Note.__slots__[1:], ligne[1:]))
+                                                     for ligne in donnees])]
+        elif nom == 'note_modifiee':
+            self.update_note(donnees['id'], **donnees['champs'])
+        elif nom == 'note_supprimee':
+            self.delete_note(donnees)
+        elif nom == 'activite':
+            attendus, obtenus = [donnees[0]], [self.add_activite(*donnees[1:]).id]
+        elif nom == 'creneau':
+            self.modifier_creneau(*donnees)
+        elif nom == 'emplois_du_temps':
+            # Un instantané pris pendant la génération contient déjà ces classes
+            self.emplois_du_temps.charger([ligne for ligne in donnees
+                                           if ligne[0] not in self.emplois_du_temps.cours])
+        else:
+            raise RuntimeError(f"Journal : opération inconnue {nom!r} (n° {operation['n']})")
+        if attendus != obtenus:
+            raise RuntimeError(f"Journal : identifiants {obtenus} au lieu de {attendus} (opération n° {operation['n']})")
+    
+    def _charger_sommes(self, blocs):
+        # Une passe sur les notes dans l'ordre des identifiants : les sommes sont
+        # accumulées par np.add.at (séquentiel) dans le même ordre qu'en mémoire,
+        # les moyennes arrondies ne changent donc pas après un redémarrage.
+        # blocs : colonnes (ids, élèves, matières, notes, coefficients, dates)
+        nb = max(self._eleves_par_id, default=0) + 1
+        codes = {}
+        tp_eleve, tc_eleve = np.zeros(nb), np.zeros(nb, dtype=np.int64)
+        tp_matiere, tc_matiere = np.zeros((nb, 0)), np.zeros((nb, 0), dtype=np.int64)
+        for ids, eleve_ids, matieres, notes, coefficients, dates in blocs:
+            if self.colonnes is not None:
+                self.colonnes.extend(ids, eleve_ids, matieres, notes, coefficients, dates)
+            eleve_ids, coefficients = np.asarray(eleve_ids), np.asarray(coefficients)
+            ponderees = np.asarray(notes) * coefficients
+            codes_bloc, valeurs = pd.factorize(np.asarray(matieres, dtype=object))
+            for valeur in valeurs:
+                codes.setdefault(valeur, len(codes))
+            if len(codes) > tp_matiere.shape[1]:
+                ajout = ((0, 0), (0, len(codes) - tp_matiere.shape[1]))
+                tp_matiere, tc_matiere = np.pad(tp_matiere, ajout), np.pad(tc_matiere, ajout)
+            code = np.array([codes[v] for v in valeurs], dtype=np.int64)[codes_bloc]
+            np.add.at(tp_eleve, eleve_ids, ponderees)
+            np.add.at(tc_eleve, eleve_ids, coefficients)
+            np.add.at(tp_matiere, (eleve_ids, code), ponderees)
+            np.add.at(tc_matiere, (eleve_ids, code), coefficients)
+        
+        matieres = list(codes)
+        lignes, colonnes = np.nonzero(tc_matiere)
+        self._sommes_matiere.update(zip(
+            zip(lignes.tolist(), map(matieres.__getitem__, colonnes.tolist())),
+            zip(tp_matiere[lignes, colonnes].tolist(), tc_matiere[lignes, colonnes].tolist())))
+        eleve_ids = np.flatnonzero(tc_eleve)
+        self._sommes_eleve.update(zip(eleve_ids.tolist(),
+                                      zip(tp_eleve[eleve_ids].tolist(), tc_eleve[eleve_ids].tolist())))
+        self._classer_en_masse(eleve_ids.tolist())
+    
+    @chronometre("system.charger_donnees")
+    def charger_donnees(self, donnees):
+        # Chargement en masse d'une DonneesSynthetiques : identifiants attribués
+        # d'un bloc, sommes calculées par np.bincount (qui additionne dans
+        # l'ordre des notes, comme _ajouter_aux_sommes) et index remplis par tranches
+        notes = donnees.notes
+        with self.lock, ramasse_miettes_suspendu():
+            premier_eleve = max(self._eleves_par_id, default=0) + 1
+            if self.store is not None:
+                premier_note = self.store.max_note_id() + 1
+            else:
+                premier_note = self._prochain_id_note
+            eleves = [Eleve(id=premier_eleve + i, **ligne) for i, ligne in enumerate(donnees.eleves)]
+            nb_notes = len(notes['eleve'])
+            eleve_ids = notes['eleve'] + premier_eleve
+            # Objets partagés entre les notes : l'int de l'élève et un float par
+            # valeur de note distincte (les chaînes du générateur le sont déjà) ;
+            # les identifiants servent à la fois aux notes et à leur index
+            ids_eleves = [eleve.id for eleve in eleves]
+            valeurs, code_valeur = np.unique(notes['note'], return_inverse=True)
+            colonnes_notes = (
+                list(range(premier_note, premier_note + nb_notes)),
+                list(map(ids_eleves.__getitem__, notes['eleve'].tolist())), notes['matiere'].tolist(),
+                list(map(valeurs.tolist().__getitem__, code_valeur.tolist())), notes['coefficient'].tolist(),
+                notes['type_note'].tolist(), notes['date'].tolist(), notes['enseignant'].tolist())
+            if self.store is not None:
+                self.store.insert_en_masse(eleves, zip(*colonnes_notes))
+            self.eleves.extend(eleves)
+            for eleve in eleves:
+                self._indexer_eleve(eleve)
+            self.recherche.ajouter(eleves)
+            
+            codes_matiere, matieres = pd.factorize(notes['matiere'])
+            if self.store is None:
+                self._prochain_id_note = premier_note + nb_notes
+                nouvelles = list(map(Note, *colonnes_notes))
+                self._indexer_tranches(nouvelles, eleve_ids, codes_matiere)
+            
+            ponderees = notes['note'] * notes['coefficient']
+            cles, groupe = np.unique(eleve_ids * len(matieres) + codes_matiere, return_inverse=True)
+            tp = np.bincount(groupe, weights=ponderees)
+            tc = np.bincount(groupe, weights=notes['coefficient']).astype(np.int64)
+            for cle, total_pondere, total_coeff in zip(cles.tolist(), tp.tolist(), tc.tolist()):
+                self._sommes_matiere[(cle // len(matieres), matieres[cle % len(matieres)])] = \
+                    (total_pondere, total_coeff)
+            indices = notes['eleve']
+            tp = np.bincount(indices, weights=ponderees, minlength=len(eleves))
+            tc = np.bincount(indices, weights=notes['coefficient'], minlength=len(eleves)).astype(np.int64)
+            for i in np.flatnonzero(tc).tolist():
+                self._sommes_eleve[eleves[i].id] = (float(tp[i]), int(tc[i]))
+            self._classer_en_masse([eleves[i].id for i in np.flatnonzero(tc).tolist()])
+            
+            if self.colonnes is not None:
+                self.colonnes.extend(np.arange(premier_note, premier_note + nb_notes), eleve_ids,
+                                     notes['matiere'], notes['note'], notes['coefficient'], notes['date'])
+            self._ordonner(eleves)
+            self.evolution.vider()
+            self.cube_statistiques.vider()
+            self._version += 1
+        
+        for activite in donnees.activites:
+            self.add_activite(**activite)
+    
+    def add_eleve(self, nom, prenom, classe, date_naissance, parent_id):
+        return self.add_eleves([{
+            'nom': nom,
+            'prenom': prenom,
+            'classe': classe,
+            'date_naissance': date_naissance,
+            'parent_id': parent_id
+        }])[0]
+    
+    @chronometre("system.add_eleves")
+    def add_eleves(self, lignes):
+        lignes = list(lignes)
+        if not lignes:
+            return []
+        with self.lock:
+            if self.store is not None:
+                eleve_ids = self.store.insert_eleves(lignes)
+            else:
+                eleve_ids = range(len(self.eleves) + 1, len(self.eleves) + len(lignes) + 1)
+            nouveaux = [Eleve(id=eleve_id, **ligne) for eleve_id, ligne in zip(eleve_ids, lignes)]
+            self._journaliser('eleves', [enregistrement(eleve) for eleve in nouveaux])
+            self.eleves.extend(nouveaux)
+            for eleve in nouveaux:
+                self._indexer_eleve(eleve)
+            self.recherche.ajouter(nouveaux)
+            self._ordonner(nouveaux)
+            self._version += 1
+        return nouveaux
+    
+    def add_note(self, eleve_id, matiere, note, coefficient, type_note, date, enseignant):
+        return self.add_notes([{
+            'eleve_id': eleve_id,
+            'matiere': matiere,
+            'note': note,
+            'coefficient': coefficient,
+            'type_note': type_note,
+            'date': date,
+            'enseignant': enseignant
+        }])[0]
+    
+    @chronometre("system.add_notes")
+    def add_notes(self, lignes, notifier=True):
+        # Écriture groupée : une transaction, puis une seule passe de mise à
+        # jour des index, des sommes, des colonnes et des classements.
+        # notifier=False : l'appelant prévient les parents lui-même (import)
+        lignes = list(lignes)
+        if not lignes:
+            return []
+        with self.lock:
+            if self.store is not None:
+                note_ids = self.store.insert_notes(lignes)
+            else:
+                note_ids = range(self._prochain_id_note, self._prochain_id_note + len(lignes))
+                for eleve_id in {ligne['eleve_id'] for ligne in lignes}:
+                    self._detacher(eleve_id)
+            nouvelles = [Note(id=note_id, **compacter_note(ligne)) for note_id, ligne in zip(note_ids, lignes)]
+            self._journaliser('notes', [enregistrement(n) for n in nouvelles])
+            if self.store is None:
+                self._prochain_id_note += len(lignes)
+                for n in nouvelles:
+                    self._indexer_note(n)
+            for n in nouvelles:
+                self._ajouter_aux_sommes(n)
+            self.evolution.ajouter(nouvelles, lambda eleve_id: self._eleves_par_id[eleve_id].classe)
+            eleve_ids = {n.eleve_id for n in nouvelles}
+            for eleve_id in eleve_ids:
+                self._actualiser_cube(eleve_id)
+                self._versions_eleve[eleve_id] += 1
+            self._classer(eleve_ids)
+            if self.colonnes is not None:
+                self.colonnes.extend(
+                    [n.id for n in nouvelles], [n.eleve_id for n in nouvelles],
+                    [n.matiere for n in nouvelles], [n.note for n in nouvelles],
+                    [n.coefficient for n in nouvelles], [n.date for n in nouvelles])
+            self._version += 1
+        if notifier:
+            self._notifier_notes(nouvelles)
+        return nouvelles
+    
+    @chronometre("system.update_note")
+    def update_note(self, note_id, **champs):
+        if not champs.keys() <= CHAMPS_NOTE_MODIFIABLES:
+            raise ValueError(f"Champs non modifiables : {set(champs) - CHAMPS_NOTE_MODIFIABLES}")
+        champs = compacter_note(champs)
+        with self.lock:
+            if self.store is not None:
+                ancienne = self.store.get_note(note_id)
+                if ancienne is None:
+                    raise KeyError(note_id)
+                self.store.update_note(note_id, champs)
+            else:
+                n = self._note_en_memoire(note_id)
+                self._journaliser('note_modifiee', {'id': note_id, 'champs': champs})
+                ancienne = replace(n)
+                for champ, valeur in champs.items():
+                    setattr(n, champ, valeur)
+                if n.matiere != ancienne.matiere:
+                    self._notes_par_eleve_matiere[(n.eleve_id, ancienne.matiere)].remove(n)
+                    notes_matiere = self._notes_par_eleve_matiere[(n.eleve_id, n.matiere)]
+                    notes_matiere.append(n)
+                    # Les index par élève restent dans l'ordre des identifiants
+                    notes_matiere.sort(key=lambda x: x.id)
+            self._recalculer_sommes(ancienne.eleve_id, ancienne.matiere)
+            self._recalculer_sommes(ancienne.eleve_id, champs.get('matiere', ancienne.matiere))
+            self.evolution.invalider(ancienne.eleve_id, self._eleves_par_id[ancienne.eleve_id].classe)
+            self._actualiser_cube(ancienne.eleve_id)
+            self._versions_eleve[ancienne.eleve_id] += 1
+            if self.colonnes is not None:
+                self.colonnes.update(note_id, champs)
+            self._version += 1
+    
+    @chronometre("system.delete_note")
+    def delete_note(self, note_id):
+        with self.lock:
+            if self.store is not None:
+                n = self.store.get_note(note_id)
+                if n is None:
+                    raise KeyError(note_id)
+                self.store.delete_note(note_id)
+            else:
+                n = self._note_en_memoire(note_id)
+                self._journaliser('note_supprimee', note_id)
+                self._desindexer_note(n)
+            self._recalculer_sommes(n.eleve_id, n.matiere)
+            self.evolution.invalider(n.eleve_id, self._eleves_par_id[n.eleve_id].classe)
+            self._actualiser_cube(n.eleve_id)
+            self._versions_eleve[n.eleve_id] += 1
+            if self.colonnes is not None:
+                self.colonnes.remove(note_id)
+            self._version += 1
+    
+    def add_activite(self, titre, description, type_activite, date, heure, lieu,
+                     organisateur, classes_concernées):
+        date, heure = lire_date(date), lire_heure(heure)
+        with self.lock:
+            if self.store is not None:
+                activite_id = self.store.insert_activite(titre, description, type_activite, date, heure,
+                                                         lieu, organisateur, classes_concernées)
+            else:
+                activite_id = len(self.activites) + 1
+            activite = Activite(
+                id=activite_id,
+                titre=titre,
+                description=description,
+                type_activite=type_activite,
+                date=date,
+                heure=heure,
+                lieu=lieu,
+                organisateur=organisateur,
+                classes_concernées=list(classes_concernées)
+            )
+            self._journaliser('activite', enregistrement(activite))
+            self.activites.append(activite)
+            self._indexer_activite(activite)
+        quand = date.strftime('%d/%m/%Y') + (f" à {heure.strftime('%H:%M')}" if heure else "")
+        self._notifier_parents('activite', activite.classes_concernées or None, f"Activité : {titre}",
+                               f"{titre} ({type_activite}) le {quand}, {lieu}.\n{description}")
+        return activite
+    
+    def _indexer_activite(self, activite):
+        cle = (activite.date, activite.heure or dtime.min, activite.id)
+        self._activites_par_id[activite.id] = activite
+        bisect.insort(self._calendrier, cle)
+        for classe in set(activite.classes_concernées) or {None}:
+            bisect.insort(self._calendrier_par_classe[classe], cle)
+    
+    def _indexer_eleve(self, eleve):
+        self._eleves_par_id[eleve.id] = eleve
+        self._eleves_par_classe[eleve.classe].append(eleve)
+        self._eleves_par_parent[eleve.parent_id].append(eleve)
+        if self.colonnes is not None:
+            self.colonnes.set_classe(eleve.id, eleve.classe)
+    
+    def _indexer_tranches(self, nouvelles, eleve_ids, codes_matiere):
+        # Index de notes triées par identifiant : les notes consécutives d'un
+        # même (élève, matière) sont ajoutées en une tranche.
+        # eleve_ids, codes_matiere : tableaux numpy parallèles à nouvelles
+        self._notes_par_id.update(zip([n.id for n in nouvelles], nouvelles))
+        coupures = np.flatnonzero((eleve_ids[1:] != eleve_ids[:-1]) |
+                                  (codes_matiere[1:] != codes_matiere[:-1])) + 1
+        bornes = [0, *coupures.tolist(), len(nouvelles)] if nouvelles else []
+        for debut, fin in zip(bornes[:-1], bornes[1:]):
+            tranche = nouvelles[debut:fin]
+            self._notes_par_eleve[tranche[0].eleve_id].extend(tranche)
+            self._notes_par_eleve_matiere[(tranche[0].eleve_id, tranche[0].matiere)].extend(tranche)
+    
+    def _indexer_note(self, note):
+        self._notes_par_id[note.id] = note
+        self._notes_par_eleve[note.eleve_id].append(note)
+        self._notes_par_eleve_matiere[(note.eleve_id, note.matiere)].append(note)
+    
+    def _desindexer_note(self, note):
+        del self._notes_par_id[note.id]
+        self._notes_par_eleve[note.eleve_id].remove(note)
+        self._notes_par_eleve_matiere[(note.eleve_id, note.matiere)].remove(note)
+    
+    def _ajouter_aux_sommes(self, note):
+        # Même ordre d'addition qu'une somme sur la liste des notes :
+        # les moyennes arrondies sont identiques au calcul complet.
+        cle = (note.eleve_id, note.matiere)
+        tp, tc = self._sommes_matiere.get(cle, (0, 0))
+        self._sommes_matiere[cle] = (tp + note.note * note.coefficient, tc + note.coefficient)
+        tp, tc = self._sommes_eleve.get(note.eleve_id, (0, 0))
+        self._sommes_eleve[note.eleve_id] = (tp + note.note * note.coefficient, tc + note.coefficient)
+    
+    def _recalculer_sommes(self, eleve_id, matiere):
+        # Après modification ou suppression, on repart des notes de l'élève
+        # plutôt que de soustraire, pour ne pas accumuler d'erreurs d'arrondi.
+        if self.store is not None:
+            notes_eleve = self.store.get_notes_by_eleve(eleve_id)
+        else:
+            notes_eleve = self._notes_par_eleve.get(eleve_id, ())
+        notes_matiere = [n for n in notes_eleve if n.matiere == matiere]
+        for sommes, cle, notes in ((self._sommes_matiere, (eleve_id, matiere), notes_matiere),
+                                   (self._sommes_eleve, eleve_id, notes_eleve)):
+            if notes:
+                sommes[cle] = (sum(n.note * n.coefficient for n in notes),
+                               sum(n.coefficient for n in notes))
+            else:
+                sommes.pop(cle, None)
+        self._classer([eleve_id])
+    
+    def _actualiser_cube(self, eleve_id):
+        # Une classe dont le cube n'est pas encore construit n'a rien à mettre à jour
+        eleve = self._eleves_par_id.get(eleve_id)
+        if eleve is not None and self.cube_statistiques.construit(eleve.classe):
+            self.cube_statistiques.mettre_a_jour(eleve.classe, eleve_id, self.get_notes_by_eleve(eleve_id))
+    
+    def _classer(self, eleve_ids):
+        # Replace les élèves dans le classement de leur classe selon leur moyenne
+        # arrondie (deux moyennes affichées identiques donnent le même rang).
+        # Copie sur écriture : get_page_eleves et get_rang_by_eleve lisent sans
+        # verrou et voient l'ancienne liste ou la nouvelle, jamais un élève
+        # retiré mais pas encore replacé. Une copie par liste et par appel.
+        classements = {}
+        ordre_moyenne = None
+        for eleve_id in eleve_ids:
+            eleve = self._eleves_par_id.get(eleve_id)
+            if eleve is None:
+                continue
+            if eleve.classe not in classements:
+                classements[eleve.classe] = self._classements[eleve.classe].copy()
+            classement = classements[eleve.classe]
+            ancienne_generale = self._cle_moyenne(eleve_id)
+            # La clé est remplacée, jamais retirée puis remise : un lecteur ne
+            # voit pas un élève noté sans rang
+            ancienne_cle = self._cle_classement.get(eleve_id)
+            if ancienne_cle is not None:
+                del classement[bisect.bisect_left(classement, ancienne_cle)]
+            if eleve_id in self._sommes_eleve:
+                cle = (-self.get_moyenne_by_eleve(eleve_id), eleve_id)
+                bisect.insort(classement, cle)
+                self._cle_classement[eleve_id] = cle
+            else:
+                self._cle_classement.pop(eleve_id, None)
+            # Un élève pas encore ordonné (chargement en masse) le sera par _ordonner
+            if eleve_id in self._cle_nom:
+                if ordre_moyenne is None:
+                    ordre_moyenne = self._ordre_moyenne.copy()
+                del ordre_moyenne[bisect.bisect_left(ordre_moyenne, ancienne_generale)]
+                bisect.insort(ordre_moyenne, self._cle_moyenne(eleve_id))
+        self._classements.update(classements)
+        if ordre_moyenne is not None:
+            self._ordre_moyenne = ordre_moyenne
+    
+    def _classer_en_masse(self, eleve_ids):
+        # Chargement : les élèves pas encore classés ni ordonnés sont triés
+        # par classe en une fois, les autres passent par _classer
+        par_classe = defaultdict(list)
+        deja_classes = []
+        for eleve_id in eleve_ids:
+            eleve = self._eleves_par_id.get(eleve_id)
+            if eleve is None or eleve_id not in self._sommes_eleve:
+                continue
+            if eleve_id in self._cle_classement or eleve_id in self._cle_nom:
+                deja_classes.append(eleve_id)
+                continue
+            cle = (-calcul_moyenne(*self._sommes_eleve[eleve_id]), eleve_id)
+            self._cle_classement[eleve_id] = cle
+            par_classe[eleve.classe].append(cle)
+        for classe, cles in par_classe.items():
+            self._classements[classe] = sorted(self._classements[classe] + cles)
+        self._classer(deja_classes)
+    
+    def _cle_moyenne(self, eleve_id):
+        # Les élèves sans note viennent après tous les autres
+        return self._cle_classement.get(eleve_id, (math.inf, eleve_id))
+    
+    def _ordonner(self, eleves):
+        # Place de nouveaux élèves dans les ordres de pagination : par
+        # dichotomie pour quelques-uns, par un tri complet pour un ajout en masse.
+        # Dans les deux cas, les listes sont remplacées et jamais modifiées sous un lecteur
+        for eleve in eleves:
+            self._cle_nom[eleve.id] = (normaliser_texte(eleve.nom), normaliser_texte(eleve.prenom), eleve.id)
+        ordres = (('_ordre_nom', [self._cle_nom[e.id] for e in eleves]),
+                  ('_ordre_classe', [(e.classe, *self._cle_nom[e.id]) for e in eleves]),
+                  ('_ordre_moyenne', [self._cle_moyenne(e.id) for e in eleves]))
+        for nom, cles in ordres:
+            if len(cles) <= 16:
+                ordre = getattr(self, nom).copy()
+                for cle in cles:
+                    bisect.insort(ordre, cle)
+            else:
+                ordre = sorted(getattr(self, nom) + cles)
+            setattr(self, nom, ordre)
+    
+    def hash_password(self, password, sel=None, iterations=ITERATIONS_KDF):
+        sel = sel or secrets.token_bytes(16)
+        derive = hashlib.pbkdf2_hmac("sha256", password.encode(), sel, iterations)
+        return f"pbkdf2_sha256${iterations}${sel.hex()}${derive.hex()}"
+    
+    def verifier_mot_de_passe(self, user, password):
+        if not user.password_hash.startswith("pbkdf2_sha256$"):
+            # Ancien format (SHA-256 sans sel) d'une base existante : remplacé
+            # par le nouveau dès que le mot de passe est vérifié
+            if not hmac.compare_digest(user.password_hash, hashlib.sha256(password.encode()).hexdigest()):
+                return False
+            self.add_user(replace(user, password_hash=self.hash_password(password)))
+            return True
+        _, iterations, sel, _ = user.password_hash.split("$")
+        return hmac.compare_digest(self.hash_password(password, bytes.fromhex(sel), int(iterations)),
+                                   user.password_hash)
+    
+    @chronometre("system.authentifier")
+    def authentifier(self, username, password, client=None):
+        # Renvoie un jeton de session ; ValueError si la connexion est refusée
+        cles = [('utilisateur', username)] + ([('client', client)] if client else [])
+        attente = self.tentatives.attente(cles)
+        if attente > 0:
+            raise ValueError(f"Trop de tentatives échouées : réessayez dans {math.ceil(attente)} s")
+        user = self.users.get(username)
+        if user is None:
+            self.tentatives.echec(cles)
+            raise ValueError("Utilisateur non trouvé")
+        if not self.verifier_mot_de_passe(user, password):
+            self.tentatives.echec(cles)
+            raise ValueError("Mot de passe incorrect")
+        self.tentatives.succes(cles[:1])
+        return self.sessions.ouvrir(username)
+    
+    def get_user_by_jeton(self, jeton):
+        username = self.sessions.utilisateur(jeton)
+        return self.users.get(username) if username else None
+    
+    def get_matieres_by_classe(self, classe):
+        return self.matieres[groupe_de_classe(classe)]
+    
+    # Les lectures renvoient des copies : les listes des index ne doivent
+    # jamais être modifiées en dehors des méthodes add_*.
+    
+    def get_classes(self):
+        with self.lock:
+            return sorted(self._eleves_par_classe)
+    
+    @chronometre("system.get_eleves_by_parent")
+    def get_eleves_by_parent(self, parent_id):
+        return list(self._eleves_par_parent.get(parent_id, ()))
+    
+    @chronometre("system.get_eleves_by_classe")
+    def get_eleves_by_classe(self, classe):
+        return list(self._eleves_par_classe.get(classe, ()))
+    
+    @chronometre("system.rechercher_eleves")
+    def rechercher_eleves(self, texte, limite=50, classes=None):
+        accepter = None
+        if classes:
+            classes = set(classes)
+            accepter = lambda eleve_id: self._eleves_par_id[eleve_id].classe in classes
+        return [self._eleves_par_id[eleve_id] for eleve_id in self.recherche.rechercher(texte, limite, accepter)]
+    
+    @chronometre("system.get_notes_by_eleve")
+    def get_notes_by_eleve(self, eleve_id):
+        if self.store is not None:
+            return self.store.get_notes_by_eleve(eleve_id)
+        if eleve_id in self._eleves_figes:
+            return self.notes_figees.notes_de(eleve_id)
+        return list(self._notes_par_eleve.get(eleve_id, ()))
+    
+    @chronometre("system.get_notes_by_matiere")
+    def get_notes_by_matiere(self, eleve_id, matiere):
+        if self.store is not None:
+            return self.store.get_notes_by_matiere(eleve_id, matiere)
+        if eleve_id in self._eleves_figes:
+            return [n for n in self.notes_figees.notes_de(eleve_id) if n.matiere == matiere]
+        return list(self._notes_par_eleve_matiere.get((eleve_id, matiere), ()))
+    
+    @property
+    def notes(self):
+        # Notes en mémoire (sans les notes figées), dans l'ordre d'insertion
+        return self._notes_par_id.values()
+    
+    def count_notes(self):
+        if self.store is not None:
+            return self.store.count_notes()
+        return len(self._notes_par_id) + self._nb_notes_figees
+    
+    def count_eleves(self, classes=None):
+        if classes:
+            return sum(len(self._eleves_par_classe.get(classe, ())) for classe in classes)
+        return len(self.eleves)
+    
+    @chronometre("system.get_page_eleves")
+    def get_page_eleves(self, page, taille=50, tri='nom', inverse=False, classes=None):
+        # Élèves de la page (numérotée à partir de 0) triés par 'nom', 'classe'
+        # ou 'moyenne' (meilleures d'abord). Sans filtre, la page est une
+        # tranche d'un ordre tenu à jour : la page N coûte autant que la
+        # première. Avec un filtre, seuls les élèves des classes choisies sont triés.
+        if tri == 'nom':
+            cle, ordre = (lambda e: self._cle_nom[e.id]), self._ordre_nom
+        elif tri == 'classe':
+            cle, ordre = (lambda e: (e.classe, *self._cle_nom[e.id])), self._ordre_classe
+        elif tri == 'moyenne':
+            cle, ordre = (lambda e: self._cle_moyenne(e.id)), self._ordre_moyenne
+        else:
+            raise ValueError(f"Tri inconnu : {tri}")
+        if classes:
+            ordre = sorted(cle(e) for classe in classes for e in self._eleves_par_classe.get(classe, ()))
+        
+        # Dans les deux sens, les élèves sans note restent en fin de liste
+        fin_triee = bisect.bisect_left(ordre, (math.inf,)) if tri == 'moyenne' else len(ordre)
+        debut, fin = page * taille, (page + 1) * taille
+        if inverse:
+            tranche = ordre[max(fin_triee - fin, 0):max(fin_triee - debut, 0)][::-1] + \
+                      ordre[max(debut, fin_triee):max(fin, fin_triee)]
+        else:
+            tranche = ordre[debut:fin]
+        return [self._eleves_par_id[cle[-1]] for cle in tranche]
+    
+    @chronometre("system.get_moyenne_by_eleve")
+    def get_moyenne_by_eleve(self, eleve_id):
+        sommes = self._sommes_eleve.get(eleve_id)
+        if not sommes:
+            return 0
+        return calcul_moyenne(*sommes)
+    
+    @chronometre("system.get_moyenne_by_matiere")
+    def get_moyenne_by_matiere(self, eleve_id, matiere):
+        sommes = self._sommes_matiere.get((eleve_id, matiere))
+        if not sommes:
+            return 0
+        return calcul_moyenne(*sommes)
+    
+    def get_eleve(self, eleve_id):
+        return self._eleves_par_id.get(eleve_id)
+    
+    @chronometre("system.get_evolution")
+    def get_evolution(self, eleve_id, matiere=None, par='mois', vue='periode', fenetre=FENETRE_GLISSANTE):
+        # DataFrame indexé par période : moyenne de l'élève et de sa classe
+        # pour une matière (None : toutes), lue dans la vue matérialisée
+        eleve = self._eleves_par_id[eleve_id]
+        with self.lock:
+            cellules_eleve = self.evolution.eleve(eleve_id, lambda: self.get_notes_by_eleve(eleve_id))
+            cellules_classe = self.evolution.classe(eleve.classe, lambda: [
+                n for e in self._eleves_par_classe.get(eleve.classe, ()) for n in self.get_notes_by_eleve(e.id)])
+        return pd.DataFrame({
+            'eleve': serie_evolution(cellules_eleve, matiere, par, vue, fenetre),
+            'classe': serie_evolution(cellules_classe, matiere, par, vue, fenetre),
+        }).sort_index()
+    
+    # --- Notifications ---
+    # Appelées après la libération du verrou : un dépôt dans la boîte d'envoi,
+    # l'envoi lui-même se fait dans le worker
+    
+    def _notifier_notes(self, nouvelles):
+        if self.notifications is None:
+            return
+        par_parent = defaultdict(list)
+        for n in nouvelles:
+            eleve = self._eleves_par_id.get(n.eleve_id)
+            if eleve is not None and eleve.parent_id in self.users:
+                par_parent[eleve.parent_id].append((eleve, n))
+        messages = []
+        for parent_id, notes in par_parent.items():
+            lignes = [f"{eleve.prenom} : {n.note}/20 en {n.matiere} ({n.type_note}, {n.date})"
+                      for eleve, n in notes]
+            messages.append(('notes', self.users[parent_id], "Nouvelles notes", "\n".join(lignes)))
+        self.notifications.notifier(messages)
+    
+    def notifier_notes_importees(self, nb_par_eleve):
+        # Un seul message par parent à la fin d'un import, quel que soit le
+        # nombre de notes et de blocs
+        if self.notifications is None:
+            return
+        par_parent = defaultdict(list)
+        for eleve_id, nombre in nb_par_eleve.items():
+            eleve = self._eleves_par_id.get(eleve_id)
+            if eleve is not None and eleve.parent_id in self.users:
+                par_parent[eleve.parent_id].append(f"{eleve.prenom} : {nombre} nouvelle(s) note(s)")
+        self.notifications.notifier([('notes', self.users[parent_id], "Nouvelles notes",
+                                      "\n".join(lignes) + "\nConsultez l'espace parents pour le détail.")
+                                     for parent_id, lignes in par_parent.items()])
+    
+    def _notifier_parents(self, evenement, classes, sujet, message):
+        # classes None : tous les parents de l'école
+        if self.notifications is None:
+            return
+        if classes is None:
+            parents = {e.parent_id for e in self.eleves}
+        else:
+            parents = {e.parent_id for classe in classes for e in self._eleves_par_classe.get(classe, ())}
+        self.notifications.notifier([(evenement, self.users[p], sujet, message)
+                                     for p in sorted(parents) if p in self.users])
+    
+    def get_version_eleve(self, eleve_id):
+        return self._versions_eleve.get(eleve_id, 0)
+    
+    @chronometre("system.get_activites")
+    def get_activites(self, debut=None, fin=None, classes=None, limite=None, recentes_d_abord=False):
+        # Activités du debut au fin inclus (bornes facultatives), dans l'ordre
+        # chronologique ou l'inverse. Avec classes, seulement celles qui
+        # concernent l'une de ces classes ou toute l'école.
+        if classes is None:
+            calendriers = [self._calendrier]
+        else:
+            calendriers = [self._calendrier_par_classe.get(classe, []) for classe in {*classes, None}]
+        tranches = []
+        for calendrier in calendriers:
+            premier = bisect.bisect_left(calendrier, (debut,)) if debut is not None else 0
+            dernier = bisect.bisect_left(calendrier, (fin + timedelta(days=1),)) if fin is not None \
+                else len(calendrier)
+            tranche = calendrier[premier:dernier]
+            tranches.append(tranche[::-1] if recentes_d_abord else tranche)
+        
+        # Une activité commune à plusieurs classes n'est rendue qu'une fois
+        activites, precedente = [], None
+        for cle in heapq.merge(*tranches, reverse=recentes_d_abord):
+            if cle == precedente:
+                continue
+            precedente = cle
+            activites.append(self._activites_par_id[cle[2]])
+            if limite is not None and len(activites) >= limite:
+                break
+        return activites
+    
+    @chronometre("system.get_rang_by_eleve")
+    def get_rang_by_eleve(self, eleve_id):
+        # (rang, ex_aequo, effectif de la classe) ; rang None si l'élève n'a pas de note
+        eleve = self._eleves_par_id[eleve_id]
+        effectif = len(self._eleves_par_classe[eleve.classe])
+        cle = self._cle_classement.get(eleve_id)
+        classement = self._classements[eleve.classe]
+        position = bisect.bisect_left(classement, cle) if cle is not None else 0
+        if cle is not None and (position == len(classement) or classement[position] != cle):
+            # Lu pendant que _classer replace l'élève : clé et liste d'états
+            # différents, on relit sous le verrou
+            with self.lock:
+                cle = self._cle_classement.get(eleve_id)
+                classement = self._classements[eleve.classe]
+        if cle is None:
+            return None, False, effectif
+        premier = bisect.bisect_left(classement, (cle[0],))
+        dernier = bisect.bisect_right(classement, (cle[0], float('inf')))
+        return premier + 1, dernier - premier > 1, effectif
+    
+    # --- Emplois du temps ---
+    
+    @chronometre("system.get_emploi_du_temps")
+    def get_emploi_du_temps(self, classe):
+        if classe not in self.emplois_du_temps.cours:
+            self._generer_emplois_du_temps([classe])
+        return self.emplois_du_temps.get(classe)
+    
+    def _generer_emplois_du_temps(self, classes):
+        with self.lock:
+            nouveaux = self.emplois_du_temps.generer(classes, self.get_matieres_by_classe)
+            if nouveaux and self.store is not None:
+                self.store.save_emplois_du_temps(nouveaux)
+            if nouveaux:
+                self._journaliser('emplois_du_temps', nouveaux)
+    
+    @chronometre("system.modifier_creneau")
+    def modifier_creneau(self, classe, jour, creneau, matiere, enseignant, salle):
+        # Lève ValueError si l'enseignant ou la salle est déjà pris sur ce créneau
+        with self.lock:
+            conflits = self.emplois_du_temps.verifier_conflits(classe, (jour, creneau), enseignant, salle)
+            if conflits:
+                raise ValueError(" ; ".join(conflits))
+            if self.store is not None:
+                self.store.save_emplois_du_temps([(classe, jour, creneau, matiere, enseignant, salle)])
+            self._journaliser('creneau', [classe, jour, creneau, matiere, enseignant, salle])
+            self.emplois_du_temps.modifier(classe, (jour, creneau), matiere, enseignant, salle)
+        self._notifier_parents('emploi_du_temps', [classe], f"Emploi du temps de la {classe}",
+                               f"{jour} {creneau} : {matiere or 'pas de cours'}"
+                               + (f" avec {enseignant}" if enseignant else "") + (f", {salle}" if salle else "") + ".")
+    
+    @chronometre("system.get_donnees_bulletin")
+    def get_donnees_bulletin(self, eleve_id, trimestre=None):
+        # Données simples (picklables) pour le rendu PDF dans un autre processus.
+        # Avec un trimestre, moyennes et rang ne portent que sur ses notes
+        # (lus dans le cube de statistiques de la classe).
+        eleve = self._eleves_par_id[eleve_id]
+        if trimestre is None:
+            matieres = [{
+                'matiere': matiere,
+                'evaluee': (eleve_id, matiere) in self._sommes_matiere,
+                'moyenne': self.get_moyenne_by_matiere(eleve_id, matiere),
+            } for matiere in self.get_matieres_by_classe(eleve.classe)]
+            moyenne = self.get_moyenne_by_eleve(eleve_id)
+            rang = self.get_rang_by_eleve(eleve_id)
+        else:
+            with self.lock:
+                cube = self._cube(eleve.classe)
+                moyennes = {matiere: cube.moyenne(eleve_id, matiere, trimestre)
+                            for matiere in [None, *self.get_matieres_by_classe(eleve.classe)]}
+                rang = (*cube.rang(eleve.classe, eleve_id, None, trimestre),
+                        len(self._eleves_par_classe[eleve.classe]))
+            matieres = [{'matiere': matiere, 'evaluee': moyenne is not None, 'moyenne': moyenne or 0}
+                        for matiere, moyenne in moyennes.items() if matiere is not None]
+            moyenne = moyennes[None] or 0
+        return {
+            'etablissement': NOM_ETABLISSEMENT,
+            'periode': libelle_periode(trimestre),
+            'eleve': {
+                'id': eleve.id,
+                'nom': eleve.nom,
+                'prenom': eleve.prenom,
+                'classe': eleve.classe,
+                'date_naissance': eleve.date_naissance,
+            },
+            'matieres': matieres,
+            'moyenne': moyenne,
+            'rang': format_rang(*rang),
+        }
+    
+    @chronometre("system.get_statistiques_classe")
+    def get_statistiques_classe(self, classe, matieres=(None,), trimestre=None):
+        # {matière: résumé de la distribution des moyennes, ou None} pour le
+        # trimestre donné (None : l'année) ; matière None : moyenne générale
+        with self.lock:
+            return {matiere: self._cube(classe).resume(classe, matiere, trimestre) for matiere in matieres}
+    
+    def _cube(self, classe):
+        # Sous le verrou : le cube, après construction de la classe si besoin
+        if not self.cube_statistiques.construit(classe):
+            self.cube_statistiques.construire(classe, [
+                (e.id, self.get_notes_by_eleve(e.id)) for e in self._eleves_par_classe.get(classe, ())])
+        return self.cube_statistiques
+    
+    def get_trimestres_classe(self, classe):
+        self.get_statistiques_classe(classe)
+        with self.lock:
+            return self.cube_statistiques.trimestres(classe)
+    
+    @chronometre("system.get_statistiques")
+    def get_statistiques(self):
+        # Moyennes par élève, par classe, par matière et de l'école en une passe ;
+        # le résultat est réutilisé tant qu'aucune écriture n'a eu lieu
+        version = self._version
+        cache = self._cache_statistiques
+        if cache is not None and cache[0] == version:
+            return cache[1]
+        if self.colonnes is not None:
+            statistiques = self.colonnes.statistiques()
+        else:
+            statistiques = self._statistiques_depuis_sommes()
+        self._cache_statistiques = (version, statistiques)
+        return statistiques
+    
+    def _statistiques_depuis_sommes(self):
+        with self.lock:
+            eleves = list(self.eleves)
+            sommes_matiere = dict(self._sommes_matiere)
+        classe_par_eleve = {e.id: e.classe for e in eleves}
+        df_eleves = pd.DataFrame({
+            'eleve_id': [e.id for e in eleves],
+            'classe': [e.classe for e in eleves],
+            'moyenne': [self.get_moyenne_by_eleve(e.id) for e in eleves],
+        })
+        lignes = defaultdict(lambda: [0, 0])
+        for (eleve_id, matiere), (tp, tc) in sommes_matiere.items():
+            ligne = lignes[(classe_par_eleve.get(eleve_id), matiere)]
+            ligne[0] += tp
+            ligne[1] += tc
+        df_matieres = pd.DataFrame(
+            [(classe, matiere, calcul_moyenne(tp, tc)) for (classe, matiere), (tp, tc) in lignes.items()],
+            columns=['classe', 'matiere', 'moyenne'])
+        return assembler_statistiques(df_eleves, df_matieres)
+
+# ============================================
+# STOCKAGE COLONNAIRE DES NOTES
+# ============================================
+
+class ColumnarNoteStore:
+    # Une colonne NumPy par champ ; les matières et les classes sont codées en
+    # entiers. Les lignes sont dans l'ordre des identifiants de note, ce qui
+    # permet de retrouver une ligne par recherche dichotomique.
+    COLONNES = (
+        ('id', np.int64),
+        ('eleve_id', np.int32),
+        ('matiere', np.int16),
+        ('note', np.float64),
+        ('coefficient', np.int8),
+        ('date', np.int32),
+        ('actif', np.bool_),
+    )
+    
+    def __init__(self, capacite=1024):
+        self.n = 0
+        self._colonnes = {nom: np.zeros(capacite, dtype=dtype) for nom, dtype in self.COLONNES}
+        self.matieres = []
+        self._code_matiere = {}
+        self.classes = []
+        self._code_classe = {}
+        # Code de classe indexé par eleve_id (-1 : pas d'élève)
+        self._classe_eleve = np.full(64, -1, dtype=np.int32)
+    
+    def __len__(self):
+        return int(self._colonnes['actif'][:self.n].sum())
+    
+    def _coder(self, valeur, codes, liste):
+        code = codes.get(valeur)
+        if code is None:
+            code = codes[valeur] = len(liste)
+            liste.append(valeur)
+        return code
+    
+    def _reserver(self, nb):
+        # Nouvelles colonnes plus grandes : un lecteur qui tient les anciennes
+        # continue à lire des données valides
+        besoin = self.n + nb
+        capacite = len(self._colonnes['id'])
+        if besoin <= capacite:
+            return
+        capacite = max(besoin, capacite * 2)
+        colonnes = {}
+        for nom, dtype in self.COLONNES:
+            colonne = np.zeros(capacite, dtype=dtype)
+            colonne[:self.n] = self._colonnes[nom][:self.n]
+            colonnes[nom] = colonne
+        self._colonnes = colonnes
+    
+    def set_classe(self, eleve_id, classe):
+        if eleve_id >= len(self._classe_eleve):
+            classe_eleve = np.full(max(eleve_id + 1, len(self._classe_eleve) * 2), -1, dtype=np.int32)
+            classe_eleve[:len(self._classe_eleve)] = self._classe_eleve
+            self._classe_eleve = classe_eleve
+        self._classe_eleve[eleve_id] = self._coder(classe, self._code_classe, self.classes)
+    
+    def append(self, note):
+        self.extend([note.id], [note.eleve_id], [note.matiere], [note.note],
+                    [note.coefficient], [note.date])
+    
+    def extend(self, ids, eleve_ids, matieres, notes, coefficients, dates):
+        nb = len(ids)
+        self._reserver(nb)
+        debut, fin = self.n, self.n + nb
+        c = self._colonnes
+        c['id'][debut:fin] = ids
+        c['eleve_id'][debut:fin] = eleve_ids
+        # Les valeurs distinctes sont peu nombreuses : on code chaque valeur une seule fois
+        codes, valeurs = pd.factorize(np.asarray(matieres, dtype=object))
+        c['matiere'][debut:fin] = np.array(
+            [self._coder(m, self._code_matiere, self.matieres) for m in valeurs], dtype=np.int16)[codes]
+        c['note'][debut:fin] = notes
+        c['coefficient'][debut:fin] = coefficients
+        codes, valeurs = pd.factorize(np.asarray(dates, dtype=object))
+        c['date'][debut:fin] = np.array([date_en_entier(d) for d in valeurs], dtype=np.int32)[codes]
+        c['actif'][debut:fin] = True
+        self.n = fin
+    
+    def _ligne(self, note_id):
+        ids = self._colonnes['id'][:self.n]
+        ligne = int(np.searchsorted(ids, note_id))
+        if ligne >= self.n or ids[ligne] != note_id:
+            raise KeyError(note_id)
+        return ligne
+    
+    def update(self, note_id, champs):
+        ligne = self._ligne(note_id)
+        c = self._colonnes
+        if 'matiere' in champs:
+            c['matiere'][ligne] = self._coder(champs['matiere'], self._code_matiere, self.matieres)
+        if 'note' in champs:
+            c['note'][ligne] = champs['note']
+        if 'coefficient' in champs:
+            c['coefficient'][ligne] = champs['coefficient']
+        if 'date' in champs:
+            c['date'][ligne] = date_en_entier(champs['date'])
+    
+    def remove(self, note_id):
+        self._colonnes['actif'][self._ligne(note_id)] = False
+    
+    def vue(self):
+        # Vues sur les lignes remplies (pas de copie)
+        n = self.n
+        return {nom: colonne[:n] for nom, colonne in self._colonnes.items()}
+    
+    def statistiques(self):
+        c = self.vue()
+        classe_eleve = self._classe_eleve.copy()
+        actif = c['actif']
+        eleve_ids = c['eleve_id'][actif]
+        poids = c['coefficient'][actif].astype(np.float64)
+        ponderes = c['note'][actif] * poids
+        
+        # Moyenne générale par élève : deux bincount sur toute la colonne
+        nb_eleves = len(classe_eleve)
+        somme_ponderee = np.bincount(eleve_ids, weights=ponderes, minlength=nb_eleves)
+        somme_coeff = np.bincount(eleve_ids, weights=poids, minlength=nb_eleves)
+        moyennes = np.round(np.divide(somme_ponderee, somme_coeff, out=np.zeros(nb_eleves),
+                                      where=somme_coeff > 0), 2)
+        inscrits = np.flatnonzero(classe_eleve >= 0)
+        df_eleves = pd.DataFrame({
+            'eleve_id': inscrits,
+            'classe': pd.Categorical.from_codes(classe_eleve[inscrits], categories=self.classes),
+            'moyenne': moyennes[inscrits],
+        })
+        
+        # Moyenne par (classe, matière) : une clé combinée par note
+        nb_matieres = max(len(self.matieres), 1)
+        cles = classe_eleve[eleve_ids].astype(np.int64) * nb_matieres + c['matiere'][actif]
+        taille = len(self.classes) * nb_matieres
+        somme_ponderee = np.bincount(cles, weights=ponderes, minlength=taille)
+        somme_coeff = np.bincount(cles, weights=poids, minlength=taille)
+        nb_notes = np.bincount(cles, minlength=taille)
+        presentes = np.flatnonzero(nb_notes)
+        df_matieres = pd.DataFrame({
+            'classe': [self.classes[i] for i in presentes // nb_matieres],
+            'matiere': [self.matieres[i] for i in presentes % nb_matieres],
+            'moyenne': np.round(somme_ponderee[presentes] / somme_coeff[presentes], 2),
+        })
+        return assembler_statistiques(df_eleves, df_matieres)
+
+# ============================================
+# RECHERCHE D'ÉLÈVES
+# ============================================
+
+@lru_cache(maxsize=8192)
+def normaliser_texte(texte):
+    # Minuscules sans accents : « Kouamé » et « KOUAME » se confondent.
+    # Les noms se répètent beaucoup : le cache évite de les renormaliser.
+    texte = unicodedata.normalize("NFKD", str(texte))
+    return "".join(c for c in texte if not unicodedata.combining(c)).casefold()
+
+def mots_de_recherche(texte):
+    return re.findall(r"[a-z0-9]+", normaliser_texte(texte))
+
+class IndexRecherche:
+    # Index inversé mot -> élèves sur le nom, le prénom, la classe et
+    # l'identifiant. Le vocabulaire est trié (préfixes par dichotomie) et
+    # indexé par trigrammes (fragment au milieu d'un mot : « ouam » -> Kouamé).
+    # Chaque liste d'élèves est triée par (nom, prénom, id) : les premiers
+    # résultats d'un mot s'obtiennent par fusion paresseuse des listes, sans
+    # parcourir tous les élèves. Pour plusieurs mots, les candidats sont
+    # l'intersection des ensembles d'identifiants de chaque mot.
+    # Les élèves ajoutés ne sont indexés qu'à la recherche suivante : un
+    # démarrage n'attend pas la construction de l'index.
+    EXACT, PREFIXE, FRAGMENT = 3, 2, 1
+    
+    def __init__(self):
+        self._postings = {}  # mot -> clés (nom, prénom, id) triées
+        self._ids_par_mot = {}  # mot -> identifiants
+        self._mots = []  # vocabulaire trié (remplacé, jamais modifié)
+        self._trigrammes = defaultdict(set)  # trigramme -> mots du vocabulaire
+        self._cles = {}  # id -> clé de tri
+        self._en_attente = []
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._cles) + len(self._en_attente)
+    
+    def ajouter(self, eleves):
+        with self._lock:
+            self._en_attente.extend(eleves)
+    
+    def _a_jour(self):
+        if self._en_attente:
+            with self._lock:
+                eleves, self._en_attente = self._en_attente, []
+                self._indexer(eleves)
+    
+    def _indexer(self, eleves):
+        nouvelles = defaultdict(list)
+        for eleve in eleves:
+            cle = (normaliser_texte(eleve.nom), normaliser_texte(eleve.prenom), eleve.id)
+            mots = set()
+            for champ in (eleve.nom, eleve.prenom):
+                mots_champ = mots_de_recherche(champ)
+                mots.update(mots_champ)
+                # « N'Guessan » se trouve aussi en tapant « nguessan »
+                if len(mots_champ) > 1:
+                    mots.add("".join(mots_champ))
+            mots.update(mots_de_recherche(eleve.classe))
+            self._cles[eleve.id] = cle
+            for mot in mots:
+                nouvelles[mot].append(cle)
+        nouveaux_mots = [mot for mot in nouvelles if mot not in self._postings]
+        for mot, cles in nouvelles.items():
+            if mot not in self._postings:
+                self._postings[mot] = sorted(cles)
+                self._ids_par_mot[mot] = {cle[2] for cle in cles}
+                continue
+            # Un lecteur qui parcourt la liste pendant une insertion peut voir
+            # un élève deux fois : les résultats sont dédoublonnés
+            if len(cles) == 1:
+                bisect.insort(self._postings[mot], cles[0])
+            else:
+                self._postings[mot] = sorted(self._postings[mot] + cles)
+            self._ids_par_mot[mot].update(cle[2] for cle in cles)
+        if nouveaux_mots:
+            for mot in nouveaux_mots:
+                for i in range(len(mot) - 2):
+                    self._trigrammes[mot[i:i + 3]].add(mot)
+            self._mots = sorted(self._mots + nouveaux_mots)
+    
+    def rechercher(self, texte, limite=50, accepter=None):
+        # Identifiants des élèves correspondant à tous les mots de la requête,
+        # classés par qualité (mot exact > préfixe > fragment) puis par nom
+        self._a_jour()
+        termes = list(dict.fromkeys(mots_de_recherche(texte)))
+        correspondances = [self._correspondances(terme) for terme in termes]
+        if not correspondances or not all(correspondances):
+            return []
+        if len(correspondances) == 1:
+            return self._premiers(correspondances[0], limite, accepter)
+        # Plusieurs mots : candidats par intersection d'ensembles, en partant
+        # du terme le plus rare ; le score de chaque terme se lit aussi par
+        # intersection, du meilleur niveau de correspondance au moins bon
+        ensembles = sorted(([self._ids_du_mot(mot) for mot in qualites] for qualites in correspondances),
+                           key=lambda termes: sum(map(len, termes)))
+        candidats = ensembles[0][0] if len(ensembles[0]) == 1 else set().union(*ensembles[0])
+        for termes in ensembles[1:]:
+            candidats = candidats & termes[0] if len(termes) == 1 else \
+                set().union(*(candidats & ids for ids in termes))
+            if not candidats:
+                return []
+        if accepter is not None:
+            candidats = set(filter(accepter, candidats))
+        cles = self._cles
+        if all(len(set(qualites.values())) == 1 for qualites in correspondances):
+            # Un seul niveau de correspondance par terme : même score partout
+            return [cle[2] for cle in heapq.nsmallest(limite, map(cles.__getitem__, candidats))]
+        scores = dict.fromkeys(candidats, 0)
+        for qualites in correspondances:
+            meilleures = {}
+            for mot, qualite in sorted(qualites.items(), key=lambda item: -item[1]):
+                for eleve_id in candidats & self._ids_du_mot(mot):
+                    meilleures.setdefault(eleve_id, qualite)
+            for eleve_id, qualite in meilleures.items():
+                scores[eleve_id] -= qualite
+        return [cle[2] for _, cle in heapq.nsmallest(limite, [(score, cles[eleve_id])
+                                                            for eleve_id, score in scores.items()])]
+    
+    def _correspondances(self, terme):
+        # {mot du vocabulaire: qualité} pour un terme de la requête
+        qualites = {}
+        if terme in self._postings or (terme.isdigit() and int(terme) in self._cles):
+            qualites[terme] = self.EXACT
+        mots = self._mots
+        for mot in mots[bisect.bisect_left(mots, terme):bisect.bisect_left(mots, terme + "\uffff")]:
+            qualites.setdefault(mot, self.PREFIXE)
+        if len(terme) >= 3:
+            for mot in set.intersection(*[self._trigrammes.get(terme[i:i + 3], set())
+                                          for i in range(len(terme) - 2)]):
+                if terme in mot:
+                    qualites.setdefault(mot, self.FRAGMENT)
+        return qualites
+    
+    # L'identifiant n'est pas dans le vocabulaire : pas de recherche par
+    # préfixe sur les numéros, seulement la correspondance exacte
+    
+    def _eleves_du_mot(self, mot):
+        cles = self._postings.get(mot, [])
+        if mot.isdigit() and int(mot) in self._cles:
+            cles = sorted(cles + [self._cles[int(mot)]])
+        return cles
+    
+    def _ids_du_mot(self, mot):
+        ids = self._ids_par_mot.get(mot, set())
+        if mot.isdigit() and int(mot) in self._cles:
+            ids = ids | {int(mot)}
+        return ids
+    
+    def _premiers(self, qualites, limite, accepter):
+        vus, resultats = set(), []
+        for niveau in (self.EXACT, self.PREFIXE, self.FRAGMENT):
+            listes = [self._eleves_du_mot(mot) for mot, qualite in qualites.items() if qualite == niveau]
+            for cle in heapq.merge(*listes):
+                eleve_id = cle[2]
+                if eleve_id in vus or (accepter is not None and not accepter(eleve_id)):
+                    continue
+                vus.add(eleve_id)
+                resultats.append(eleve_id)
+                if len(resultats) >= limite:
+                    return resultats
+        return resultats
+
+# ============================================
+# ÉVOLUTION DES NOTES
+# ============================================
+# Vue matérialisée des sommes (Σ note × coeff, Σ coeff) par (matière, mois),
+# la matière None regroupant toutes les matières, pour un élève et pour sa
+# classe. Une entrée est construite à la première consultation puis tenue à
+# jour à chaque note ajoutée ; après une modification ou une suppression elle
+# est reconstruite à la consultation suivante (pas de soustraction, comme
+# _recalculer_sommes). Les trimestres se déduisent des mois à la lecture.
+
+VUES_EVOLUTION = {'periode': "Par période", 'cumulee': "Cumulée", 'glissante': "Glissante"}
+
+def mois_de(date_note):
+    return str(date_note)[:7]
+
+def trimestre_de(mois):
+    # Année scolaire : T1 septembre-décembre, T2 janvier-mars, T3 avril-août
+    annee, numero_mois = int(mois[:4]), int(mois[5:7])
+    debut = annee if numero_mois >= 9 else annee - 1
+    trimestre = 1 if numero_mois >= 9 else 2 if numero_mois <= 3 else 3
+    return f"{debut}-{debut + 1} T{trimestre}"
+
+def trimestres_annee(annee_scolaire=ANNEE_SCOLAIRE):
+    return [f"{annee_scolaire} T{numero}" for numero in (1, 2, 3)]
+
+def libelle_periode(trimestre=None):
+    # « 2023-2024 T2 » -> « 2e trimestre 2023-2024 » ; None : l'année entière
+    if trimestre is None:
+        return f"Année scolaire {ANNEE_SCOLAIRE}"
+    annee, numero = trimestre.split(" T")
+    return f"{numero}{'er' if numero == '1' else 'e'} trimestre {annee}"
+
+def cumuler_par_mois(cellules, notes):
+    for n in notes:
+        mois = mois_de(n.date)
+        pondere = n.note * n.coefficient
+        for cle in ((n.matiere, mois), (None, mois)):
+            tp, tc = cellules.get(cle, (0, 0))
+            cellules[cle] = (tp + pondere, tc + n.coefficient)
+    return cellules
+
+def serie_evolution(cellules, matiere=None, par='mois', vue='periode', fenetre=FENETRE_GLISSANTE):
+    # Moyennes pondérées par période ('mois' ou 'trimestre') : notes de la
+    # période, cumul depuis le début, ou fenêtre glissante des dernières périodes
+    sommes = defaultdict(lambda: [0.0, 0])
+    for (m, mois), (tp, tc) in cellules.items():
+        if m == matiere:
+            periode = mois if par == 'mois' else trimestre_de(mois)
+            sommes[periode][0] += tp
+            sommes[periode][1] += tc
+    periodes = sorted(sommes)
+    tp = np.array([sommes[p][0] for p in periodes], dtype=float)
+    tc = np.array([sommes[p][1] for p in periodes], dtype=float)
+    if vue in ('cumulee', 'glissante'):
+        tp, tc = tp.cumsum(), tc.cumsum()
+        if vue == 'glissante' and len(periodes) > fenetre:
+            tp[fenetre:] -= tp[:-fenetre].copy()
+            tc[fenetre:] -= tc[:-fenetre].copy()
+    elif vue != 'periode':
+        raise ValueError(f"Vue inconnue : {vue}")
+    return pd.Series(np.round(tp / tc, 2), index=pd.Index(periodes, name='periode'), dtype=float)
+
+class EvolutionNotes:
+    # Cellules par élève et par classe ; modifiées sous le verrou du système
+    
+    def __init__(self):
+        self._eleves = {}
+        self._classes = {}
+    
+    def eleve(self, eleve_id, notes):
+        # notes : fonction appelée seulement si l'entrée n'existe pas encore
+        if eleve_id not in self._eleves:
+            self._eleves[eleve_id] = cumuler_par_mois({}, notes())
+        return dict(self._eleves[eleve_id])
+    
+    def classe(self, classe, notes):
+        if classe not in self._classes:
+            self._classes[classe] = cumuler_par_mois({}, notes())
+        return dict(self._classes[classe])
+    
+    def ajouter(self, notes, classe_de):
+        for n in notes:
+            if n.eleve_id in self._eleves:
+                cumuler_par_mois(self._eleves[n.eleve_id], (n,))
+            classe = classe_de(n.eleve_id)
+            if classe in self._classes:
+                cumuler_par_mois(self._classes[classe], (n,))
+    
+    def invalider(self, eleve_id, classe):
+        self._eleves.pop(eleve_id, None)
+        self._classes.pop(classe, None)
+    
+    def vider(self):
+        self._eleves.clear()
+        self._classes.clear()
+
+# ============================================
+# STATISTIQUES PAR CLASSE
+# ============================================
+# Cube (classe, matière, trimestre) -> distribution des moyennes des élèves :
+# effectif, moyenne, extrêmes, écart-type, quartiles et histogramme. Matière
+# ou trimestre None : toutes les matières, toute l'année. Le cube d'une classe
+# est construit à sa première consultation ; ensuite, chaque écriture de note
+# recalcule les moyennes de l'élève concerné et déplace ses valeurs dans les
+# cellules : afficher une vue n'est qu'une lecture.
+
+LARGEUR_CLASSE_HISTOGRAMME = 2  # points
+NB_CLASSES_HISTOGRAMME = 20 // LARGEUR_CLASSE_HISTOGRAMME
+
+def moyennes_par_periode(notes):
+    # {(matière, trimestre): moyenne arrondie en centièmes}, moyennes
+    # générales et annuelles comprises
+    sommes = {}
+    for n in notes:
+        trimestre = trimestre_de(mois_de(n.date))
+        pondere = n.note * n.coefficient
+        for cle in ((n.matiere, trimestre), (n.matiere, None), (None, trimestre), (None, None)):
+            tp, tc = sommes.get(cle, (0, 0))
+            sommes[cle] = (tp + pondere, tc + n.coefficient)
+    return {cle: round(calcul_moyenne(tp, tc) * 100) for cle, (tp, tc) in sommes.items() if tc > 0}
+
+class CelluleStatistiques:
+    # Moyennes en centièmes (entiers) : sommes et sommes des carrés exactes,
+    # retirer une valeur ne laisse pas d'erreur d'arrondi
+    __slots__ = ('valeurs', 'somme', 'somme_carres', 'histogramme')
+    
+    def __init__(self):
+        self.valeurs = []  # triées
+        self.somme = 0
+        self.somme_carres = 0
+        self.histogramme = [0] * NB_CLASSES_HISTOGRAMME
+    
+    def __len__(self):
+        return len(self.valeurs)
+    
+    @staticmethod
+    def _classe(valeur):
+        return min(valeur // (LARGEUR_CLASSE_HISTOGRAMME * 100), NB_CLASSES_HISTOGRAMME - 1)
+    
+    def ajouter(self, valeur):
+        bisect.insort(self.valeurs, valeur)
+        self.somme += valeur
+        self.somme_carres += valeur * valeur
+        self.histogramme[self._classe(valeur)] += 1
+    
+    def retirer(self, valeur):
+        del self.valeurs[bisect.bisect_left(self.valeurs, valeur)]
+        self.somme -= valeur
+        self.somme_carres -= valeur * valeur
+        self.histogramme[self._classe(valeur)] -= 1
+    
+    def _quantile(self, q):
+        # Interpolation linéaire, comme numpy.quantile
+        position = (len(self.valeurs) - 1) * q
+        bas = math.floor(position)
+        haut = min(bas + 1, len(self.valeurs) - 1)
+        return (self.valeurs[bas] + (self.valeurs[haut] - self.valeurs[bas]) * (position - bas)) / 100
+    
+    def resume(self):
+        effectif = len(self.valeurs)
+        variance = (effectif * self.somme_carres - self.somme ** 2) / effectif ** 2
+        return {
+            'effectif': effectif,
+            'moyenne': round(self.somme / effectif / 100, 2),
+            'min': self.valeurs[0] / 100,
+            'max': self.valeurs[-1] / 100,
+            'ecart_type': round(math.sqrt(variance) / 100, 2),
+            'q1': round(self._quantile(0.25), 2),
+            'mediane': round(self._quantile(0.5), 2),
+            'q3': round(self._quantile(0.75), 2),
+            'histogramme': [(i * LARGEUR_CLASSE_HISTOGRAMME, (i + 1) * LARGEUR_CLASSE_HISTOGRAMME, nombre)
+                            for i, nombre in enumerate(self.histogramme)],
+        }
+
+class CubeStatistiques:
+    # Modifié et lu sous le verrou du système
+    
+    def __init__(self):
+        self._classes = {}  # classe -> {(matière, trimestre): CelluleStatistiques}
+        self._valeurs = {}  # eleve_id -> {(matière, trimestre): centièmes}
+    
+    def construit(self, classe):
+        return classe in self._classes
+    
+    def construire(self, classe, notes_par_eleve):
+        # notes_par_eleve : (eleve_id, notes) de chaque élève de la classe
+        self._classes[classe] = {}
+        for eleve_id, notes in notes_par_eleve:
+            self.mettre_a_jour(classe, eleve_id, notes)
+    
+    def mettre_a_jour(self, classe, eleve_id, notes):
+        # notes : toutes les notes de l'élève après l'écriture
+        cellules = self._classes.get(classe)
+        if cellules is None:
+            return
+        anciennes = self._valeurs.get(eleve_id, {})
+        nouvelles = moyennes_par_periode(notes)
+        for cle, valeur in anciennes.items():
+            if nouvelles.get(cle) != valeur:
+                cellules[cle].retirer(valeur)
+                if not cellules[cle]:
+                    del cellules[cle]
+        for cle, valeur in nouvelles.items():
+            if anciennes.get(cle) != valeur:
+                cellules.setdefault(cle, CelluleStatistiques()).ajouter(valeur)
+        self._valeurs[eleve_id] = nouvelles
+    
+    def resume(self, classe, matiere=None, trimestre=None):
+        cellule = self._classes[classe].get((matiere, trimestre))
+        return cellule.resume() if cellule else None
+    
+    def moyenne(self, eleve_id, matiere=None, trimestre=None):
+        # Moyenne de l'élève (classe construite), None s'il n'a pas de note
+        centiemes = self._valeurs.get(eleve_id, {}).get((matiere, trimestre))
+        return None if centiemes is None else centiemes / 100
+    
+    def rang(self, classe, eleve_id, matiere=None, trimestre=None):
+        # (rang, ex_aequo) parmi les moyennes de la cellule, comme get_rang_by_eleve
+        valeur = self._valeurs.get(eleve_id, {}).get((matiere, trimestre))
+        if valeur is None:
+            return None, False
+        valeurs = self._classes[classe][(matiere, trimestre)].valeurs
+        premier, dernier = bisect.bisect_left(valeurs, valeur), bisect.bisect_right(valeurs, valeur)
+        return len(valeurs) - dernier + 1, dernier - premier > 1
+    
+    def trimestres(self, classe):
+        return sorted({trimestre for _, trimestre in self._classes[classe] if trimestre is not None})
+    
+    def vider(self):
+        self._classes.clear()
+        self._valeurs.clear()
+
+# ============================================
+# EMPLOIS DU TEMPS
+# ============================================
+
+JOURS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi"]
+CRENEAUX = ["8h-10h", "10h-12h", "Pause", "14h-16h", "16h-18h"]
+
+def creneaux_du_jour(jour):
+    # Demi-journée le samedi ; la pause n'est pas un créneau de cours
+    creneaux = CRENEAUX[:2] if jour == "Samedi" else CRENEAUX
+    return [c for c in creneaux if c != "Pause"]
+
+CRENEAUX_SEMAINE = [(jour, creneau) for jour in JOURS for creneau in creneaux_du_jour(jour)]
+
+class EmploiDuTemps:
+    # Génère une fois pour toutes l'emploi du temps de chaque classe, sans
+    # qu'un enseignant ou une salle soit pris deux fois sur le même créneau.
+    # Les cartes (jour, créneau) -> enseignant / salle -> classe rendent
+    # chaque vérification de conflit immédiate.
+    
+    # Poids hebdomadaires, ramenés au nombre de créneaux de la semaine
+    HEURES = {'Mathématiques': 4, 'Français': 4, 'Anglais': 3, 'Histoire-Géo': 3, 'SVT': 2,
+              'Physique-Chimie': 3, 'EPS': 2, 'Philosophie': 3, 'Spécialité': 3}
+    MAX_CRENEAUX_PROF = 18
+    PROFS = {
+        '6ème-5ème': ['Koné', 'Traoré', 'Yao'],
+        '4ème-3ème': ['Cissé', 'Bamba', 'Diaby'],
+        'Lycée': ['Yao', 'Touré', 'Kouamé'],
+    }
+    AUTRES_NOMS = ['Kouassi', 'Konan', 'Ouattara', 'Coulibaly', 'Diallo', 'Sangaré', 'Fofana',
+                   'Kamagaté', "N'Guessan", 'Aka', 'Dosso', 'Tanoh', 'Assi', 'Brou', 'Yapi',
+                   'Zadi', 'Gnagne', 'Kacou', 'Bakayoko', 'Sylla', 'Camara', 'Keïta', 'Soro', 'Doumbia']
+    SALLES = {'6ème-5ème': range(1, 20), '4ème-3ème': range(20, 30), 'Lycée': range(30, 41)}
+    # Laboratoires au collège pour les sciences, amphithéâtre au lycée pour la philosophie
+    SALLES_SPECIALES = {
+        ('4ème-3ème', 'SVT'): 'Labo',
+        ('4ème-3ème', 'Physique-Chimie'): 'Labo',
+        ('Lycée', 'Philosophie'): 'Amphi',
+    }
+    
+    def __init__(self, seed=0):
+        self._rng = random.Random(seed)
+        self.cours = {}  # classe -> {(jour, créneau): {'matiere', 'enseignant', 'salle'}}
+        self._lignes = {}  # classe -> lignes prêtes à afficher
+        self._prof_par_creneau = defaultdict(dict)
+        self._salle_par_creneau = defaultdict(dict)
+        self._prof_de = {}  # (classe, matière) -> enseignant
+        self._charge_prof = defaultdict(int)
+        self._profs_par_matiere = defaultdict(list)  # (groupe, matière) -> enseignants
+        self._noms_pris = set()
+        self._salle_de_classe = {}
+        self._salles_prises = set()
+        self._salles_speciales = {'Labo': ['Labo A', 'Labo B', 'Labo C'],
+                                  'Amphi': ['Amphi 1', 'Amphi 2', 'Amphi 3']}
+    
+    # --- Ressources ---
+    
+    def _nouveau_prof(self, groupe):
+        for nom in self.PROFS[groupe] + self.AUTRES_NOMS:
+            if f"Prof. {nom}" not in self._noms_pris:
+                break
+        else:
+            nom = f"{self.AUTRES_NOMS[len(self._noms_pris) % len(self.AUTRES_NOMS)]} {len(self._noms_pris)}"
+        prof = f"Prof. {nom}"
+        self._noms_pris.add(prof)
+        return prof
+    
+    def _prof_pour(self, classe, groupe, matiere, heures):
+        cle = (classe, matiere)
+        if cle not in self._prof_de:
+            for prof in self._profs_par_matiere[(groupe, matiere)]:
+                if self._charge_prof[prof] + heures <= self.MAX_CRENEAUX_PROF:
+                    break
+            else:
+                prof = self._nouveau_prof(groupe)
+                self._profs_par_matiere[(groupe, matiere)].append(prof)
+            self._prof_de[cle] = prof
+            self._charge_prof[prof] += heures
+        return self._prof_de[cle]
+    
+    def _salle_pour(self, classe, groupe):
+        if classe not in self._salle_de_classe:
+            numero = next((n for n in self.SALLES[groupe] if f"Salle {n}" not in self._salles_prises),
+                          None)
+            if numero is None:
+                # Plus de classes que de salles prévues : salles supplémentaires
+                numero = 41
+                while f"Salle {numero}" in self._salles_prises:
+                    numero += 1
+            salle = f"Salle {numero}"
+            self._salles_prises.add(salle)
+            self._salle_de_classe[classe] = salle
+        return self._salle_de_classe[classe]
+    
+    def _salles_possibles(self, classe, groupe, matiere):
+        genre = self.SALLES_SPECIALES.get((groupe, matiere))
+        if genre is None:
+            return [self._salle_pour(classe, groupe)]
+        return self._salles_speciales[genre]
+    
+    def _repartir(self, matieres):
+        # Plus grands restes : la somme des heures vaut exactement le nombre de créneaux
+        poids = [self.HEURES.get(m, 2) for m in matieres]
+        total = sum(poids)
+        exact = [p * len(CRENEAUX_SEMAINE) / total for p in poids]
+        heures = [int(x) for x in exact]
+        reste = len(CRENEAUX_SEMAINE) - sum(heures)
+        for i in sorted(range(len(matieres)), key=lambda i: exact[i] - heures[i], reverse=True)[:reste]:
+            heures[i] += 1
+        return dict(zip(matieres, heures))
+    
+    # --- Génération ---
+    
+    def generer(self, classes, matieres_par_classe):
+        # Renvoie les nouveaux cours (classe, jour, créneau, matière, enseignant, salle)
+        nouveaux = []
+        for classe in classes:
+            if classe in self.cours:
+                continue
+            groupe = groupe_de_classe(classe)
+            heures = self._repartir(matieres_par_classe(classe))
+            for tentative in range(50):
+                if tentative == 25:
+                    # Enseignants trop chargés : la classe reçoit ses propres enseignants
+                    for matiere, h in heures.items():
+                        if (classe, matiere) in self._prof_de:
+                            self._charge_prof[self._prof_de.pop((classe, matiere))] -= h
+                        prof = self._nouveau_prof(groupe)
+                        self._profs_par_matiere[(groupe, matiere)].append(prof)
+                        self._prof_de[(classe, matiere)] = prof
+                        self._charge_prof[prof] += h
+                placement = self._placer(classe, groupe, heures)
+                if placement is not None:
+                    break
+            else:
+                raise RuntimeError(f"Impossible de générer l'emploi du temps de {classe}")
+            for creneau, cours in placement.items():
+                self._affecter(classe, creneau, cours)
+                nouveaux.append((classe, *creneau, cours['matiere'], cours['enseignant'], cours['salle']))
+        return nouveaux
+    
+    def _placer(self, classe, groupe, heures):
+        lecons = [m for m, h in heures.items() for _ in range(h)]
+        self._rng.shuffle(lecons)
+        # Les matières à salle spéciale d'abord : ce sont les plus contraintes
+        lecons.sort(key=lambda m: (groupe, m) not in self.SALLES_SPECIALES)
+        libres = list(CRENEAUX_SEMAINE)
+        par_jour = defaultdict(int)
+        placement = {}
+        for matiere in lecons:
+            prof = self._prof_pour(classe, groupe, matiere, heures[matiere])
+            salles = self._salles_possibles(classe, groupe, matiere)
+            candidats = []
+            for creneau in libres:
+                if prof in self._prof_par_creneau[creneau]:
+                    continue
+                salle = next((s for s in salles if s not in self._salle_par_creneau[creneau]), None)
+                candidats.append((salle is None, par_jour[(matiere, creneau[0])], self._rng.random(),
+                                  creneau, salle))
+            if not candidats:
+                return None
+            sans_salle, _, _, creneau, salle = min(candidats)
+            if sans_salle:
+                # Toutes les salles spéciales sont prises sur les créneaux possibles
+                genre = self.SALLES_SPECIALES[(groupe, matiere)]
+                salle = f"{genre} {len(self._salles_speciales[genre]) + 1}"
+                self._salles_speciales[genre].append(salle)
+            libres.remove(creneau)
+            par_jour[(matiere, creneau[0])] += 1
+            placement[creneau] = {'matiere': matiere, 'enseignant': prof, 'salle': salle}
+        return placement
+    
+    def _affecter(self, classe, creneau, cours):
+        # Copie sur écriture : get() peut lire la classe sans verrou
+        emploi = dict(self.cours.get(classe, {}))
+        emploi[creneau] = cours
+        self.cours[classe] = emploi
+        self._prof_par_creneau[creneau][cours['enseignant']] = classe
+        self._salle_par_creneau[creneau][cours['salle']] = classe
+        self._lignes.pop(classe, None)
+    
+    def charger(self, lignes):
+        # Reconstruit les cartes à partir des cours enregistrés
+        for classe, jour, creneau, matiere, enseignant, salle in lignes:
+            groupe = groupe_de_classe(classe)
+            self._affecter(classe, (jour, creneau),
+                           {'matiere': matiere, 'enseignant': enseignant, 'salle': salle})
+            self._noms_pris.add(enseignant)
+            if (classe, matiere) not in self._prof_de:
+                self._prof_de[(classe, matiere)] = enseignant
+                if enseignant not in self._profs_par_matiere[(groupe, matiere)]:
+                    self._profs_par_matiere[(groupe, matiere)].append(enseignant)
+            self._charge_prof[enseignant] += 1
+            genre = self.SALLES_SPECIALES.get((groupe, matiere))
+            if genre is None:
+                self._salle_de_classe.setdefault(classe, salle)
+                self._salles_prises.add(salle)
+            elif salle not in self._salles_speciales[genre]:
+                self._salles_speciales[genre].append(salle)
+    
+    # --- Consultation et modifications ---
+    
+    def get(self, classe):
+        lignes = self._lignes.get(classe)
+        if lignes is None:
+            cours = self.cours.get(classe, {})
+            lignes = [{
+                'Jour': jour,
+                'Créneau': creneau,
+                'Matière': cours[(jour, creneau)]['matiere'],
+                'Enseignant': cours[(jour, creneau)]['enseignant'],
+                'Salle': cours[(jour, creneau)]['salle'],
+            } for jour, creneau in CRENEAUX_SEMAINE if (jour, creneau) in cours]
+            self._lignes[classe] = lignes
+        return lignes
+    
+    def enseignants(self):
+        return sorted(prof for prof, charge in list(self._charge_prof.items()) if charge > 0)
+    
+    def verifier_conflits(self, classe, creneau, enseignant, salle):
+        conflits = []
+        if creneau not in CRENEAUX_SEMAINE:
+            conflits.append(f"{creneau[0]} {creneau[1]} n'est pas un créneau de cours")
+            return conflits
+        autre = self._prof_par_creneau[creneau].get(enseignant)
+        if autre is not None and autre != classe:
+            conflits.append(f"{enseignant} a déjà cours avec la {autre} ({creneau[0]} {creneau[1]})")
+        autre = self._salle_par_creneau[creneau].get(salle)
+        if autre is not None and autre != classe:
+            conflits.append(f"{salle} est déjà occupée par la {autre} ({creneau[0]} {creneau[1]})")
+        return conflits
+    
+    def modifier(self, classe, creneau, matiere, enseignant, salle):
+        conflits = self.verifier_conflits(classe, creneau, enseignant, salle)
+        if conflits:
+            raise ValueError(" ; ".join(conflits))
+        ancien = self.cours.get(classe, {}).get(creneau)
+        if ancien is not None:
+            del self._prof_par_creneau[creneau][ancien['enseignant']]
+            del self._salle_par_creneau[creneau][ancien['salle']]
+            self._charge_prof[ancien['enseignant']] -= 1
+        self._charge_prof[enseignant] += 1
+        self._affecter(classe, creneau, {'matiere': matiere, 'enseignant': enseignant, 'salle': salle})
+
+# ============================================
+# STOCKAGE SQLITE
+# ============================================
+
+class SQLiteStore:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL,
+        nom TEXT,
+        prenom TEXT,
+        email TEXT,
+        telephone TEXT
+    );
+    CREATE TABLE IF NOT EXISTS eleves (
+        id INTEGER PRIMARY KEY,
+        nom TEXT NOT NULL,
+        prenom TEXT NOT NULL,
+        classe TEXT NOT NULL,
+        date_naissance TEXT,
+        parent_id TEXT
+    );
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY,
+        eleve_id INTEGER NOT NULL REFERENCES eleves(id),
+        matiere TEXT NOT NULL,
+        note REAL NOT NULL,
+        coefficient INTEGER NOT NULL,
+        type_note TEXT,
+        date TEXT,
+        enseignant TEXT
+    );
+    CREATE TABLE IF NOT EXISTS activites (
+        id INTEGER PRIMARY KEY,
+        titre TEXT NOT NULL,
+        description TEXT,
+        type_activite TEXT,
+        date TEXT,
+        heure TEXT,
+        lieu TEXT,
+        organisateur TEXT,
+        classes_concernees TEXT
+    );
+    CREATE TABLE IF NOT EXISTS emplois_du_temps (
+        classe TEXT NOT NULL,
+        jour TEXT NOT NULL,
+        creneau TEXT NOT NULL,
+        matiere TEXT NOT NULL,
+        enseignant TEXT NOT NULL,
+        salle TEXT NOT NULL,
+        PRIMARY KEY (classe, jour, creneau)
+    );
+    -- (eleve_id, matiere) sert aussi les recherches sur eleve_id seul (préfixe)
+    CREATE INDEX IF NOT EXISTS idx_notes_eleve_matiere ON notes(eleve_id, matiere);
+    CREATE INDEX IF NOT EXISTS idx_eleves_classe ON eleves(classe);
+    CREATE INDEX IF NOT EXISTS idx_eleves_parent ON eleves(parent_id);
+    """
+    
+    def __init__(self, path, pool_size=4):
+        self.path = path
+        # Pool de connexions partagé entre les threads des sessions Streamlit
+        self._pool = queue.Queue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self.connexion() as conn:
+            conn.executescript(self.SCHEMA)
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+    
+    @contextmanager
+    def connexion(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+    
+    @contextmanager
+    def transaction(self):
+        with self.connexion() as conn:
+            with conn:  # commit, ou rollback en cas d'exception
+                yield conn
+    
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get().close()
+    
+    # --- Écritures ---
+    
+    def insert_user(self, user):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (user.username, user.password_hash, user.role, user.nom,
+                          user.prenom, user.email, user.telephone))
+    
+    def insert_eleves(self, lignes):
+        with self.transaction() as conn:
+            ids = []
+            for ligne in lignes:
+                cur = conn.execute(
+                    "INSERT INTO eleves (nom, prenom, classe, date_naissance, parent_id) "
+                    "VALUES (:nom, :prenom, :classe, :date_naissance, :parent_id)", ligne)
+                ids.append(cur.lastrowid)
+            return ids
+    
+    def insert_notes(self, lignes):
+        # Toutes les notes dans une seule transaction (un seul commit)
+        with self.transaction() as conn:
+            ids = []
+            for ligne in lignes:
+                cur = conn.execute(
+                    "INSERT INTO notes (eleve_id, matiere, note, coefficient, type_note, date, enseignant) "
+                    "VALUES (:eleve_id, :matiere, :note, :coefficient, :type_note, :date, :enseignant)",
+                    ligne)
+                ids.append(cur.lastrowid)
+            return ids
+    
+    def insert_activite(self, titre, description, type_activite, date, heure, lieu,
+                        organisateur, classes_concernées):
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "INSERT INTO activites (titre, description, type_activite, date, heure, lieu, "
+                "organisateur, classes_concernees) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (titre, description, type_activite, date.isoformat(),
+                 heure.strftime("%H:%M") if heure else None, lieu, organisateur,
+                 json.dumps(classes_concernées, ensure_ascii=False)))
+            return cur.lastrowid
+    
+    def update_note(self, note_id, champs):
+        colonnes = ", ".join(f"{champ} = ?" for champ in champs)
+        with self.transaction() as conn:
+            conn.execute(f"UPDATE notes SET {colonnes} WHERE id = ?", (*champs.values(), note_id))
+    
+    def delete_note(self, note_id):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+    
+    def insert_en_masse(self, eleves, notes):
+        # Données générées : identifiants déjà attribués, une seule transaction
+        with self.transaction() as conn:
+            conn.executemany("INSERT INTO eleves VALUES (?, ?, ?, ?, ?, ?)",
+                             ((e.id, e.nom, e.prenom, e.classe, e.date_naissance, e.parent_id) for e in eleves))
+            conn.executemany("INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", notes)
+    
+    def save_emplois_du_temps(self, lignes):
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO emplois_du_temps VALUES (?, ?, ?, ?, ?, ?)", lignes)
+    
+    # --- Lectures ---
+    
+    def is_empty(self):
+        with self.connexion() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+    
+    def load_users(self):
+        with self.connexion() as conn:
+            return {row[0]: User(*row) for row in conn.execute("SELECT * FROM users")}
+    
+    def load_eleves(self):
+        with self.connexion() as conn:
+            return [Eleve(*row) for row in conn.execute("SELECT * FROM eleves ORDER BY id")]
+    
+    def load_activites(self):
+        with self.connexion() as conn:
+            rows = conn.execute("SELECT * FROM activites ORDER BY id").fetchall()
+        return [Activite(activite_id, titre, description, type_activite, lire_date(date_activite),
+                         lire_heure(heure), lieu, organisateur, json.loads(classes or "[]"))
+                for activite_id, titre, description, type_activite, date_activite, heure, lieu, organisateur, classes
+                in rows]
+    
+    def load_emplois_du_temps(self):
+        with self.connexion() as conn:
+            return conn.execute("SELECT classe, jour, creneau, matiere, enseignant, salle "
+                                "FROM emplois_du_temps").fetchall()
+    
+    def get_notes_by_eleve(self, eleve_id):
+        # Ordre des identifiants, comme en mémoire : l'index (eleve_id, matiere)
+        # rendrait sinon les notes groupées par matière
+        with self.connexion() as conn:
+            return [Note(*row) for row in
+                    conn.execute("SELECT * FROM notes WHERE eleve_id = ? ORDER BY id", (eleve_id,))]
+    
+    def get_notes_by_matiere(self, eleve_id, matiere):
+        with self.connexion() as conn:
+            return [Note(*row) for row in
+                    conn.execute("SELECT * FROM notes WHERE eleve_id = ? AND matiere = ? ORDER BY id",
+                                 (eleve_id, matiere))]
+    
+    def get_note(self, note_id):
+        with self.connexion() as conn:
+            row = conn.execute("SELECT * FROM notes WHERE id = ?", (note_id,)).fetchone()
+        return Note(*row) if row else None
+    
+    def iter_notes_colonnes(self, taille=100_000):
+        # Lecture par blocs pour remplir le stockage colonnaire sans créer d'objets Note
+        with self.connexion() as conn:
+            cur = conn.execute("SELECT id, eleve_id, matiere, note, coefficient, date FROM notes ORDER BY id")
+            while True:
+                rows = cur.fetchmany(taille)
+                if not rows:
+                    break
+                yield list(zip(*rows))
+    
+    def count_notes(self):
+        with self.connexion() as conn:
+            return conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+    
+    def max_note_id(self):
+        with self.connexion() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
+
+# ============================================
+# JOURNAL ET INSTANTANÉS
+# ============================================
+# Sans base SQLite, l'état en mémoire est rendu durable par un journal en
+# ajout seul : chaque écriture de SchoolManagementSystem y ajoute une ligne
+# JSON numérotée avant de modifier la mémoire. Un instantané complet est
+# écrit régulièrement, dans un thread, et les segments de journal qu'il
+# couvre sont supprimés. Au démarrage : dernier instantané, puis seulement
+# les opérations qui le suivent.
+#
+# Format binaire des instantanés : en-tête JSON (petites tables,
+# dictionnaires de chaînes, description des colonnes) puis des colonnes de
+# largeur fixe alignées, lues sans copie dans une projection mmap.
+
+MAGIE_INSTANTANE = b"ECOLEINS"
+ALIGNEMENT_COLONNES = 64
+
+def _aligner(position):
+    return -(-position // ALIGNEMENT_COLONNES) * ALIGNEMENT_COLONNES
+
+def ecrire_colonnes(chemin, entete, colonnes):
+    # colonnes : {nom: tableau numpy 1D}
+    colonnes = {nom: np.ascontiguousarray(tableau) for nom, tableau in colonnes.items()}
+    description, position = {}, 0
+    for nom, tableau in colonnes.items():
+        description[nom] = [tableau.dtype.str, len(tableau), position]
+        position = _aligner(position + tableau.nbytes)
+    texte = json.dumps({**entete, 'colonnes': description}, ensure_ascii=False).encode()
+    debut = _aligner(len(MAGIE_INSTANTANE) + 8 + len(texte))
+    with open(chemin, "wb") as f:
+        f.write(MAGIE_INSTANTANE + len(texte).to_bytes(8, "little") + texte)
+        for nom, tableau in colonnes.items():
+            f.write(b"\0" * (debut + description[nom][2] - f.tell()))
+            f.write(tableau.data)
+        f.write(b"\0" * (debut + position - f.tell()))
+        f.flush()
+        os.fsync(f.fileno())
+
+def lire_colonnes(chemin):
+    # Renvoie (en-tête, {nom: tableau}) ; les tableaux, en lecture seule,
+    # pointent dans la projection du fichier
+    with open(chemin, "rb") as f:
+        projection = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if projection[:len(MAGIE_INSTANTANE)] != MAGIE_INSTANTANE:
+        raise RuntimeError(f"{chemin} n'est pas un instantané")
+    taille = int.from_bytes(projection[len(MAGIE_INSTANTANE):len(MAGIE_INSTANTANE) + 8], "little")
+    fin_entete = len(MAGIE_INSTANTANE) + 8 + taille
+    entete = json.loads(projection[len(MAGIE_INSTANTANE) + 8:fin_entete])
+    debut = _aligner(fin_entete)
+    colonnes = {nom: np.frombuffer(projection, dtype=np.dtype(dtype), count=nb, offset=debut + position)
+                for nom, (dtype, nb, position) in entete.pop('colonnes').items()}
+    return entete, colonnes
+
+class NotesFigees:
+    # Notes d'un instantané, laissées dans la projection mmap : des objets
+    # Note ne sont construits que pour les élèves consultés. Lignes triées
+    # par identifiant ; par_eleve et debut_eleve forment un index CSR (les
+    # lignes de l'élève e sont par_eleve[debut_eleve[e]:debut_eleve[e + 1]]).
+    def __init__(self, colonnes, chaines):
+        self.id = colonnes['notes.id']
+        self.eleve_id = colonnes['notes.eleve_id']
+        self.note = colonnes['notes.note']
+        self.coefficient = colonnes['notes.coefficient']
+        self.codes = {champ: colonnes[f'notes.{champ}'] for champ in CHAMPS_NOTE_CATEGORIELS}
+        self.chaines = {champ: list(map(sys.intern, chaines[f'notes.{champ}'])) for champ in CHAMPS_NOTE_CATEGORIELS}
+        self.par_eleve = colonnes['notes.par_eleve']
+        self.debut_eleve = colonnes['notes.debut_eleve']
+    
+    def __len__(self):
+        return len(self.id)
+    
+    def eleves(self):
+        return np.flatnonzero(np.diff(self.debut_eleve))
+    
+    def lignes_de(self, eleve_id):
+        if not 0 <= eleve_id < len(self.debut_eleve) - 1:
+            return self.par_eleve[:0]
+        return self.par_eleve[self.debut_eleve[eleve_id]:self.debut_eleve[eleve_id + 1]]
+    
+    def notes_de(self, eleve_id):
+        lignes = self.lignes_de(eleve_id)
+        matieres, types, dates, enseignants = (
+            map(self.chaines[champ].__getitem__, self.codes[champ][lignes].tolist())
+            for champ in ('matiere', 'type_note', 'date', 'enseignant'))
+        return list(map(Note, self.id[lignes].tolist(), [eleve_id] * len(lignes), matieres,
+                        self.note[lignes].tolist(), self.coefficient[lignes].tolist(), types, dates, enseignants))
+    
+    def eleve_de(self, note_id):
+        ligne = int(np.searchsorted(self.id, note_id))
+        if ligne < len(self.id) and self.id[ligne] == note_id:
+            return int(self.eleve_id[ligne])
+        return None
+    
+    def decoder(self, champ, lignes=slice(None)):
+        # Colonne de chaînes (tableau d'objets) pour les calculs en masse
+        return np.array(self.chaines[champ], dtype=object)[self.codes[champ][lignes]]
+
+class Journal:
+    VERSION_INSTANTANE = 2
+    
+    def __init__(self, dossier, fsync=True):
+        os.makedirs(dossier, exist_ok=True)
+        self.dossier = dossier
+        self.fsync = fsync
+        self.sequence = 0  # numéro de la dernière opération écrite
+        self.depuis_instantane = 0
+        self.derniere_erreur = None
+        self._fichier = None
+        self._thread = None
+    
+    def _fichiers(self, motif):
+        # (numéro, chemin) des fichiers du dossier qui suivent le motif, dans l'ordre
+        fichiers = []
+        for nom in os.listdir(self.dossier):
+            correspondance = re.fullmatch(motif, nom)
+            if correspondance:
+                fichiers.append((int(correspondance.group(1)), os.path.join(self.dossier, nom)))
+        return sorted(fichiers)
+    
+    def _segments(self):
+        # Numérotés par leur première opération
+        return self._fichiers(r"journal-(\d+)\.log")
+    
+    def _instantanes(self):
+        # Numérotés par la dernière opération qu'ils contiennent
+        return self._fichiers(r"instantane-(\d+)\.bin")
+    
+    def existe(self):
+        return bool(self._instantanes() or self._segments())
+    
+    def lire(self):
+        # Renvoie ((en-tête, colonnes) du dernier instantané ou None,
+        # opérations à rejouer)
+        instantane, sequence = None, 0
+        instantanes = self._instantanes()
+        if instantanes:
+            sequence, chemin = instantanes[-1]
+            instantane = lire_colonnes(chemin)
+            if instantane[0].get('version') != self.VERSION_INSTANTANE:
+                raise RuntimeError(f"Instantané {chemin} : version {instantane[0].get('version')} non prise en charge")
+        operations = []
+        for _, segment in self._segments():
+            with open(segment, "r+b") as f:
+                fin = 0  # fin de la dernière ligne complète
+                for ligne in f:
+                    try:
+                        if not ligne.endswith(b"\n"):
+                            raise ValueError
+                        operation = json.loads(ligne)
+                    except ValueError:
+                        # Dernière ligne tronquée par un arrêt brutal : coupée,
+                        # sinon ouvrir() écrirait à sa suite dans ce segment et
+                        # le prochain démarrage perdrait toutes ces opérations
+                        f.truncate(fin)
+                        break
+                    fin += len(ligne)
+                    if operation['n'] <= sequence:
+                        continue
+                    if operation['n'] != sequence + 1:
+                        raise RuntimeError(f"Journal {self.dossier} : opération {sequence + 1} manquante")
+                    operations.append(operation)
+                    sequence += 1
+        self.sequence = sequence
+        self.depuis_instantane = len(operations)
+        return instantane, operations
+    
+    def ouvrir(self):
+        # Nouveau segment au démarrage et à chaque instantané. Au démarrage,
+        # il peut déjà exister (vide, ou dont lire() a coupé la ligne tronquée) :
+        # on écrit alors à la suite de sa dernière ligne complète
+        if self._fichier is not None:
+            self._fichier.close()
+        self._fichier = open(os.path.join(self.dossier, f"journal-{self.sequence + 1:012d}.log"), "ab")
+    
+    def ecrire(self, operation, donnees):
+        # Appelée sous le verrou du système
+        ligne = json.dumps({'n': self.sequence + 1, 'op': operation, 'd': donnees}, ensure_ascii=False)
+        self._fichier.write(ligne.encode() + b"\n")
+        self._fichier.flush()
+        if self.fsync:
+            os.fsync(self._fichier.fileno())
+        self.sequence += 1
+        self.depuis_instantane += 1
+    
+    def instantane_en_cours(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def ecrire_instantane(self, preparer, attendre=False):
+        # preparer() construit, dans le thread, l'en-tête et les colonnes de
+        # l'état capturé sous le verrou à la séquence courante ; les
+        # opérations suivantes vont dans un nouveau segment pendant l'écriture
+        self.ouvrir()
+        self.depuis_instantane = 0
+        self._thread = threading.Thread(target=self._ecrire_instantane, args=(preparer,),
+                                        name="instantane", daemon=True)
+        self._thread.start()
+        if attendre:
+            self._thread.join()
+            if self.derniere_erreur:
+                raise RuntimeError(self.derniere_erreur)
+    
+    def _ecrire_instantane(self, preparer):
+        try:
+            entete, colonnes = preparer()
+            sequence = entete['sequence']
+            chemin = os.path.join(self.dossier, f"instantane-{sequence:012d}.bin")
+            ecrire_colonnes(chemin + ".tmp", {'version': self.VERSION_INSTANTANE, **entete}, colonnes)
+            os.replace(chemin + ".tmp", chemin)
+            for numero, fichier in self._instantanes():
+                if numero < sequence:
+                    self._supprimer(fichier)
+            for premier, segment in self._segments():
+                if premier <= sequence:
+                    self._supprimer(segment)
+            self.derniere_erreur = None
+        except Exception as e:
+            # L'ancien instantané et les segments restent : rien n'est perdu
+            self.derniere_erreur = f"Instantané non écrit : {e}"
+    
+    def _supprimer(self, chemin):
+        # Un ancien instantané encore projeté ne peut pas être supprimé sous
+        # Windows : il le sera après le prochain
+        try:
+            os.remove(chemin)
+        except OSError:
+            pass
+    
+    def fermer(self):
+        if self._thread is not None:
+            self._thread.join()
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
+# ============================================
+# NOTIFICATIONS
+# ============================================
+# Les événements (nouvelles notes, emplois du temps, activités) sont déposés
+# dans une boîte d'envoi SQLite persistante. Un worker asyncio, dans un thread
+# de fond, la vide par lots à travers des transports interchangeables, avec de
+# nouvelles tentatives de plus en plus espacées : la saisie d'une note ne
+# coûte qu'un INSERT et n'attend jamais l'envoi.
+
+TAILLE_LOT_NOTIFICATIONS = 50
+MAX_TENTATIVES_NOTIFICATION = 6
+# Délai avant la première nouvelle tentative, doublé à chaque échec
+DELAI_RELANCE_S = 30
+
+@dataclass(slots=True)
+class Notification:
+    id: int
+    evenement: str  # 'notes', 'emploi_du_temps', 'activite'
+    canal: str  # 'email', 'sms'
+    destinataire: str
+    sujet: str
+    message: str
+    tentatives: int
+
+class BoiteEnvoi:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY,
+        evenement TEXT NOT NULL,
+        canal TEXT NOT NULL,
+        destinataire TEXT NOT NULL,
+        sujet TEXT,
+        message TEXT,
+        statut TEXT NOT NULL DEFAULT 'en_attente',  -- en_attente, en_cours, envoyee, echec
+        tentatives INTEGER NOT NULL DEFAULT 0,
+        prochaine_tentative REAL NOT NULL,
+        cree_le TEXT NOT NULL,
+        envoyee_le TEXT,
+        erreur TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_notifications_a_envoyer ON notifications(statut, prochaine_tentative);
+    """
+    
+    def __init__(self, path=":memory:"):
+        # Une seule connexion, sous verrou : le trafic est faible et une base
+        # ":memory:" n'existe que dans la connexion qui l'a créée
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(self.SCHEMA)
+            # Reprise après un arrêt pendant un envoi : ces messages repartent
+            self._conn.execute("UPDATE notifications SET statut = 'en_attente' WHERE statut = 'en_cours'")
+    
+    def deposer(self, messages):
+        # messages : (evenement, canal, destinataire, sujet, message)
+        maintenant = time.time()
+        horodatage = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO notifications (evenement, canal, destinataire, sujet, message, "
+                "prochaine_tentative, cree_le) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*message, maintenant, horodatage) for message in messages])
+    
+    def reserver(self, limite):
+        # Prend les messages arrivés à échéance et les marque « en cours »
+        with self._lock, self._conn:
+            lignes = self._conn.execute(
+                "UPDATE notifications SET statut = 'en_cours' WHERE id IN ("
+                " SELECT id FROM notifications WHERE statut = 'en_attente' AND prochaine_tentative <= ?"
+                " ORDER BY prochaine_tentative, id LIMIT ?) "
+                "RETURNING id, evenement, canal, destinataire, sujet, message, tentatives",
+                (time.time(), limite)).fetchall()
+        return sorted((Notification(*ligne) for ligne in lignes), key=lambda n: n.id)
+    
+    def marquer_envoyees(self, notifications):
+        horodatage = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE notifications SET statut = 'envoyee', tentatives = tentatives + 1, "
+                "envoyee_le = ?, erreur = NULL WHERE id = ?",
+                [(horodatage, n.id) for n in notifications])
+    
+    def reporter(self, echecs):
+        # echecs : (notification, erreur). Nouvelle tentative plus tard, ou
+        # abandon après MAX_TENTATIVES_NOTIFICATION essais
+        maintenant = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE notifications SET statut = ?, tentatives = ?, prochaine_tentative = ?, erreur = ? "
+                "WHERE id = ?",
+                [('echec' if n.tentatives + 1 >= MAX_TENTATIVES_NOTIFICATION else 'en_attente',
+                  n.tentatives + 1, maintenant + DELAI_RELANCE_S * 2 ** n.tentatives, erreur, n.id)
+                 for n, erreur in echecs])
+    
+    def relancer_echecs(self):
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE notifications SET statut = 'en_attente', tentatives = 0, prochaine_tentative = ? "
+                "WHERE statut = 'echec'", (time.time(),)).rowcount
+    
+    def prochaine_echeance(self):
+        with self._lock:
+            return self._conn.execute("SELECT MIN(prochaine_tentative) FROM notifications "
+                                      "WHERE statut = 'en_attente'").fetchone()[0]
+    
+    def compter(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT statut, COUNT(*) FROM notifications GROUP BY statut"))
+    
+    def derniers(self, limite=20):
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT id, cree_le, evenement, canal, destinataire, sujet, statut, tentatives, erreur "
+                "FROM notifications ORDER BY id DESC LIMIT ?", self._conn, params=(limite,))
+
+# --- Transports ---
+# Un transport expose `async envoyer(notifications)` et renvoie, pour chaque
+# notification, None si elle est partie ou le texte de l'erreur.
+
+class TransportJournal:
+    # Transport de développement et de test : les messages restent en mémoire.
+    # taux_echec > 0 simule des pannes pour exercer les nouvelles tentatives.
+    def __init__(self, canal, taux_echec=0.0, seed=None):
+        self.canal = canal
+        self.taux_echec = taux_echec
+        self.envoyes = deque(maxlen=1000)
+        self._rng = random.Random(seed)
+    
+    async def envoyer(self, notifications):
+        erreurs = []
+        for notification in notifications:
+            if self._rng.random() < self.taux_echec:
+                erreurs.append("échec simulé")
+            else:
+                self.envoyes.append(notification)
+                erreurs.append(None)
+        return erreurs
+
+class TransportSMTP:
+    # Un lot = une connexion SMTP. smtplib est bloquant : il tourne dans un
+    # thread pour ne pas arrêter la boucle asyncio.
+    def __init__(self, hote, port=25, expediteur="ne-pas-repondre@ecole.ci",
+                 utilisateur=None, mot_de_passe=None, starttls=False):
+        self.hote = hote
+        self.port = port
+        self.expediteur = expediteur
+        self.utilisateur = utilisateur
+        self.mot_de_passe = mot_de_passe
+        self.starttls = starttls
+    
+    async def envoyer(self, notifications):
+        return await asyncio.to_thread(self._envoyer, notifications)
+    
+    def _envoyer(self, notifications):
+        try:
+            with smtplib.SMTP(self.hote, self.port, timeout=30) as smtp:
+                if self.starttls:
+                    smtp.starttls()
+                if self.utilisateur:
+                    smtp.login(self.utilisateur, self.mot_de_passe)
+                erreurs = []
+                for notification in notifications:
+                    message = EmailMessage()
+                    message['From'] = self.expediteur
+                    message['To'] = notification.destinataire
+                    message['Subject'] = notification.sujet
+                    message.set_content(notification.message)
+                    try:
+                        smtp.send_message(message)
+                        erreurs.append(None)
+                    except smtplib.SMTPException as e:
+                        erreurs.append(str(e))
+                return erreurs
+        except (OSError, smtplib.SMTPException) as e:
+            return [str(e)] * len(notifications)
+
+def transports_depuis_environnement():
+    # Email par SMTP si ECOLE_SMTP_HOTE est défini (ECOLE_SMTP_PORT,
+    # _EXPEDITEUR, _UTILISATEUR, _MOT_DE_PASSE, _STARTTLS) ; sinon un journal
+    # en mémoire. Pas de canal SMS tant qu'aucune passerelle n'est branchée :
+    # les messages ne doivent pas être marqués envoyés sans être partis
+    hote = os.environ.get("ECOLE_SMTP_HOTE")
+    if hote:
+        email = TransportSMTP(hote, int(os.environ.get("ECOLE_SMTP_PORT", "25")),
+                              os.environ.get("ECOLE_SMTP_EXPEDITEUR", "ne-pas-repondre@ecole.ci"),
+                              os.environ.get("ECOLE_SMTP_UTILISATEUR"), os.environ.get("ECOLE_SMTP_MOT_DE_PASSE"),
+                              os.environ.get("ECOLE_SMTP_STARTTLS") == "1")
+    else:
+        email = TransportJournal('email')
+    return {'email': email}
+
+class ServiceNotifications:
+    def __init__(self, boite, transports, taille_lot=TAILLE_LOT_NOTIFICATIONS):
+        self.boite = boite
+        self.transports = transports
+        self.canaux_actifs = set(transports)
+        self.taille_lot = taille_lot
+        self._boucle_evenements = None
+        self._reveil = None
+        self._arret = False
+        self._thread = None
+    
+    def notifier(self, messages):
+        # messages : (evenement, utilisateur, sujet, texte) ; un envoi par
+        # canal actif pour lequel l'utilisateur a une adresse
+        lignes = [(evenement, canal, adresse, sujet, texte)
+                  for evenement, user, sujet, texte in messages
+                  for canal, adresse in (('email', user.email), ('sms', user.telephone))
+                  if adresse and canal in self.canaux_actifs]
+        if lignes:
+            self.boite.deposer(lignes)
+            self.reveiller()
+        return len(lignes)
+    
+    def demarrer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=asyncio.run, args=(self._boucle(),),
+                                            name="notifications", daemon=True)
+            self._thread.start()
+    
+    def arreter(self, timeout=5):
+        self._arret = True
+        self.reveiller()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def reveiller(self):
+        # Appelé depuis n'importe quel thread : la boucle vérifie la boîte tout de suite
+        boucle = self._boucle_evenements
+        if boucle is not None and not boucle.is_closed():
+            try:
+                boucle.call_soon_threadsafe(self._reveil.set)
+            except RuntimeError:
+                pass
+    
+    async def _boucle(self):
+        self._boucle_evenements = asyncio.get_running_loop()
+        self._reveil = asyncio.Event()
+        while not self._arret:
+            # Réveil effacé avant de lire la boîte : un dépôt arrivé entre la
+            # lecture et l'attente n'est pas perdu
+            self._reveil.clear()
+            lot = await asyncio.to_thread(self.boite.reserver, self.taille_lot)
+            if lot:
+                par_canal = defaultdict(list)
+                for notification in lot:
+                    par_canal[notification.canal].append(notification)
+                await asyncio.gather(*(self._expedier(canal, notifications)
+                                       for canal, notifications in par_canal.items()))
+                continue
+            echeance = await asyncio.to_thread(self.boite.prochaine_echeance)
+            attente = 60 if echeance is None else min(max(echeance - time.time(), 0), 60)
+            try:
+                await asyncio.wait_for(self._reveil.wait(), timeout=attente)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _expedier(self, canal, notifications):
+        transport = self.transports.get(canal)
+        if transport is None:
+            erreurs = [f"Aucun transport pour le canal {canal}"] * len(notifications)
+        else:
+            try:
+                erreurs = await transport.envoyer(notifications)
+            except Exception as e:
+                # Un transport défaillant ne doit pas arrêter le worker
+                erreurs = [f"{type(e).__name__}: {e}"] * len(notifications)
+        envoyees = [n for n, erreur in zip(notifications, erreurs) if erreur is None]
+        echecs = [(n, erreur) for n, erreur in zip(notifications, erreurs) if erreur is not None]
+        if envoyees:
+            await asyncio.to_thread(self.boite.marquer_envoyees, envoyees)
+        if echecs:
+            await asyncio.to_thread(self.boite.reporter, echecs)
+
+# ============================================
+# GÉNÉRATION DE DONNÉES SYNTHÉTIQUES
+# ============================================
+
+NIVEAUX = ['6ème', '5ème', '4ème', '3ème', 'Seconde', 'Première', 'Terminale']
+NOMS_IVOIRIENS = ['Kouamé', 'Koné', 'Yao', 'Touré', 'Diaby', 'Cissé', 'Bamba', 'Koffi', 'Soro', 'Doumbia',
+                  'Ouattara', 'Coulibaly', 'Kouassi', 'Konan', 'Traoré', 'Diallo', 'Fofana', "N'Guessan"]
+PRENOMS_IVOIRIENS = ['Aya', 'Moussa', 'Fatou', 'Jean', 'Marie', 'Paul', 'Aminata', 'Mohamed', 'Rokia', 'Sékou',
+                     'Adjoua', 'Awa', 'Ibrahim', 'Akissi', 'Yves', 'Mariam', 'Serge', 'Affoué', 'Karim', 'Salimata']
+ACTIVITES_TYPES = [
+    ("Sortie au Musée des Civilisations", "Visite culturelle", "Culturelle", "09:00", "Musée, Plateau"),
+    ("Tournoi de football inter-classes", "Compétition sportive", "Sportive", "14:00", "Stade municipal"),
+    ("Journée portes ouvertes", "Présentation des filières", "Pédagogique", "08:30", "École"),
+    ("Séminaire d'orientation", "Orientation après le BAC", "Pédagogique", "10:00", "Salle polyvalente"),
+    ("Fête de fin d'année", "Spectacle et remise des prix", "Culturelle", "16:00", "Cour de l'école"),
+]
+
+@dataclass
+class ParametresGeneration:
+    nb_ecoles: int = 1
+    classes_par_niveau: int = 2
+    nb_eleves: int = 30
+    notes_par_matiere: int = 3
+    nb_activites: int = 5
+    debut_periode: str = "2024-01-01"
+    fin_periode: str = "2024-06-28"
+    seed: int = 2024
+    
+    @classmethod
+    def depuis_environnement(cls):
+        # ECOLE_NB_ELEVES=50000 ECOLE_SEED=7 ... : chaque champ peut être surchargé
+        valeurs = {}
+        for nom, defaut in vars(cls()).items():
+            brut = os.environ.get(f"ECOLE_{nom.upper()}")
+            if brut is not None:
+                valeurs[nom] = type(defaut)(brut)
+        return cls(**valeurs)
+
+@dataclass
+class DonneesSynthetiques:
+    classes: List[str]
+    eleves: List[Dict]  # arguments de add_eleve
+    notes: Dict[str, np.ndarray]  # colonnes ; 'eleve' est l'indice dans eleves
+    activites: List[Dict]  # arguments de add_activite
+
+def noms_de_classes(parametres):
+    classes = []
+    for ecole in range(1, parametres.nb_ecoles + 1):
+        prefixe = f"École {ecole} - " if parametres.nb_ecoles > 1 else ""
+        for niveau in NIVEAUX:
+            # Séries A, C, D... au lycée, sections A, B, C... au collège
+            lettres = "ACDEFGHIJKLMNOPQRSTUVWXYZ" if groupe_de_classe(niveau) == 'Lycée' \
+                else "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+            for i in range(parametres.classes_par_niveau):
+                suffixe = lettres[i % len(lettres)] + (str(i // len(lettres) + 1) if i >= len(lettres) else "")
+                classes.append(f"{prefixe}{niveau} {suffixe}")
+    return classes
+
+def generer_donnees(parametres, matieres):
+    # Génération vectorisée et reproductible (même graine, mêmes données).
+    # matieres : {groupe: [matière, ...]} comme SchoolManagementSystem.matieres
+    rng = np.random.default_rng(parametres.seed)
+    classes = noms_de_classes(parametres)
+    n = parametres.nb_eleves
+    
+    # --- Élèves ---
+    groupes = list(matieres)
+    groupe_classe = np.array([groupes.index(groupe_de_classe(c)) for c in classes])
+    niveau_classe = np.array([next(i for i, niveau in enumerate(NIVEAUX) if niveau in c) for c in classes])
+    classe_eleve = rng.integers(len(classes), size=n)
+    noms = rng.integers(len(NOMS_IVOIRIENS), size=n)
+    prenoms = rng.integers(len(PRENOMS_IVOIRIENS), size=n)
+    annees = 2013 - niveau_classe[classe_eleve] + rng.integers(-1, 2, size=n)
+    mois = rng.integers(1, 13, size=n)
+    jours = rng.integers(1, 29, size=n)
+    # Fratries de 1 à 3 enfants : parent1, parent2...
+    parent_eleve = np.repeat(np.arange(1, n + 1), rng.integers(1, 4, size=n))[:n]
+    eleves = [{
+        'nom': NOMS_IVOIRIENS[noms[i]],
+        'prenom': PRENOMS_IVOIRIENS[prenoms[i]],
+        'classe': classes[classe_eleve[i]],
+        'date_naissance': f"{annees[i]}-{mois[i]:02d}-{jours[i]:02d}",
+        'parent_id': f"parent{parent_eleve[i]}",
+    } for i in range(n)]
+    
+    # --- Notes : pour chaque élève, chaque matière de sa classe, notes_par_matiere notes ---
+    toutes_matieres = list(dict.fromkeys(m for liste in matieres.values() for m in liste))
+    nb_matieres = np.array([len(matieres[g]) for g in groupes])
+    table_matieres = np.full((len(groupes), nb_matieres.max()), -1)
+    for g, groupe in enumerate(groupes):
+        table_matieres[g, :nb_matieres[g]] = [toutes_matieres.index(m) for m in matieres[groupe]]
+    k = parametres.notes_par_matiere
+    par_eleve = nb_matieres[groupe_classe[classe_eleve]] * k
+    total = int(par_eleve.sum())
+    eleve = np.repeat(np.arange(n), par_eleve)
+    position = np.arange(total) - np.repeat(np.cumsum(par_eleve) - par_eleve, par_eleve)
+    matiere = table_matieres[groupe_classe[classe_eleve[eleve]], position // k]
+    # Niveau propre à chaque élève, plus un écart par matière
+    niveau_eleve = rng.normal(12, 2.5, size=n)
+    ecart_matiere = rng.normal(0, 1.5, size=(n, len(toutes_matieres)))
+    note = np.clip(rng.normal(niveau_eleve[eleve] + ecart_matiere[eleve, matiere], 2.5), 0, 20).round(2)
+    # Un enseignant par (classe, matière)
+    enseignants = np.array([f"Prof. {nom}" for nom in ['Koné', 'Traoré', 'Yao', 'Cissé', 'Bamba', 'Touré']],
+                           dtype=object)
+    enseignant_classe = rng.integers(len(enseignants), size=(len(classes), len(toutes_matieres)))
+    debut = np.datetime64(parametres.debut_periode)
+    nb_jours = int((np.datetime64(parametres.fin_periode) - debut).astype(int)) + 1
+    dates = np.array([str(debut + j) for j in range(nb_jours)], dtype=object)
+    notes = {
+        'eleve': eleve,
+        'matiere': np.array(toutes_matieres, dtype=object)[matiere],
+        'note': note,
+        'coefficient': rng.integers(1, 4, size=total),
+        'type_note': np.array(['Devoir', 'Composition', 'Oral'], dtype=object)[rng.integers(3, size=total)],
+        'date': dates[rng.integers(nb_jours, size=total)],
+        'enseignant': enseignants[enseignant_classe[classe_eleve[eleve], matiere]],
+    }
+    
+    # --- Activités ---
+    activites = []
+    for i in range(parametres.nb_activites):
+        titre, description, type_activite, heure, lieu = ACTIVITES_TYPES[i % len(ACTIVITES_TYPES)]
+        concernees = rng.choice(len(classes), size=min(5, len(classes)), replace=False)
+        activites.append({
+            'titre': titre,
+            'description': description,
+            'type_activite': type_activite,
+            'date': str(dates[rng.integers(nb_jours)]),
+            'heure': heure,
+            'lieu': lieu,
+            'organisateur': "Direction de l'école",
+            'classes_concernées': [classes[c] for c in sorted(concernees)],
+        })
+    
+    return DonneesSynthetiques(classes, eleves, notes, activites)
+
+# ============================================
+# INITIALISATION DE L'APPLICATION
+# ============================================
+
+@st.cache_resource
+def get_system():
+    # Instance unique pour tout le processus : chaque session ne garde
+    # que son état de connexion dans st.session_state
+    store = SQLiteStore(DB_PATH) if DB_PATH else None
+    journal = Journal(JOURNAL_DIR) if JOURNAL_DIR and store is None else None
+    system = SchoolManagementSystem(store, journal=journal)
+    system.notifications = ServiceNotifications(BoiteEnvoi(BOITE_ENVOI_PATH), transports_depuis_environnement())
+    system.notifications.demarrer()
+    return system
+
+if 'logged_in' not in st.session_state:
+    st.session_state.logged_in = False
+    st.session_state.current_user = None
+    st.session_state.selected_eleve = None
+    st.session_state.jeton = None
+
+system = get_system()
+
+# ============================================
+# FONCTIONS UTILITAIRES
+# ============================================
+
+def display_header():
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.markdown(f"""
+        <div class="header-container">
+            <h1>🏫 École Excellence Ivoirienne</h1>
+            <h3>De la 6ème à la Terminale - Système de Gestion Scolaire</h3>
+            <p>Plateforme officielle de suivi scolaire - Abidjan, Côte d'Ivoire</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        if st.session_state.logged_in:
+            user = st.session_state.current_user
+            st.info(f"👤 Connecté en tant que: {user.prenom} {user.nom}")
+            if st.session_state.pop('bienvenue', False):
+                st.toast(f"Connexion réussie ! Bienvenue {user.prenom} {user.nom}", icon="✅")
+            if st.button("Déconnexion"):
+                system.sessions.fermer(st.session_state.jeton)
+                st.session_state.logged_in = False
+                st.session_state.current_user = None
+                st.session_state.jeton = None
+                st.rerun()
+
+def verifier_session():
+    # Un rafraîchissement ne revérifie pas le mot de passe : le jeton suffit.
+    # Session expirée ou utilisateur supprimé : retour à la connexion.
+    if not st.session_state.logged_in:
+        return
+    user = system.get_user_by_jeton(st.session_state.jeton)
+    if user is None:
+        st.session_state.logged_in = False
+        st.session_state.current_user = None
+        st.session_state.jeton = None
+        st.warning("Votre session a expiré, veuillez vous reconnecter")
+    else:
+        st.session_state.current_user = user
+
+def afficher_onglets(onglets, key):
+    # Seul l'onglet ouvert est calculé : avec on_change="rerun", .open indique
+    # l'onglet choisi et un changement d'onglet relance le script. Les fonctions
+    # d'onglet sont des fragments : une interaction ne relance que leur onglet.
+    for tab, afficher in zip(st.tabs(list(onglets), key=key, on_change="rerun"), onglets.values()):
+        if tab.open:
+            with tab:
+                afficher()
+
+def login_form():
+    st.markdown("""
+    <div style='text-align: center; padding: 2rem;'>
+        <h2>🔐 Connexion à la plateforme</h2>
+        <p>Accédez aux informations scolaires de vos enfants</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        with st.container():
+            username = st.text_input("Nom d'utilisateur")
+            password = st.text_input("Mot de passe", type="password")
+            
+            if st.button("Se connecter", type="primary", use_container_width=True):
+                try:
+                    jeton = system.authentifier(username, password, st.context.ip_address)
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    st.session_state.jeton = jeton
+                    st.session_state.logged_in = True
+                    st.session_state.current_user = system.users[username]
+                    st.session_state.bienvenue = True
+                    st.rerun()
+            
+            st.markdown("---")
+            st.markdown("""
+            <div class='info-message'>
+                <h4>🔑 Identifiants de démonstration</h4>
+                <p><strong>Parent :</strong> parent1 / pass123</p>
+                <p><strong>Enseignant :</strong> prof1 / prof123</p>
+                <p><strong>Administrateur :</strong> admin / admin123</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+@chronometre("parent_dashboard")
+def parent_dashboard():
+    user = st.session_state.current_user
+    
+    # Titre du tableau de bord
+    st.markdown(f"""
+    <div style='margin-bottom: 2rem;'>
+        <h2>👨‍👩‍👧‍👦 Tableau de bord Parent - {user.prenom} {user.nom}</h2>
+        <p>Suivez la scolarité de vos enfants</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Récupérer les élèves associés au parent
+    eleves_parent = system.get_eleves_by_parent(user.username)
+    
+    if not eleves_parent:
+        st.warning("Aucun élève n'est associé à votre compte.")
+        return
+    
+    # Sélection de l'élève à afficher
+    eleve_options = {f"{e.prenom} {e.nom} - {e.classe}": e for e in eleves_parent}
+    selected_eleve_name = st.selectbox(
+        "Sélectionnez un élève :",
+        list(eleve_options.keys())
+    )
+    
+    selected_eleve = eleve_options[selected_eleve_name]
+    st.session_state.selected_eleve = selected_eleve
+    
+    # Statistiques rapides
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        notes_eleve = system.get_notes_by_eleve(selected_eleve.id)
+        moyenne = system.get_moyenne_by_eleve(selected_eleve.id)
+        st.markdown(f"""
+        <div class='stat-card'>
+            <h3>{moyenne}/20</h3>
+            <p>Moyenne générale</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class='stat-card'>
+            <h3>{len(notes_eleve)}</h3>
+            <p>Notes enregistrées</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class='stat-card'>
+            <h3>{selected_eleve.classe}</h3>
+            <p>Classe</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        rang_texte = format_rang(*system.get_rang_by_eleve(selected_eleve.id))
+        st.markdown(f"""
+        <div class='stat-card'>
+            <h3>{rang_texte}</h3>
+            <p>Rang dans la classe</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Onglets pour les différentes fonctionnalités
+    afficher_onglets({
+        "📊 Notes et résultats": lambda: display_notes_tab(selected_eleve),
+        "📅 Emploi du temps": lambda: display_emploi_du_temps(selected_eleve),
+        "📢 Activités scolaires": lambda: display_activites_scolaires(eleves_parent),
+        "📋 Informations": lambda: display_informations_eleve(selected_eleve),
+    }, key="onglets_parent")
+
+@chronometre("vue_notes_eleve")
+def vue_notes_eleve(eleve):
+    # DataFrames et figure de l'onglet Notes, partagés entre sessions et
+    # reconstruits seulement quand les notes de l'élève changent
+    version = system.get_version_eleve(eleve.id)
+    vue = system.cache_affichage.get(('notes', eleve.id), version)
+    if vue is not None:
+        return vue
+    
+    matieres = system.get_matieres_by_classe(eleve.classe)
+    df_moyennes = pd.DataFrame({
+        'matiere': matieres,
+        'moyenne': [system.get_moyenne_by_matiere(eleve.id, matiere) for matiere in matieres]
+    })
+    fig = None
+    if not df_moyennes.empty:
+        fig = px.bar(df_moyennes, x='matiere', y='moyenne',
+                    title=f'Moyennes par matière - {eleve.classe}',
+                    color='moyenne',
+                    color_continuous_scale='Blues',
+                    range_y=[0, 20])
+    
+    notes_eleve = system.get_notes_by_eleve(eleve.id)
+    par_matiere = []
+    taille = df_moyennes.memory_usage(deep=True).sum() + (len(fig.to_json()) if fig is not None else 0)
+    if notes_eleve:
+        df_notes = pd.DataFrame({
+            'Matière': [note.matiere for note in notes_eleve],
+            'Note': [note.note for note in notes_eleve],
+            'Coefficient': [note.coefficient for note in notes_eleve],
+            'Type': [note.type_note for note in notes_eleve],
+            'Date': [note.date for note in notes_eleve],
+            'Enseignant': [note.enseignant for note in notes_eleve],
+        }).sort_values('Date', ascending=False)
+        for matiere in df_notes['Matière'].unique():
+            df_matiere = df_notes[df_notes['Matière'] == matiere]
+            par_matiere.append((matiere, df_matiere, system.get_moyenne_by_matiere(eleve.id, matiere)))
+            taille += df_matiere.memory_usage(deep=True).sum()
+    
+    vue = {'figure': fig, 'matieres': par_matiere}
+    return system.cache_affichage.put(('notes', eleve.id), version, vue, int(taille))
+
+@st.fragment
+@chronometre("display_notes_tab")
+def display_notes_tab(eleve):
+    st.markdown(f"### 📊 Notes de {eleve.prenom} {eleve.nom} - {eleve.classe}")
+    
+    vue = vue_notes_eleve(eleve)
+    
+    # Graphique des moyennes par matière
+    if vue['figure'] is not None:
+        with MESURES.mesurer("display_notes_tab.graphique"):
+            st.plotly_chart(vue['figure'], use_container_width=True)
+    
+    # Détail des notes
+    st.markdown("### Détail des notes")
+    
+    if vue['matieres']:
+        # Grouper par matière
+        for matiere, df_matiere, moyenne_matiere in vue['matieres']:
+            with st.expander(f"📚 {matiere}"):
+                st.dataframe(df_matiere, use_container_width=True)
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric(f"Moyenne {matiere}", f"{moyenne_matiere}/20")
+                with col2:
+                    st.metric("Appréciation", appreciation(moyenne_matiere))
+        
+        # Téléchargement du bulletin : le PDF n'est construit qu'au clic
+        st.markdown("---")
+        col1, col2 = st.columns(2)
+        with col1:
+            donnees_bulletin = system.get_donnees_bulletin(eleve.id)
+            st.download_button("📄 Générer le bulletin PDF",
+                               data=lambda: construire_bulletin(donnees_bulletin)[1],
+                               file_name=nom_fichier_bulletin(donnees_bulletin),
+                               mime="application/pdf",
+                               on_click="ignore",
+                               use_container_width=True)
+        with col2:
+            # Le bouton bascule l'affichage, qui reste ouvert quand on change les options
+            cle = f"evolution_{eleve.id}"
+            if st.button("📊 Voir l'évolution", use_container_width=True):
+                st.session_state[cle] = not st.session_state.get(cle, False)
+        if st.session_state.get(f"evolution_{eleve.id}"):
+            display_evolution(eleve)
+    else:
+        st.info(f"Aucune note disponible pour {eleve.prenom} {eleve.nom}")
+
+def display_evolution(eleve):
+    st.markdown("### 📈 Évolution des moyennes")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        matiere = st.selectbox("Matière", ["Toutes les matières"] + system.get_matieres_by_classe(eleve.classe),
+                               key=f"evolution_matiere_{eleve.id}")
+    with col2:
+        par = st.radio("Période", ['mois', 'trimestre'], format_func=str.capitalize, horizontal=True,
+                       key=f"evolution_par_{eleve.id}")
+    with col3:
+        vue = st.radio("Vue", list(VUES_EVOLUTION), format_func=VUES_EVOLUTION.get, horizontal=True,
+                       key=f"evolution_vue_{eleve.id}")
+    
+    df = system.get_evolution(eleve.id, None if matiere == "Toutes les matières" else matiere, par, vue)
+    if df['eleve'].isna().all():
+        st.info(f"Aucune note en {matiere} pour {eleve.prenom}")
+        return
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df.index, y=df['eleve'], mode='lines+markers', name=eleve.prenom,
+                             connectgaps=True))
+    fig.add_trace(go.Scatter(x=df.index, y=df['classe'], mode='lines+markers', name=f"Moyenne {eleve.classe}",
+                             line=dict(dash='dash'), connectgaps=True))
+    fig.update_layout(title=f"{matiere} ({VUES_EVOLUTION[vue].lower()}, par {par})",
+                      xaxis_title=par.capitalize(), yaxis_title="Moyenne /20", yaxis_range=[0, 20])
+    fig.update_xaxes(type='category')
+    st.plotly_chart(fig, use_container_width=True)
+    if vue == 'glissante':
+        st.caption(f"Moyenne des notes des {FENETRE_GLISSANTE} dernières périodes")
+
+@st.fragment
+@chronometre("display_emploi_du_temps")
+def display_emploi_du_temps(eleve):
+    st.markdown(f"### 📅 Emploi du temps - {eleve.classe}")
+    
+    # Emploi du temps généré une fois pour la classe (sans conflit d'enseignant ni de salle)
+    df_emploi = pd.DataFrame(system.get_emploi_du_temps(eleve.classe))
+    
+    # Affichage sous forme de tableau
+    st.dataframe(
+        df_emploi,
+        column_config={
+            "Jour": st.column_config.TextColumn("Jour"),
+            "Créneau": st.column_config.TextColumn("Horaire"),
+            "Matière": st.column_config.TextColumn("Matière"),
+            "Enseignant": st.column_config.TextColumn("Professeur"),
+            "Salle": st.column_config.TextColumn("Salle")
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # Légende : seuls les canaux réellement actifs sont annoncés
+    canaux = system.notifications.canaux_actifs if system.notifications is not None else set()
+    moyens = " et ".join(f"par {nom}" for canal, nom in (('email', 'email'), ('sms', 'SMS')) if canal in canaux)
+    avis = f"Les modifications sont notifiées aux parents {moyens}." if moyens else ""
+    st.markdown(f"""
+    <div class='info-message'>
+        <p><strong>Note :</strong> L'emploi du temps est actualisé chaque semaine. 
+        {avis}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+def display_edition_emploi_du_temps():
+    st.markdown("#### 📅 Emplois du temps")
+    classes = system.get_classes()
+    if not classes:
+        st.info("Aucune classe enregistrée")
+        return
+    
+    classe = st.selectbox("Classe", classes, key="edt_classe")
+    st.dataframe(pd.DataFrame(system.get_emploi_du_temps(classe)), hide_index=True,
+                 use_container_width=True)
+    
+    with st.form("form_emploi_du_temps"):
+        col1, col2 = st.columns(2)
+        with col1:
+            creneau = st.selectbox("Créneau", CRENEAUX_SEMAINE, format_func=lambda c: f"{c[0]} {c[1]}")
+            matiere = st.selectbox("Matière", system.get_matieres_by_classe(classe))
+        with col2:
+            enseignant = st.selectbox("Enseignant", system.emplois_du_temps.enseignants())
+            salle = st.text_input("Salle", placeholder="Salle 12, Labo A, Amphi 1...")
+        
+        if st.form_submit_button("Modifier le créneau"):
+            if not salle.strip():
+                st.error("Veuillez indiquer une salle")
+            else:
+                try:
+                    system.modifier_creneau(classe, *creneau, matiere, enseignant, salle.strip())
+                except ValueError as e:
+                    st.error(f"Conflit : {e}")
+                else:
+                    st.success(f"Créneau {creneau[0]} {creneau[1]} de la {classe} mis à jour")
+
+@st.fragment
+@chronometre("display_activites_scolaires")
+def display_activites_scolaires(eleves):
+    st.markdown("### 📢 Activités et Événements de l'École")
+    
+    # Seules les activités des classes des enfants (ou de toute l'école),
+    # lues dans le calendrier trié à partir d'aujourd'hui ou en remontant
+    classes = {e.classe for e in eleves}
+    periode = st.radio("Période", ["À venir", "Passées"], horizontal=True, key="periode_activites")
+    aujourd_hui = date.today()
+    if periode == "À venir":
+        activites = system.get_activites(debut=aujourd_hui, classes=classes, limite=20)
+    else:
+        activites = system.get_activites(fin=aujourd_hui - timedelta(days=1), classes=classes, limite=20,
+                                         recentes_d_abord=True)
+    
+    if not activites:
+        st.info(f"Aucune activité {'à venir' if periode == 'À venir' else 'passée'} pour le moment.")
+        return
+    
+    for activite in activites:
+        classes_affichees = ', '.join(activite.classes_concernées[:3]) or "Toute l'école"
+        if len(activite.classes_concernées) > 3:
+            classes_affichees += "..."
+        heure = f" à {activite.heure:%H:%M}" if activite.heure else ""
+        with st.container():
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.markdown(f"""
+                <div class='card'>
+                    <h4>{activite.titre}</h4>
+                    <p><strong>📅 Date :</strong> {activite.date:%d/%m/%Y}{heure}</p>
+                    <p><strong>📍 Lieu :</strong> {activite.lieu}</p>
+                    <p><strong>📋 Description :</strong> {activite.description}</p>
+                    <p><strong>👥 Classes concernées :</strong> {classes_affichees}</p>
+                    <span class='subject-badge'>{activite.type_activite}</span>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            with col2:
+                if st.button("S'inscrire", key=f"inscrire_{activite.id}"):
+                    st.success(f"Inscription enregistrée pour {activite.titre}")
+
+@st.fragment
+@chronometre("display_informations_eleve")
+def display_informations_eleve(eleve):
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(f"""
+        <div class='card'>
+            <h4>👤 Informations personnelles</h4>
+            <p><strong>Nom complet :</strong> {eleve.prenom} {eleve.nom}</p>
+            <p><strong>Classe :</strong> {eleve.classe}</p>
+            <p><strong>Date de naissance :</strong> {eleve.date_naissance}</p>
+            <p><strong>Année scolaire :</strong> 2023-2024</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown(f"""
+        <div class='card'>
+            <h4>📚 Matières étudiées</h4>
+            <div style='margin-top: 1rem;'>
+        """, unsafe_allow_html=True)
+        
+        matieres = system.get_matieres_by_classe(eleve.classe)
+        for matiere in matieres:
+            st.markdown(f'<span class="subject-badge">{matiere}</span>', unsafe_allow_html=True)
+        
+        st.markdown("</div></div>", unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class='card'>
+            <h4>🏫 Informations administratives</h4>
+            <p><strong>Établissement :</strong> École Excellence Ivoirienne</p>
+            <p><strong>Adresse :</strong> Rue des Écoles, Cocody, Abidjan</p>
+            <p><strong>Téléphone :</strong> 27 22 40 00 00</p>
+            <p><strong>Email :</strong> contact@excellence-ecole.ci</p>
+            <p><strong>Directeur :</strong> Dr. Paul Yao</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown(f"""
+        <div class='card'>
+            <h4>📞 Contacts d'urgence</h4>
+            <p><strong>Infirmerie scolaire :</strong> 27 22 40 00 01</p>
+            <p><strong>Vie scolaire :</strong> 27 22 40 00 02</p>
+            <p><strong>Conseiller d'orientation :</strong> 27 22 40 00 03</p>
+            <p><strong>Urgences :</strong> 111 ou 185</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+@chronometre("teacher_dashboard")
+def teacher_dashboard():
+    st.markdown("""
+    <div style='margin-bottom: 2rem;'>
+        <h2>👨‍🏫 Tableau de bord Enseignant</h2>
+        <p>Gestion des notes et suivi des élèves</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    afficher_onglets({
+        "📝 Saisie des notes": display_saisie_notes,
+        "👥 Gestion des classes": display_gestion_classes,
+        "📊 Statistiques": display_statistiques_classe,
+        "📥 Import": lambda: display_import(['notes']),
+    }, key="onglets_enseignant")
+
+@st.fragment
+@chronometre("teacher_dashboard.saisie")
+def display_saisie_notes():
+    st.markdown("### Saisie des notes")
+    
+    # Sélection de la classe
+    classes = system.get_classes()
+    selected_classe = st.selectbox("Sélectionnez une classe :", classes)
+    
+    # Sélection de la matière
+    matieres = system.get_matieres_by_classe(selected_classe)
+    selected_matiere = st.selectbox("Sélectionnez une matière :", matieres)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        selected_type = st.selectbox("Type d'évaluation :", ['Devoir', 'Composition', 'Oral'])
+    with col2:
+        selected_date = st.date_input("Date de l'évaluation", datetime.now())
+    
+    # Liste des élèves de la classe
+    eleves_classe = system.get_eleves_by_classe(selected_classe)
+    
+    if eleves_classe:
+        st.markdown(f"### Élèves de {selected_classe} - {selected_matiere}")
+        
+        # Brouillon conservé d'une page à l'autre : rien n'est écrit avant
+        # l'enregistrement final, qui envoie toute la classe en un seul lot.
+        # On ne change de page que par les boutons du formulaire, qui gardent
+        # d'abord les notes de la page affichée.
+        brouillons = st.session_state.setdefault('brouillon_notes', {})
+        brouillon = brouillons.setdefault((selected_classe, selected_matiere), {})
+        pages = st.session_state.setdefault('saisie_pages', {})
+        
+        nb_pages = (len(eleves_classe) - 1) // TAILLE_PAGE_SAISIE + 1
+        page = min(pages.get((selected_classe, selected_matiere), 1), nb_pages)
+        if nb_pages > 1:
+            st.caption(f"Page {page}/{nb_pages} - {len(brouillon)} note(s) en attente d'enregistrement")
+        eleves_page = eleves_classe[(page - 1) * TAILLE_PAGE_SAISIE:page * TAILLE_PAGE_SAISIE]
+        
+        # Les clés des champs changent après un enregistrement pour les vider
+        generation = st.session_state.get('saisie_generation', 0)
+        if 'saisie_message' in st.session_state:
+            st.success(st.session_state.pop('saisie_message'))
+        
+        with st.form("saisie_notes"):
+            notes_data = []
+            for eleve in eleves_page:
+                note_brouillon, coeff_brouillon = brouillon.get(eleve.id, (None, 1))
+                col1, col2, col3 = st.columns([3, 2, 1])
+                with col1:
+                    st.write(f"{eleve.prenom} {eleve.nom}")
+                with col2:
+                    note = st.number_input(
+                        f"Note {eleve.prenom}",
+                        min_value=0.0,
+                        max_value=20.0,
+                        value=note_brouillon,
+                        step=0.25,
+                        key=f"note_{generation}_{selected_matiere}_{eleve.id}"
+                    )
+                with col3:
+                    coeff = st.selectbox(
+                        "Coeff",
+                        [1, 2, 3],
+                        index=coeff_brouillon - 1,
+                        key=f"coeff_{generation}_{selected_matiere}_{eleve.id}"
+                    )
+                
+                notes_data.append({
+                    'eleve': eleve,
+                    'note': note,
+                    'coeff': coeff
+                })
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                precedente = st.form_submit_button("⬅️ Page précédente", disabled=page == 1)
+            with col2:
+                suivante = st.form_submit_button("Page suivante ➡️", disabled=page == nb_pages)
+            with col3:
+                submitted = st.form_submit_button("💾 Enregistrer les notes")
+            
+            if precedente or suivante or submitted:
+                for ligne in notes_data:
+                    if ligne['note'] is None:
+                        brouillon.pop(ligne['eleve'].id, None)
+                    else:
+                        brouillon[ligne['eleve'].id] = (ligne['note'], ligne['coeff'])
+            
+            if precedente or suivante:
+                pages[(selected_classe, selected_matiere)] = page - 1 if precedente else page + 1
+                st.rerun()
+            if submitted:
+                if brouillon:
+                    user = st.session_state.current_user
+                    nouvelles = system.add_notes([{
+                        'eleve_id': eleve_id,
+                        'matiere': selected_matiere,
+                        'note': note,
+                        'coefficient': coeff,
+                        'type_note': selected_type,
+                        'date': selected_date.strftime("%Y-%m-%d"),
+                        'enseignant': f"Prof. {user.nom}"
+                    } for eleve_id, (note, coeff) in brouillon.items()])
+                    brouillon.clear()
+                    pages.pop((selected_classe, selected_matiere), None)
+                    st.session_state.saisie_generation = generation + 1
+                    st.session_state.saisie_message = f"{len(nouvelles)} note(s) enregistrée(s) avec succès !"
+                    st.rerun()
+                else:
+                    st.warning("Aucune note saisie.")
+    else:
+        st.info("Aucun élève dans cette classe.")
+
+@st.fragment
+@chronometre("teacher_dashboard.classes")
+def display_gestion_classes():
+    st.markdown("### Gestion des classes")
+    
+    # Affichage des classes
+    for classe in system.get_classes():
+        with st.expander(f"🎓 {classe}"):
+            eleves_classe = system.get_eleves_by_classe(classe)
+            df_eleves = pd.DataFrame([{
+                'Nom': f"{e.prenom} {e.nom}",
+                'Date naissance': e.date_naissance
+            } for e in eleves_classe])
+            
+            st.dataframe(df_eleves, use_container_width=True)
+            st.metric("Effectif", len(eleves_classe))
+
+@st.fragment
+@chronometre("teacher_dashboard.statistiques")
+def display_statistiques_classe():
+    st.markdown("### Statistiques par classe")
+    
+    # Chaque vue est lue dans le cube de statistiques, tenu à jour à chaque note
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        selected_stats_classe = st.selectbox("Classe pour statistiques :", system.get_classes())
+    if not selected_stats_classe:
+        return
+    matieres = system.get_matieres_by_classe(selected_stats_classe)
+    with col2:
+        matiere = st.selectbox("Matière :", ["Toutes les matières"] + matieres)
+    with col3:
+        trimestre = st.selectbox("Période :", ["Année"] + system.get_trimestres_classe(selected_stats_classe))
+    trimestre = None if trimestre == "Année" else trimestre
+    
+    resume = system.get_statistiques_classe(
+        selected_stats_classe, [None if matiere == "Toutes les matières" else matiere], trimestre).popitem()[1]
+    if resume is None:
+        st.info(f"Aucune note en {matiere} pour la période choisie")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Moyenne de la classe", f"{resume['moyenne']:.2f}/20")
+        st.metric("Meilleure moyenne", f"{resume['max']:.2f}/20")
+        st.metric("Moyenne la plus basse", f"{resume['min']:.2f}/20")
+        st.metric("Écart-type", f"{resume['ecart_type']:.2f}")
+        st.caption(f"{resume['effectif']} élèves - 1er quartile {resume['q1']:.2f}, "
+                   f"médiane {resume['mediane']:.2f}, 3e quartile {resume['q3']:.2f}")
+    
+    with col2:
+        df_histogramme = pd.DataFrame([{'Moyennes': f"{debut}-{fin}", 'Élèves': nombre}
+                                       for debut, fin, nombre in resume['histogramme']])
+        fig = px.bar(df_histogramme, x='Moyennes', y='Élèves',
+                     title=f"Distribution des moyennes - {selected_stats_classe}")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Vue par matière sur la même période
+    st.markdown("#### Par matière")
+    resumes = system.get_statistiques_classe(selected_stats_classe, matieres, trimestre)
+    df_matieres = pd.DataFrame([{
+        'Matière': m,
+        'Élèves': r['effectif'],
+        'Moyenne': r['moyenne'],
+        'Min': r['min'],
+        'Q1': r['q1'],
+        'Médiane': r['mediane'],
+        'Q3': r['q3'],
+        'Max': r['max'],
+        'Écart-type': r['ecart_type'],
+    } for m, r in resumes.items() if r is not None])
+    if not df_matieres.empty:
+        st.dataframe(df_matieres, hide_index=True, use_container_width=True)
+
+@chronometre("admin_dashboard")
+def admin_dashboard():
+    st.markdown("""
+    <div style='margin-bottom: 2rem;'>
+        <h2>⚙️ Tableau de bord Administrateur</h2>
+        <p>Gestion complète du système scolaire</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    afficher_onglets({
+        "👥 Utilisateurs": display_admin_utilisateurs,
+        "🏫 Élèves": display_admin_eleves,
+        "📈 Statistiques": display_admin_statistiques,
+        "⚙️ Configuration": display_configuration,
+        "📥 Import": lambda: display_import(['notes', 'eleves']),
+        "📄 Bulletins": display_generation_bulletins,
+        "⏱️ Performance": display_performance,
+    }, key="onglets_admin")
+
+@st.fragment
+@chronometre("admin_dashboard.utilisateurs")
+def display_admin_utilisateurs():
+    st.markdown("### Gestion des utilisateurs")
+    
+    # Statistiques
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        parents_count = len([u for u in system.users.values() if u.role == 'parent'])
+        st.metric("Parents", parents_count)
+    with col2:
+        teachers_count = len([u for u in system.users.values() if u.role == 'enseignant'])
+        st.metric("Enseignants", teachers_count)
+    with col3:
+        st.metric("Élèves", len(system.eleves))
+    
+    # Liste des utilisateurs
+    users_data = []
+    for username, user in system.users.items():
+        users_data.append({
+            'Username': username,
+            'Nom': f"{user.prenom} {user.nom}",
+            'Rôle': user.role,
+            'Email': user.email,
+            'Téléphone': user.telephone
+        })
+    
+    df_users = pd.DataFrame(users_data)
+    st.dataframe(df_users, use_container_width=True)
+    
+    # Ajout d'utilisateur (démonstration)
+    st.markdown("### Ajouter un utilisateur")
+    with st.form("add_user"):
+        col1, col2 = st.columns(2)
+        with col1:
+            new_username = st.text_input("Nom d'utilisateur")
+            new_password = st.text_input("Mot de passe", type="password")
+            new_role = st.selectbox("Rôle", ["parent", "enseignant", "admin"])
+        with col2:
+            new_nom = st.text_input("Nom")
+            new_prenom = st.text_input("Prénom")
+            new_email = st.text_input("Email")
+        
+        if st.form_submit_button("➕ Ajouter l'utilisateur"):
+            if not new_username or not new_password:
+                st.error("Nom d'utilisateur et mot de passe obligatoires")
+            elif new_username in system.users:
+                st.error("Ce nom d'utilisateur existe déjà")
+            else:
+                system.add_user(User(new_username, system.hash_password(new_password), new_role,
+                                     new_nom, new_prenom, new_email, ""))
+                st.success("Utilisateur ajouté avec succès !")
+
+# Libellé -> (tri, ordre inverse) pour get_page_eleves
+TRIS_ELEVES = {
+    "Nom (A → Z)": ('nom', False),
+    "Nom (Z → A)": ('nom', True),
+    "Classe": ('classe', False),
+    "Moyenne (meilleures d'abord)": ('moyenne', False),
+    "Moyenne (plus faibles d'abord)": ('moyenne', True),
+}
+
+@st.fragment
+@chronometre("admin_dashboard.eleves")
+def display_admin_eleves():
+    st.markdown("### Gestion des élèves")
+    
+    # Filtres
+    col1, col2 = st.columns(2)
+    with col1:
+        filter_classe = st.multiselect("Filtrer par classe", system.get_classes())
+    with col2:
+        search_name = st.text_input("Rechercher un élève", placeholder="Nom, prénom, classe ou numéro")
+    
+    # Affichage des élèves : la recherche (nom, prénom, classe ou numéro,
+    # sans tenir compte des accents) passe par l'index du système ; sinon la
+    # liste est parcourue page par page, seule la page affichée est calculée
+    if search_name:
+        eleves_filtres = system.rechercher_eleves(search_name, limite=50, classes=filter_classe)
+        if len(eleves_filtres) == 50:
+            st.caption("50 meilleurs résultats : précisez la recherche pour affiner")
+    else:
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            tri = st.selectbox("Trier par", list(TRIS_ELEVES))
+        with col2:
+            taille = st.selectbox("Élèves par page", [25, 50, 100], index=1)
+        total = system.count_eleves(filter_classe)
+        nb_pages = max(1, math.ceil(total / taille))
+        # Un changement de filtre peut réduire le nombre de pages
+        if st.session_state.get('page_eleves', 1) > nb_pages:
+            st.session_state.page_eleves = nb_pages
+        with col3:
+            page = st.number_input("Page", min_value=1, max_value=nb_pages, key='page_eleves')
+        eleves_filtres = system.get_page_eleves(page - 1, taille, *TRIS_ELEVES[tri], classes=filter_classe)
+        if eleves_filtres:
+            st.caption(f"Élèves {(page - 1) * taille + 1} à {(page - 1) * taille + len(eleves_filtres)} sur {total} "
+                       f"(page {page}/{nb_pages})")
+    
+    if eleves_filtres:
+        eleves_data = []
+        for eleve in eleves_filtres:
+            moyenne = system.get_moyenne_by_eleve(eleve.id)
+            eleves_data.append({
+                'ID': eleve.id,
+                'Nom': f"{eleve.prenom} {eleve.nom}",
+                'Classe': eleve.classe,
+                'Date naissance': eleve.date_naissance,
+                'Moyenne': moyenne
+            })
+        
+        df_eleves = pd.DataFrame(eleves_data)
+        st.dataframe(
+            df_eleves,
+            column_config={
+                "Moyenne": st.column_config.ProgressColumn(
+                    "Moyenne",
+                    help="Moyenne générale de l'élève",
+                    format="%.2f",
+                    min_value=0,
+                    max_value=20,
+                ),
+            },
+            use_container_width=True
+        )
+    else:
+        st.info("Aucun élève trouvé avec ces filtres.")
+
+@st.fragment
+@chronometre("admin_dashboard.statistiques")
+def display_admin_statistiques():
+    st.markdown("### Statistiques générales")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        total_eleves = len(system.eleves)
+        st.metric("Total élèves", total_eleves)
+    
+    with col2:
+        total_notes = system.count_notes()
+        st.metric("Total notes", total_notes)
+    
+    with col3:
+        total_activites = len(system.activites)
+        st.metric("Activités", total_activites)
+    
+    statistiques = system.get_statistiques()
+    
+    with col4:
+        # Moyenne générale de l'école (calcul vectorisé)
+        st.metric("Moyenne école", f"{statistiques['ecole']:.2f}/20")
+    
+    # Graphique de répartition par classe
+    st.markdown("### Répartition par classe")
+    classes_count = {classe: len(system.get_eleves_by_classe(classe)) for classe in system.get_classes()}
+    
+    df_classes = pd.DataFrame(list(classes_count.items()), columns=['Classe', 'Effectif'])
+    df_classes = df_classes.sort_values('Effectif', ascending=False)
+    
+    fig = px.bar(df_classes, x='Classe', y='Effectif',
+                title="Effectif par classe",
+                color='Effectif',
+                color_continuous_scale='Blues')
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Moyennes par classe
+    st.markdown("### Moyennes par classe")
+    df_moyennes_classes = statistiques['classes'].rename(columns={
+        'classe': 'Classe', 'effectif': 'Effectif', 'moyenne': 'Moyenne',
+        'min': 'Minimum', 'max': 'Maximum'})
+    fig = px.bar(df_moyennes_classes, x='Classe', y='Moyenne',
+                title="Moyenne générale par classe",
+                color='Moyenne',
+                color_continuous_scale='Blues',
+                range_y=[0, 20])
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+@chronometre("admin_dashboard.configuration")
+def display_configuration():
+    st.markdown("### Configuration du système")
+    
+    st.info("Cette section permet de configurer les paramètres généraux de l'application.")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Paramètres généraux")
+        annee_scolaire = st.text_input("Année scolaire", "2023-2024")
+        nom_ecole = st.text_input("Nom de l'école", "École Excellence Ivoirienne")
+        ville = st.text_input("Ville", "Abidjan")
+        
+        st.markdown("#### Notifications")
+        canaux = system.notifications.canaux_actifs if system.notifications is not None else set()
+        notif_email = st.checkbox("Activer notifications email", 'email' in canaux)
+        sans_sms = system.notifications is None or 'sms' not in system.notifications.transports
+        notif_sms = st.checkbox("Activer notifications SMS", 'sms' in canaux, disabled=sans_sms,
+                                help="Aucune passerelle SMS configurée" if sans_sms else None)
+    
+    with col2:
+        st.markdown("#### Paramètres académiques")
+        date_rentree = st.date_input("Date de rentrée", datetime(2024, 9, 2))
+        date_vacances = st.date_input("Début des vacances", datetime(2024, 12, 21))
+        
+        st.markdown("#### Sécurité")
+        duree_actuelle = min(max(round(system.sessions.duree / 900) * 15, 15), 720)
+        session_timeout = st.slider("Timeout session (minutes)", 15, 720, duree_actuelle, step=15)
+        force_complex_password = st.checkbox("Forcer mots de passe complexes", True)
+    
+    if st.button("💾 Sauvegarder la configuration", use_container_width=True):
+        if system.notifications is not None:
+            system.notifications.canaux_actifs = {canal for canal, actif in (('email', notif_email), ('sms', notif_sms))
+                                                  if actif and canal in system.notifications.transports}
+        # Appliquée dès la prochaine requête, y compris aux sessions ouvertes
+        system.sessions.duree = session_timeout * 60
+        st.success("Configuration sauvegardée avec succès !")
+    
+    st.markdown("---")
+    display_notifications()
+    
+    st.markdown("---")
+    display_edition_emploi_du_temps()
+
+def display_notifications():
+    st.markdown("#### Boîte d'envoi des notifications")
+    if system.notifications is None:
+        st.info("Les notifications ne sont pas activées.")
+        return
+    boite = system.notifications.boite
+    compte = boite.compter()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("En attente", compte.get('en_attente', 0) + compte.get('en_cours', 0))
+    col2.metric("Envoyées", compte.get('envoyee', 0))
+    col3.metric("En échec", compte.get('echec', 0))
+    with col4:
+        if st.button("🔁 Relancer les échecs", disabled=not compte.get('echec')):
+            relancees = boite.relancer_echecs()
+            system.notifications.reveiller()
+            st.success(f"{relancees} notification(s) remise(s) en file")
+    derniers = boite.derniers(20)
+    if derniers.empty:
+        st.caption("Aucune notification pour le moment.")
+    else:
+        st.dataframe(derniers.rename(columns={
+            'cree_le': 'Créée le', 'evenement': 'Événement', 'canal': 'Canal', 'destinataire': 'Destinataire',
+            'sujet': 'Sujet', 'statut': 'Statut', 'tentatives': 'Tentatives', 'erreur': 'Erreur'}),
+            hide_index=True, use_container_width=True)
+
+# ============================================
+# GÉNÉRATION DES BULLETINS EN LOT
+# ============================================
+
+class TacheBulletins:
+    # Génération dans un thread de fond : le script Streamlit ne fait que lire
+    # l'avancement, la page reste utilisable pendant le calcul. Le fichier ZIP
+    # temporaire est relu puis supprimé dès la fin de la génération : il ne
+    # reste rien sur le disque, même si la session est abandonnée.
+    def __init__(self, liste_donnees, libelle):
+        self.libelle = libelle
+        self.total = len(liste_donnees)
+        self.faits = 0
+        self.erreur = None
+        self.contenu = None  # archive ZIP, servie au téléchargement
+        self.termine = False
+        self._thread = threading.Thread(target=self._executer, args=(liste_donnees,), daemon=True)
+        self._thread.start()
+    
+    def _executer(self, liste_donnees):
+        fichier = tempfile.NamedTemporaryFile(prefix="bulletins_", suffix=".zip", delete=False)
+        fichier.close()
+        try:
+            generer_bulletins_zip(liste_donnees, fichier.name, progression=self._avancer)
+            with open(fichier.name, 'rb') as archive:
+                self.contenu = archive.read()
+        except Exception as e:
+            self.erreur = str(e)
+        finally:
+            os.remove(fichier.name)
+            self.termine = True
+    
+    def _avancer(self, faits, total):
+        self.faits = faits
+
+@st.fragment(run_every=1)
+def suivre_generation_bulletins(tache):
+    # Fragment rafraîchi seul chaque seconde, sans relancer tout le tableau de
+    # bord, et rendu seulement pendant la génération : une fois la tâche
+    # terminée, une dernière exécution complète affiche le résultat et
+    # l'actualisation s'arrête
+    if tache.termine:
+        st.rerun()
+    st.progress(tache.faits / max(tache.total, 1),
+                text=f"{tache.libelle} : {tache.faits}/{tache.total} bulletins générés")
+
+def display_resultat_bulletins(tache):
+    if tache.erreur:
+        st.error(f"Échec de la génération : {tache.erreur}")
+    else:
+        st.success(f"{tache.libelle} : {tache.total} bulletins prêts")
+        st.download_button("⬇️ Télécharger l'archive ZIP", tache.contenu,
+                           file_name=f"bulletins_{tache.libelle.replace(' ', '_')}.zip",
+                           mime="application/zip", on_click="ignore",
+                           use_container_width=True)
+
+@st.fragment
+@chronometre("display_generation_bulletins")
+def display_generation_bulletins():
+    st.markdown("### 📄 Bulletins scolaires")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        portee = st.selectbox("Bulletins à générer", ["Toute l'école"] + system.get_classes())
+    with col2:
+        # Année entière, ou fin de trimestre : seules les notes du trimestre comptent
+        trimestre = st.selectbox("Période", [None] + trimestres_annee(), format_func=libelle_periode)
+    tache = st.session_state.get('tache_bulletins')
+    en_cours = tache is not None and not tache.termine
+    
+    if st.button("🚀 Lancer la génération", disabled=en_cours, use_container_width=True):
+        eleves = system.eleves if portee == "Toute l'école" else system.get_eleves_by_classe(portee)
+        liste_donnees = [system.get_donnees_bulletin(e.id, trimestre) for e in eleves]
+        st.session_state.tache_bulletins = TacheBulletins(liste_donnees, f"{portee} {libelle_periode(trimestre)}")
+    
+    tache = st.session_state.get('tache_bulletins')
+    if tache is None:
+        return
+    if tache.termine:
+        display_resultat_bulletins(tache)
+    else:
+        suivre_generation_bulletins(tache)
+
+# ============================================
+# IMPORT CSV / EXCEL
+# ============================================
+
+COLONNES_IMPORT = {
+    'notes': ['eleve_id', 'matiere', 'note', 'coefficient', 'type_note', 'date', 'enseignant'],
+    'eleves': ['nom', 'prenom', 'classe', 'date_naissance', 'parent_id'],
+}
+
+# Les autres colonnes ont une valeur par défaut
+COLONNES_OBLIGATOIRES_IMPORT = {
+    'notes': ['eleve_id', 'matiere', 'note'],
+    'eleves': ['nom', 'prenom', 'classe'],
+}
+
+TYPES_NOTE = ['Devoir', 'Composition', 'Oral']
+
+def lire_par_blocs(fichier, nom_fichier, taille=TAILLE_BLOC_IMPORT, obligatoires=()):
+    # Lecture en flux : on ne garde jamais plus d'un bloc de lignes en mémoire.
+    # L'en-tête est vérifié avant la première ligne : un fichier dont les
+    # colonnes ne conviennent pas est refusé en un seul message.
+    if nom_fichier.lower().endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+        classeur = load_workbook(fichier, read_only=True, data_only=True)
+        lignes = classeur.active.iter_rows(values_only=True)
+        entete = [str(c).strip().lower() if c is not None else '' for c in next(lignes, ())]
+    else:
+        texte = TextIOWrapper(fichier, encoding='utf-8-sig', newline='')
+        try:
+            dialecte = csv.Sniffer().sniff(texte.read(4096), delimiters=',;\t')
+        except csv.Error:
+            dialecte = csv.excel
+        texte.seek(0)
+        lignes = csv.reader(texte, dialecte)
+        entete = [c.strip().lower() for c in next(lignes, [])]
+    manquantes = [colonne for colonne in obligatoires if colonne not in entete]
+    if manquantes:
+        raise ValueError(f"colonne(s) manquante(s) : {', '.join(manquantes)} "
+                         f"(en-tête lu : {', '.join(c for c in entete if c) or 'vide'})")
+    bloc = []
+    for ligne in lignes:
+        if not any(v not in (None, '') for v in ligne):
+            continue
+        bloc.append(dict(zip(entete, ligne)))
+        if len(bloc) >= taille:
+            yield bloc
+            bloc = []
+    if bloc:
+        yield bloc
+
+def _texte(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, datetime):
+        return valeur.strftime("%Y-%m-%d")
+    return str(valeur).strip()
+
+def _nombre(ligne, colonne, defaut=None):
+    texte = _texte(ligne.get(colonne)).replace(',', '.')
+    if not texte:
+        if defaut is None:
+            raise ValueError(f"colonne '{colonne}' vide")
+        return defaut
+    try:
+        return float(texte)
+    except ValueError:
+        raise ValueError(f"colonne '{colonne}' : '{texte}' n'est pas un nombre") from None
+
+@lru_cache(maxsize=4096)
+def _date_valide(valeur):
+    # Peu de dates distinctes dans un fichier : chacune n'est analysée qu'une fois
+    try:
+        return date.fromisoformat(valeur).isoformat()
+    except ValueError:
+        raise ValueError(f"date '{valeur}' invalide (format AAAA-MM-JJ)") from None
+
+def valider_ligne_note(system, ligne):
+    eleve_id = _nombre(ligne, 'eleve_id')
+    if not eleve_id.is_integer():
+        raise ValueError(f"colonne 'eleve_id' : '{eleve_id:g}' n'est pas un identifiant")
+    eleve_id = int(eleve_id)
+    eleve = system.get_eleve(eleve_id)
+    if eleve is None:
+        raise ValueError(f"élève {eleve_id} inconnu")
+    matiere = _texte(ligne.get('matiere'))
+    if matiere not in system.get_matieres_by_classe(eleve.classe):
+        raise ValueError(f"matière '{matiere}' non enseignée en {eleve.classe}")
+    note = _nombre(ligne, 'note')
+    if not 0 <= note <= 20:
+        raise ValueError(f"note {note} hors de l'intervalle 0-20")
+    coefficient = _nombre(ligne, 'coefficient', defaut=1)
+    if coefficient not in (1, 2, 3):
+        raise ValueError(f"coefficient {coefficient:g} invalide (1 à 3)")
+    type_note = _texte(ligne.get('type_note')) or 'Devoir'
+    if type_note not in TYPES_NOTE:
+        raise ValueError(f"type de note '{type_note}' invalide")
+    return {
+        'eleve_id': eleve_id,
+        'matiere': matiere,
+        'note': note,
+        'coefficient': int(coefficient),
+        'type_note': type_note,
+        'date': _date_valide(_texte(ligne.get('date')) or datetime.now().strftime("%Y-%m-%d")),
+        'enseignant': _texte(ligne.get('enseignant')),
+    }
+
+def valider_ligne_eleve(system, ligne):
+    valeurs = {colonne: _texte(ligne.get(colonne)) for colonne in COLONNES_IMPORT['eleves']}
+    for colonne in ('nom', 'prenom', 'classe'):
+        if not valeurs[colonne]:
+            raise ValueError(f"colonne '{colonne}' vide")
+    if valeurs['date_naissance']:
+        _date_valide(valeurs['date_naissance'])
+    return valeurs
+
+def importer_fichier(system, fichier, nom_fichier, type_import, progression=None):
+    valider = valider_ligne_note if type_import == 'notes' else valider_ligne_eleve
+    # Pas de notification par bloc : un résumé par parent à la fin
+    nb_par_eleve = Counter()
+    
+    def ajouter(valides):
+        if type_import == 'notes':
+            system.add_notes(valides, notifier=False)
+            nb_par_eleve.update(ligne['eleve_id'] for ligne in valides)
+        else:
+            system.add_eleves(valides)
+    
+    bilan = {'lignes': 0, 'importees': 0, 'nb_erreurs': 0, 'erreurs': []}
+    numero = 1  # la ligne 1 est l'en-tête
+    for bloc in lire_par_blocs(fichier, nom_fichier, obligatoires=COLONNES_OBLIGATOIRES_IMPORT[type_import]):
+        valides = []
+        for ligne in bloc:
+            numero += 1
+            try:
+                valides.append(valider(system, ligne))
+            except (ValueError, TypeError) as e:
+                bilan['nb_erreurs'] += 1
+                if len(bilan['erreurs']) < MAX_ERREURS_IMPORT:
+                    bilan['erreurs'].append({'Ligne': numero, 'Erreur': str(e)})
+        # Un bloc validé = une écriture groupée
+        ajouter(valides)
+        bilan['lignes'] += len(bloc)
+        bilan['importees'] += len(valides)
+        if progression is not None:
+            progression(bilan)
+    if nb_par_eleve:
+        system.notifier_notes_importees(nb_par_eleve)
+    return bilan
+
+@st.fragment
+@chronometre("display_import")
+def display_import(types_autorises):
+    st.markdown("### 📥 Import de fichiers CSV / Excel")
+    
+    type_import = st.radio("Données à importer", types_autorises,
+                           format_func=lambda t: {'notes': "Notes", 'eleves': "Élèves"}[t],
+                           horizontal=True)
+    colonnes = COLONNES_IMPORT[type_import]
+    st.markdown(f"Colonnes attendues : `{'`, `'.join(colonnes)}`")
+    st.download_button("📄 Télécharger un modèle", ";".join(colonnes) + "\n",
+                       file_name=f"modele_{type_import}.csv", mime="text/csv")
+    
+    fichier = st.file_uploader("Fichier à importer", type=['csv', 'xlsx'], key=f"import_{type_import}")
+    if fichier is not None and st.button("📥 Lancer l'import", use_container_width=True):
+        barre = st.progress(0.0, text="Import en cours...")
+        taille = max(fichier.size, 1)
+        
+        def progression(bilan):
+            # Avancement approximatif d'après la position dans le fichier
+            position = fichier.tell() if not fichier.closed else taille
+            barre.progress(min(position / taille, 1.0),
+                           text=f"{bilan['lignes']} lignes lues, {bilan['importees']} importées")
+        
+        try:
+            bilan = importer_fichier(system, fichier, fichier.name, type_import, progression)
+        except (ValueError, KeyError, csv.Error) as e:
+            st.error(f"Fichier illisible : {e}")
+            return
+        barre.progress(1.0, text="Import terminé")
+        st.success(f"{bilan['importees']} ligne(s) importée(s) sur {bilan['lignes']}")
+        if bilan['nb_erreurs']:
+            st.warning(f"{bilan['nb_erreurs']} ligne(s) rejetée(s)")
+            df_erreurs = pd.DataFrame(bilan['erreurs'])
+            st.dataframe(df_erreurs, hide_index=True, use_container_width=True)
+            st.download_button("⬇️ Télécharger le rapport d'erreurs",
+                               df_erreurs.to_csv(index=False, sep=';'),
+                               file_name="erreurs_import.csv", mime="text/csv")
+
+# ============================================
+# PERFORMANCE
+# ============================================
+
+def texte_profil(stats, limite=40):
+    flux = StringIO()
+    copie = pstats.Stats(stream=flux)
+    copie.add(stats)
+    copie.sort_stats("cumulative").print_stats(limite)
+    return flux.getvalue()
+
+def display_performance():
+    st.markdown("### ⏱️ Performance")
+    st.caption(f"Mesures depuis le {MESURES.depuis:%d/%m/%Y à %H:%M:%S}, toutes sessions confondues")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        MESURES.actif = st.toggle("Mesurer les temps de rendu et des requêtes", value=MESURES.actif)
+    with col2:
+        if st.button("🔄 Réinitialiser les mesures"):
+            MESURES.reinitialiser()
+    
+    appels_cache = system.cache_affichage.succes + system.cache_affichage.echecs
+    st.caption(f"Cache d'affichage : {len(system.cache_affichage)} vue(s), "
+               f"{system.cache_affichage.octets / 1024 / 1024:.1f}/{system.cache_affichage.max_octets / 1024 / 1024:.0f} Mo, "
+               f"{system.cache_affichage.succes / appels_cache if appels_cache else 0:.0%} de succès")
+    
+    df_mesures = MESURES.tableau()
+    if df_mesures.empty:
+        st.info("Aucune mesure pour le moment")
+    else:
+        st.dataframe(df_mesures, hide_index=True, use_container_width=True)
+        df_top = df_mesures.nlargest(15, 'p95 (ms)').sort_values('p95 (ms)')
+        fig = px.bar(df_top, x='p95 (ms)', y='Section', orientation='h',
+                     title="Sections les plus lentes (p95)", hover_data=['p50 (ms)', 'Appels'])
+        st.plotly_chart(fig, use_container_width=True)
+        
+        horodatage = f"{datetime.now():%Y%m%d_%H%M%S}"
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("💾 Exporter (CSV)", df_mesures.to_csv(index=False, sep=';'),
+                               file_name=f"performance_{horodatage}.csv", mime="text/csv",
+                               use_container_width=True)
+        with col2:
+            st.download_button("💾 Exporter (JSON)", df_mesures.to_json(orient='records', force_ascii=False),
+                               file_name=f"performance_{horodatage}.json", mime="application/json",
+                               use_container_width=True)
+    
+    # Profil cProfile des rafraîchissements de cette session uniquement
+    st.markdown("#### Profilage (cProfile)")
+    st.toggle("Profiler les prochains rafraîchissements de cette session", key="profilage")
+    profil = st.session_state.get('profil')
+    if profil is not None:
+        st.code(texte_profil(profil), language=None)
+        with tempfile.NamedTemporaryFile(suffix=".prof") as fichier:
+            profil.dump_stats(fichier.name)
+            contenu = fichier.read()
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("💾 Exporter le profil (.prof)", contenu, file_name="profil.prof",
+                               mime="application/octet-stream", use_container_width=True)
+        with col2:
+            if st.button("🗑️ Effacer le profil", use_container_width=True):
+                del st.session_state['profil']
+                st.rerun()
+
+# ============================================
+# APPLICATION PRINCIPALE
+# ============================================
+
+def main():
+    if not st.session_state.get('profilage'):
+        afficher_page()
+        return
+    profileur = cProfile.Profile()
+    profileur.enable()
+    try:
+        afficher_page()
+    finally:
+        profileur.disable()
+        # Profils cumulés d'un rafraîchissement à l'autre
+        profil = st.session_state.get('profil')
+        if profil is None:
+            st.session_state.profil = pstats.Stats(profileur)
+        else:
+            profil.add(profileur)
+
+def afficher_page():
+    verifier_session()
+    display_header()
+    
+    if not st.session_state.logged_in:
+        login_form()
+    else:
+        user = st.session_state.current_user
+        
+        # Navigation selon le rôle
+        if user.role == 'parent':
+            parent_dashboard()
+        elif user.role == 'enseignant':
+            teacher_dashboard()
+        elif user.role == 'admin':
+            admin_dashboard()
+        else:
+            st.error("Rôle utilisateur non reconnu")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
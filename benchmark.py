@@ -0,0 +1,300 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+# ============================================
+# BANC D'ESSAI DES PERFORMANCES
+# ============================================
+# Mesure les requêtes de SchoolManagementSystem et le rendu complet des
+# tableaux de bord (via streamlit.testing) à plusieurs tailles de données.
+#
+#   python benchmark.py                                  # comparé à benchmark_baseline.json
+#   python benchmark.py --tailles 1000,50000 --sortie resultats.json
+#   python benchmark.py --enregistrer-baseline           # nouvelle référence
+#   python benchmark.py --baseline autre_reference.json
+#   python benchmark.py --sans-baseline                  # mesures seules
+#
+# Les mesures sont comparées à benchmark_baseline.json dès que ce fichier
+# existe (ou à --baseline) ; le code de retour vaut 1 si une mesure régresse.
+#
+# La référence dépend de la machine : elle se produit sur la machine qui
+# compare, avec les mêmes options (--tailles, --stockages...), par
+# --enregistrer-baseline, et se versionne avec le code. On la régénère
+# après une optimisation ou un ralentissement assumé, dans le même commit,
+# et jamais pour faire disparaître une régression inexpliquée.
+
+RACINE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(RACINE, "Code.py")
+BASELINE = os.path.join(RACINE, "benchmark_baseline.json")
+
+# Écart toléré par rapport à la référence, et écart absolu en dessous
+# duquel une différence est considérée comme du bruit de mesure
+TOLERANCE = 0.25
+BRUIT_MS = 0.02
+
+COMPTES = {
+    'parent': ("parent1", "pass123"),
+    'enseignant': ("prof1", "prof123"),
+    'admin': ("admin", "admin123"),
+}
+
+def charger_application():
+    # Code.py est un script Streamlit : importé hors de `streamlit run`, il
+    # s'exécute en mode « bare » et main() n'est pas appelé
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    os.environ.pop("ECOLE_DB_PATH", None)
+    os.environ.pop("ECOLE_JOURNAL_DIR", None)
+    sys.path.insert(0, RACINE)
+    import Code
+    return Code
+
+def parametres_pour(app, taille):
+    # Environ 40 élèves par classe, 7 niveaux
+    return app.ParametresGeneration(nb_eleves=taille, classes_par_niveau=max(2, round(taille / 280)))
+
+def resume(nom, taille, durees, stockage="memoire"):
+    ms = np.asarray(durees) * 1000
+    return {
+        'nom': nom,
+        'taille': taille,
+        'stockage': stockage,
+        'repetitions': len(ms),
+        'mediane_ms': round(float(np.median(ms)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'min_ms': round(float(ms.min()), 4),
+    }
+
+def mesurer(fonction, arguments):
+    durees = []
+    for args in arguments:
+        debut = time.perf_counter()
+        fonction(*args)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+# --- Requêtes ---
+
+def bench_requetes(app, taille, repetitions, stockage, rng):
+    store = None
+    if stockage == "sqlite":
+        dossier = tempfile.mkdtemp()
+        store = app.SQLiteStore(os.path.join(dossier, "benchmark.db"))
+    debut = time.perf_counter()
+    system = app.SchoolManagementSystem(store, parametres=parametres_pour(app, taille))
+    resultats = [resume("chargement", taille, [time.perf_counter() - debut], stockage)]
+
+    eleves = [system.get_eleve(int(i)) for i in rng.choice([e.id for e in system.eleves], size=repetitions)]
+    classes = system.get_classes()
+    par_eleve = [(e.id,) for e in eleves]
+    requetes = [
+        ("get_moyenne_by_eleve", system.get_moyenne_by_eleve, par_eleve),
+        ("get_moyenne_by_matiere", system.get_moyenne_by_matiere,
+         [(e.id, system.get_matieres_by_classe(e.classe)[0]) for e in eleves]),
+        ("get_notes_by_eleve", system.get_notes_by_eleve, par_eleve),
+        ("get_rang_by_eleve", system.get_rang_by_eleve, par_eleve),
+        ("get_eleves_by_classe", system.get_eleves_by_classe,
+         [(classes[i % len(classes)],) for i in range(repetitions)]),
+        ("get_emploi_du_temps", system.get_emploi_du_temps,
+         [(classes[i % len(classes)],) for i in range(repetitions)]),
+        ("get_donnees_bulletin", system.get_donnees_bulletin, par_eleve),
+        ("rechercher_eleves (préfixe)", system.rechercher_eleves, [(e.nom[:3],) for e in eleves]),
+        ("rechercher_eleves (nom complet)", system.rechercher_eleves, [(f"{e.prenom} {e.nom}",) for e in eleves]),
+        ("get_activites", system.get_activites,
+         [(date(2024, 3, 1), None, {e.classe}, 20) for e in eleves]),
+        ("get_page_eleves", system.get_page_eleves,
+         [(int(rng.integers(max(1, taille // 50))), 50, ('nom', 'classe', 'moyenne')[i % 3], i % 2 == 1)
+          for i in range(repetitions)]),
+    ]
+    for nom, fonction, arguments in requetes:
+        resultats.append(resume(nom, taille, mesurer(fonction, arguments), stockage))
+
+    # Statistiques globales à froid : une modification (sans effet sur les
+    # valeurs) invalide le cache avant chaque mesure
+    note = system.get_notes_by_eleve(eleves[0].id)[0]
+    durees = []
+    for _ in range(min(repetitions, 20)):
+        system.update_note(note.id, note=note.note)
+        durees.append(mesurer(system.get_statistiques, [()])[0])
+    resultats.append(resume("get_statistiques", taille, durees, stockage))
+    resultats.append(resume("get_statistiques (cache)", taille,
+                            mesurer(system.get_statistiques, [()] * repetitions), stockage))
+
+    # Fonctions d'affichage appelées directement (mode bare, sans navigateur) ;
+    # hors d'une exécution Streamlit, st.fragment n'appelle pas la fonction
+    # décorée : on mesure la fonction d'origine
+    app.system = system
+    for nom, fonction in (("display_notes_tab", app.display_notes_tab),
+                          ("display_emploi_du_temps", app.display_emploi_du_temps)):
+        resultats.append(resume(nom, taille, mesurer(inspect.unwrap(fonction), [(e,) for e in eleves[:20]]),
+                                stockage))
+
+    if store is not None:
+        store.close()
+    return resultats
+
+# --- Journal ---
+
+def bench_journal(app, taille, repetitions):
+    # Écritures journalisées, puis redémarrage : dernier instantané et
+    # rejeu des opérations qui le suivent
+    dossier = tempfile.mkdtemp()
+    system = app.SchoolManagementSystem(parametres=parametres_pour(app, taille), journal=app.Journal(dossier))
+    eleve = system.eleves[0]
+    ligne = (eleve.id, system.get_matieres_by_classe(eleve.classe)[0], 12.0, 1, "Devoir", "2024-04-02", "Prof. Test")
+    resultats = [resume("add_note", taille, mesurer(system.add_note, [ligne] * repetitions), "journal")]
+    system.journal.fermer()
+    debut = time.perf_counter()
+    system = app.SchoolManagementSystem(parametres=parametres_pour(app, taille), journal=app.Journal(dossier))
+    resultats.append(resume("redémarrage", taille, [time.perf_counter() - debut], "journal"))
+    # Notes lues dans la projection de l'instantané
+    eleves = system.eleves[1:repetitions + 1]
+    resultats.append(resume("get_notes_by_eleve", taille,
+                            mesurer(system.get_notes_by_eleve, [(e.id,) for e in eleves]), "journal"))
+    system.journal.fermer()
+    return resultats
+
+# --- Rendus complets ---
+
+def bench_rendus(taille, repetitions):
+    # Chaque rendu rejoue le script entier comme un rafraîchissement de page
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    os.environ["ECOLE_NB_ELEVES"] = str(taille)
+    os.environ["ECOLE_CLASSES_PAR_NIVEAU"] = str(max(2, round(taille / 280)))
+    st.cache_resource.clear()
+
+    resultats = []
+    for role, (utilisateur, mot_de_passe) in COMPTES.items():
+        at = AppTest.from_file(SCRIPT, default_timeout=600)
+        at.run()
+        at.text_input[0].input(utilisateur)
+        at.text_input[1].input(mot_de_passe)
+        at.button[0].click()
+        debut = time.perf_counter()
+        at.run()
+        premiere = time.perf_counter() - debut
+        if at.exception:
+            raise RuntimeError(f"Rendu {role} : {[e.message for e in at.exception]}")
+        durees = []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            at.run()
+            durees.append(time.perf_counter() - debut)
+        resultats.append(resume(f"rendu_{role} (connexion)", taille, [premiere]))
+        resultats.append(resume(f"rendu_{role}", taille, durees))
+    return resultats
+
+# --- Comparaison ---
+
+def comparer(resultats, baseline, tolerance):
+    reference = {(r['nom'], r['taille'], r['stockage']): r for r in baseline['resultats']}
+    regressions = []
+    for r in resultats:
+        ref = reference.get((r['nom'], r['taille'], r['stockage']))
+        if ref is None:
+            continue
+        r['baseline_ms'] = ref['mediane_ms']
+        r['ratio'] = round(r['mediane_ms'] / ref['mediane_ms'], 3) if ref['mediane_ms'] else None
+        if r['mediane_ms'] > ref['mediane_ms'] * (1 + tolerance) and \
+                r['mediane_ms'] - ref['mediane_ms'] > BRUIT_MS:
+            regressions.append(r)
+    return regressions
+
+def afficher(resultats, regressions):
+    signales = {id(r) for r in regressions}
+    print(f"{'mesure':<34} {'taille':>7} {'stockage':>8} {'médiane ms':>11} {'p95 ms':>10} {'ratio':>7}")
+    for r in resultats:
+        ratio = f"{r['ratio']:.2f}" if r.get('ratio') is not None else "-"
+        alerte = "  << RÉGRESSION" if id(r) in signales else ""
+        print(f"{r['nom']:<34} {r['taille']:>7} {r['stockage']:>8} {r['mediane_ms']:>11.3f} "
+              f"{r['p95_ms']:>10.3f} {ratio:>7}{alerte}")
+
+def version_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'application de gestion scolaire")
+    parser.add_argument("--tailles", default="100,5000,50000",
+                        help="nombres d'élèves, séparés par des virgules")
+    parser.add_argument("--repetitions", type=int, default=200, help="appels par requête")
+    parser.add_argument("--rendus", type=int, default=5, help="rendus complets par tableau de bord")
+    parser.add_argument("--stockages", default="memoire",
+                        help="memoire, sqlite, journal, ou plusieurs séparés par des virgules")
+    parser.add_argument("--sans-rendus", action="store_true", help="ne mesurer que les requêtes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sortie", default=os.path.join(RACINE, "benchmark_resultats.json"))
+    parser.add_argument("--baseline", help=f"fichier JSON de référence à comparer "
+                                           f"(par défaut {os.path.basename(BASELINE)} s'il existe)")
+    parser.add_argument("--sans-baseline", action="store_true", help="ne comparer à aucune référence")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--enregistrer-baseline", action="store_true",
+                        help=f"écrire aussi les résultats dans {os.path.basename(BASELINE)}")
+    args = parser.parse_args()
+
+    app = charger_application()
+    rng = np.random.default_rng(args.seed)
+    resultats = []
+    for taille in [int(t) for t in args.tailles.split(",")]:
+        for stockage in args.stockages.split(","):
+            print(f"Requêtes : {taille} élèves ({stockage})...", file=sys.stderr)
+            if stockage == "journal":
+                resultats += bench_journal(app, taille, args.repetitions)
+            else:
+                resultats += bench_requetes(app, taille, args.repetitions, stockage, rng)
+        if not args.sans_rendus:
+            print(f"Rendus : {taille} élèves...", file=sys.stderr)
+            resultats += bench_rendus(taille, args.rendus)
+
+    # Une nouvelle référence n'est pas comparée à celle qu'elle remplace
+    baseline = args.baseline
+    if baseline is None and not args.sans_baseline and not args.enregistrer_baseline:
+        if os.path.exists(BASELINE):
+            baseline = BASELINE
+        else:
+            print(f"Pas de référence {os.path.basename(BASELINE)} : aucune comparaison "
+                  f"(la créer avec --enregistrer-baseline)", file=sys.stderr)
+    regressions = []
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            reference = json.load(f)
+        print(f"Comparaison à {os.path.relpath(baseline)} ({reference.get('commit')}, {reference.get('date')})",
+              file=sys.stderr)
+        if (reference.get('plateforme'), reference.get('processeurs')) != (platform.platform(), os.cpu_count()):
+            print("Attention : référence mesurée sur une autre machine, les écarts ne sont pas significatifs",
+                  file=sys.stderr)
+        regressions = comparer(resultats, reference, args.tolerance)
+
+    rapport = {
+        'date': datetime.now().isoformat(timespec="seconds"),
+        'commit': version_git(),
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'processeurs': os.cpu_count(),
+        'resultats': resultats,
+    }
+    chemins = [args.sortie] + ([BASELINE] if args.enregistrer_baseline else [])
+    for chemin in chemins:
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+
+    afficher(resultats, regressions)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.tolerance:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
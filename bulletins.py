@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from fpdf import FPDF
+
+# ============================================
+# BULLETINS SCOLAIRES (PDF)
+# ============================================
+# Module séparé de Code.py : les processus du pool doivent pouvoir importer
+# la fonction de rendu sans réexécuter le script Streamlit.
+
+def appreciation(moyenne):
+    return "Excellent" if moyenne >= 16 else \
+           "Très bien" if moyenne >= 14 else \
+           "Bien" if moyenne >= 12 else \
+           "Assez bien" if moyenne >= 10 else \
+           "Passable" if moyenne >= 8 else "Insuffisant"
+
+def _latin1(texte):
+    # Les polices PDF standard ne couvrent que le latin-1
+    return str(texte).replace("œ", "oe").replace("’", "'").encode("latin-1", "replace").decode("latin-1")
+
+def nom_fichier_bulletin(donnees):
+    eleve = donnees['eleve']
+    nom = f"{eleve['classe']}_{eleve['nom']}_{eleve['prenom']}_{eleve['id']}".replace(" ", "_")
+    return f"bulletin_{nom}.pdf"
+
+def construire_bulletin(donnees):
+    # donnees : dictionnaire simple (picklable) préparé par SchoolManagementSystem
+    eleve = donnees['eleve']
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.cell(0, 10, _latin1(donnees['etablissement']), align="C", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "", 11)
+    pdf.cell(0, 7, _latin1(f"Bulletin de notes - {donnees['periode']}"),
+             align="C", new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(6)
+
+    pdf.set_font("Helvetica", "", 11)
+    for libelle, valeur in (("Élève", f"{eleve['prenom']} {eleve['nom']}"),
+                            ("Classe", eleve['classe']),
+                            ("Date de naissance", eleve['date_naissance'])):
+        pdf.cell(45, 7, _latin1(f"{libelle} :"))
+        pdf.cell(0, 7, _latin1(valeur), new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(4)
+
+    with pdf.table(col_widths=(70, 30, 60), text_align=("LEFT", "CENTER", "LEFT")) as table:
+        entete = table.row()
+        for titre in ("Matière", "Moyenne", "Appréciation"):
+            entete.cell(_latin1(titre))
+        for matiere in donnees['matieres']:
+            ligne = table.row()
+            ligne.cell(_latin1(matiere['matiere']))
+            if matiere['evaluee']:
+                ligne.cell(f"{matiere['moyenne']:.2f}")
+                ligne.cell(_latin1(appreciation(matiere['moyenne'])))
+            else:
+                ligne.cell("-")
+                ligne.cell(_latin1("Non évalué"))
+    pdf.ln(6)
+
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, _latin1(f"Moyenne générale : {donnees['moyenne']:.2f}/20 - {appreciation(donnees['moyenne'])}"),
+             new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "", 11)
+    pdf.cell(0, 8, _latin1(f"Rang : {donnees['rang']}"), new_x="LMARGIN", new_y="NEXT")
+
+    return nom_fichier_bulletin(donnees), bytes(pdf.output())
+
+def _contexte_pool():
+    # Jamais fork : spawn, ou forkserver qui part d'un processus neuf ayant
+    # déjà importé ce module (et fpdf)
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexte = multiprocessing.get_context("forkserver")
+        contexte.set_forkserver_preload([__name__])
+        return contexte
+    return multiprocessing.get_context("spawn")
+
+def _generer(liste_donnees, destination, progression, max_workers):
+    # Les PDF sont écrits dans l'archive au fur et à mesure qu'ils arrivent du pool
+    total = len(liste_donnees)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=_contexte_pool()) as pool, \
+         zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) as archive:
+        taille_lot = max(1, min(64, total // (max_workers * 4) or 1))
+        for fait, (nom, contenu) in enumerate(pool.map(construire_bulletin, liste_donnees,
+                                                      chunksize=taille_lot), start=1):
+            archive.writestr(nom, contenu)
+            progression(fait, total)
+
+def generer_bulletins_zip(liste_donnees, destination, progression=None, max_workers=None):
+    # Le pool tourne dans un processus Python neuf (python -m bulletins) : le
+    # serveur Streamlit, qui a de nombreux threads, n'est jamais forké (un
+    # verrou tenu par un autre thread bloquerait le fils), et spawn lancé
+    # depuis Streamlit réexécuterait Code.py, installé comme __main__, dans
+    # chaque processus. Les données arrivent par stdin, l'avancement par stdout
+    # en lignes « avancement <n> » ; toute autre ligne est ignorée.
+    total = len(liste_donnees)
+    max_workers = max_workers or min(os.cpu_count() or 1, 8)
+    commande = [sys.executable, "-m", __name__, os.path.abspath(destination), str(max_workers)]
+    with subprocess.Popen(commande, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                          cwd=os.path.dirname(os.path.abspath(__file__))) as processus:
+        pickle.dump(liste_donnees, processus.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        processus.stdin.close()
+        for ligne in processus.stdout:
+            mot, _, fait = ligne.partition(b" ")
+            if mot == b"avancement" and fait.strip().isdigit() and progression is not None:
+                progression(int(fait), total)
+    if processus.returncode:
+        raise RuntimeError(f"le processus de génération s'est arrêté (code {processus.returncode})")
+    return destination
+
+if __name__ == "__main__":
+    # python -m bulletins destination nb_processus < liste des données (pickle)
+    # stdout est réservé à l'avancement : le descripteur 1, dont héritent
+    # aussi les processus du pool, est redirigé vers stderr pour toute autre
+    # sortie (messages de bibliothèques, print oubliés)
+    avancement = os.fdopen(os.dup(1), "w")
+    os.dup2(2, 1)
+    
+    def signaler(fait, total):
+        print(f"avancement {fait}", file=avancement, flush=True)
+    
+    _generer(pickle.load(sys.stdin.buffer), sys.argv[1], signaler, int(sys.argv[2]))
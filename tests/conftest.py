@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Code.py lit sa configuration à l'import : les tests partent toujours
+# d'une application sans base, sans journal et sans transport réel
+for variable in ("ECOLE_DB_PATH", "ECOLE_JOURNAL_DIR", "ECOLE_BOITE_ENVOI_PATH",
+                 "ECOLE_SMTP_HOTE"):
+    os.environ.pop(variable, None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Code  # noqa: E402
+
+@pytest.fixture(scope="session")
+def parametres():
+    return Code.ParametresGeneration(nb_eleves=120, classes_par_niveau=1, notes_par_matiere=2, seed=7)
+
+class Horloge:
+    # Remplace time.monotonic et time.time dans Code sans toucher au reste
+    # du module time
+    def __init__(self):
+        self.maintenant = 1000.0
+
+    def monotonic(self):
+        return self.maintenant
+
+    def time(self):
+        return self.maintenant
+
+    def __getattr__(self, nom):
+        return getattr(time, nom)
+
+@pytest.fixture
+def horloge(monkeypatch):
+    horloge = Horloge()
+    monkeypatch.setattr(Code, "time", horloge)
+    return horloge
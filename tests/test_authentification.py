@@ -0,0 +1,58 @@
+import pytest
+
+import Code
+
+@pytest.fixture
+def system(parametres):
+    return Code.SchoolManagementSystem(parametres=parametres)
+
+def test_blocage_apres_echecs(system, horloge):
+    for _ in range(Code.MAX_ECHECS_CONNEXION):
+        with pytest.raises(ValueError, match="Mot de passe incorrect"):
+            system.authentifier("admin", "mauvais", "10.0.0.1")
+    with pytest.raises(ValueError, match="Trop de tentatives"):
+        system.authentifier("admin", "admin123", "10.0.0.1")
+    # Même utilisateur depuis un autre client : toujours bloqué
+    with pytest.raises(ValueError, match="Trop de tentatives"):
+        system.authentifier("admin", "admin123", "10.0.0.2")
+    horloge.maintenant += Code.BLOCAGE_INITIAL_S + 1
+    assert system.get_user_by_jeton(system.authentifier("admin", "admin123", "10.0.0.1")).username == "admin"
+
+def test_blocage_double_et_plafonne(horloge):
+    limiteur = Code.LimiteurTentatives(max_echecs=3, blocage_initial=10, blocage_max=35)
+    cles = [('utilisateur', 'admin')]
+    attentes = []
+    for _ in range(6):
+        limiteur.echec(cles)
+        attentes.append(limiteur.attente(cles))
+    assert attentes == [0, 0, 10, 20, 35, 35]
+    limiteur.succes(cles)
+    assert limiteur.attente(cles) == 0
+    limiteur.echec(cles)
+    assert limiteur.attente(cles) == 0
+
+def test_echecs_anciens_oublies(horloge):
+    limiteur = Code.LimiteurTentatives(max_echecs=3, blocage_initial=10, blocage_max=60)
+    cles = [('client', '10.0.0.1')]
+    limiteur.echec(cles)
+    limiteur.echec(cles)
+    horloge.maintenant += 61
+    limiteur.echec(cles)
+    assert limiteur.attente(cles) == 0
+
+def test_expiration_glissante_des_sessions(system, horloge):
+    system.sessions.duree = 600
+    jeton = system.authentifier("prof1", "prof123")
+    horloge.maintenant += 500
+    assert system.get_user_by_jeton(jeton).username == "prof1"
+    horloge.maintenant += 500
+    assert system.get_user_by_jeton(jeton).username == "prof1"
+    horloge.maintenant += 601
+    assert system.get_user_by_jeton(jeton) is None
+    assert len(system.sessions) == 0
+
+def test_nouvelle_duree_appliquee_aux_sessions_ouvertes(system, horloge):
+    jeton = system.authentifier("parent1", "pass123")
+    horloge.maintenant += 20 * 60
+    system.sessions.duree = 15 * 60
+    assert system.get_user_by_jeton(jeton) is None
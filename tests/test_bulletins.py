@@ -0,0 +1,26 @@
+import zipfile
+
+import bulletins
+
+def donnees(i):
+    return {
+        'etablissement': "École Excellence Ivoirienne",
+        'periode': "2e trimestre 2023-2024",
+        'eleve': {'id': i, 'nom': "Koné", 'prenom': f"Awa {i}", 'classe': "6ème A",
+                  'date_naissance': "2012-03-04"},
+        'matieres': [{'matiere': "Mathématiques", 'evaluee': True, 'moyenne': 12.5},
+                     {'matiere': "EPS", 'evaluee': False, 'moyenne': None}],
+        'moyenne': 12.5,
+        'rang': "3e/30",
+    }
+
+def test_archive_et_avancement(tmp_path):
+    liste = [donnees(i) for i in range(5)]
+    avancement = []
+    destination = bulletins.generer_bulletins_zip(liste, str(tmp_path / "bulletins.zip"),
+                                                  lambda fait, total: avancement.append((fait, total)),
+                                                  max_workers=2)
+    assert avancement == [(fait, 5) for fait in range(1, 6)]
+    with zipfile.ZipFile(destination) as archive:
+        assert sorted(archive.namelist()) == sorted(bulletins.nom_fichier_bulletin(d) for d in liste)
+        assert all(archive.read(nom).startswith(b"%PDF") for nom in archive.namelist())
@@ -0,0 +1,139 @@
+import random
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+import Code
+
+# Classements et statistiques comparés à un recalcul complet depuis les notes,
+# après des ajouts, modifications et suppressions aléatoires
+
+def moyenne(notes):
+    return Code.calcul_moyenne(sum(n.note * n.coefficient for n in notes), sum(n.coefficient for n in notes))
+
+def modifier_au_hasard(system, graine, nb=150):
+    rnd = random.Random(graine)
+    eleves = list(system.eleves)
+    for i in range(nb):
+        eleve = rnd.choice(eleves)
+        matiere = rnd.choice(system.get_matieres_by_classe(eleve.classe))
+        system.add_note(eleve.id, matiere, float(rnd.randint(0, 40)) / 2, rnd.choice([1, 2, 3]), "Devoir",
+                        rnd.choice(["2023-10-02", "2024-02-12", "2024-05-20"]), "Test")
+        notes = system.get_notes_by_eleve(rnd.choice(eleves).id)
+        if notes and i % 5 == 0:
+            system.update_note(rnd.choice(notes).id, note=float(rnd.randint(0, 20)), date="2023-12-01")
+        elif notes and i % 7 == 0:
+            system.delete_note(rnd.choice(notes).id)
+
+@pytest.fixture(params=["memoire", "sans_colonnes", "sqlite"])
+def system(request, parametres, tmp_path):
+    if request.param == "sqlite":
+        system = Code.SchoolManagementSystem(store=Code.SQLiteStore(str(tmp_path / "ecole.db")),
+                                             parametres=parametres)
+    else:
+        system = Code.SchoolManagementSystem(colonnes=request.param == "memoire", parametres=parametres)
+    # Vues construites avant les écritures : elles doivent suivre
+    for classe in system.get_classes():
+        system.get_statistiques_classe(classe)
+    modifier_au_hasard(system, graine=3)
+    return system
+
+def test_moyennes_et_rangs(system):
+    moyennes = {e.id: moyenne(system.get_notes_by_eleve(e.id)) for e in system.eleves
+                if system.get_notes_by_eleve(e.id)}
+    for eleve in system.eleves:
+        notes = system.get_notes_by_eleve(eleve.id)
+        for matiere in system.get_matieres_by_classe(eleve.classe):
+            notes_matiere = [n for n in notes if n.matiere == matiere]
+            assert system.get_moyenne_by_matiere(eleve.id, matiere) == pytest.approx(
+                moyenne(notes_matiere) if notes_matiere else 0, abs=0.011)
+        rang, ex_aequo, effectif = system.get_rang_by_eleve(eleve.id)
+        assert effectif == len(system.get_eleves_by_classe(eleve.classe))
+        if eleve.id not in moyennes:
+            assert rang is None
+            continue
+        assert system.get_moyenne_by_eleve(eleve.id) == pytest.approx(moyennes[eleve.id], abs=0.011)
+        mienne = system.get_moyenne_by_eleve(eleve.id)
+        attendu = 1 + sum(system.get_moyenne_by_eleve(e.id) > mienne
+                          for e in system.get_eleves_by_classe(eleve.classe) if e.id in moyennes)
+        assert rang == attendu
+        assert ex_aequo == (sum(system.get_moyenne_by_eleve(e.id) == mienne
+                                for e in system.get_eleves_by_classe(eleve.classe) if e.id in moyennes) > 1)
+
+def test_statistiques_globales(system):
+    statistiques = system.get_statistiques()
+    df_eleves = statistiques['eleves'].set_index('eleve_id')
+    par_classe_matiere = defaultdict(list)
+    for eleve in system.eleves:
+        notes = system.get_notes_by_eleve(eleve.id)
+        assert df_eleves.loc[eleve.id, 'moyenne'] == pytest.approx(moyenne(notes) if notes else 0, abs=0.011)
+        for n in notes:
+            par_classe_matiere[(eleve.classe, n.matiere)].append(n)
+    df_matieres = statistiques['matieres'].set_index(['classe', 'matiere'])['moyenne']
+    assert len(df_matieres) == len(par_classe_matiere)
+    for cle, notes in par_classe_matiere.items():
+        assert df_matieres[cle] == pytest.approx(moyenne(notes), abs=0.011)
+
+def test_cube_statistiques(system):
+    for classe in system.get_classes():
+        eleves = system.get_eleves_by_classe(classe)
+        trimestres = [None] + system.get_trimestres_classe(classe)
+        matieres = [None] + system.get_matieres_by_classe(classe)
+        for trimestre in trimestres:
+            resumes = system.get_statistiques_classe(classe, matieres, trimestre)
+            for matiere in matieres:
+                valeurs = []
+                for eleve in eleves:
+                    notes = [n for n in system.get_notes_by_eleve(eleve.id)
+                             if matiere in (None, n.matiere)
+                             and trimestre in (None, Code.trimestre_de(Code.mois_de(n.date)))]
+                    if notes:
+                        valeurs.append(moyenne(notes))
+                resume = resumes[matiere]
+                if not valeurs:
+                    assert resume is None
+                    continue
+                valeurs = np.array(valeurs)
+                assert resume['effectif'] == len(valeurs)
+                for cle, attendu in (('moyenne', valeurs.mean()), ('min', valeurs.min()),
+                                     ('max', valeurs.max()), ('ecart_type', valeurs.std()),
+                                     ('q1', np.quantile(valeurs, 0.25)), ('mediane', np.median(valeurs)),
+                                     ('q3', np.quantile(valeurs, 0.75))):
+                    assert resume[cle] == pytest.approx(attendu, abs=0.011), cle
+                histogramme, _ = np.histogram(valeurs, bins=Code.NB_CLASSES_HISTOGRAMME, range=(0, 20))
+                assert [nombre for _, _, nombre in resume['histogramme']] == histogramme.tolist()
+
+def test_bulletin_trimestriel(system):
+    trimestre = Code.trimestres_annee("2023-2024")[1]
+    classe = system.get_classes()[0]
+    eleves = system.get_eleves_by_classe(classe)
+    du_trimestre = {e.id: [n for n in system.get_notes_by_eleve(e.id)
+                           if Code.trimestre_de(Code.mois_de(n.date)) == trimestre] for e in eleves}
+    generales = {eleve_id: moyenne(notes) for eleve_id, notes in du_trimestre.items() if notes}
+    for eleve in eleves:
+        donnees = system.get_donnees_bulletin(eleve.id, trimestre)
+        assert donnees['periode'] == "2e trimestre 2023-2024"
+        for ligne in donnees['matieres']:
+            notes = [n for n in du_trimestre[eleve.id] if n.matiere == ligne['matiere']]
+            assert ligne['evaluee'] == bool(notes)
+            assert ligne['moyenne'] == pytest.approx(moyenne(notes) if notes else 0, abs=0.011)
+        if eleve.id not in generales:
+            assert donnees['rang'] == f"-/{len(eleves)}"
+            continue
+        assert donnees['moyenne'] == pytest.approx(generales[eleve.id], abs=0.011)
+        autres = [system.get_donnees_bulletin(e, trimestre)['moyenne'] for e in generales]
+        rang = 1 + sum(m > donnees['moyenne'] for m in autres)
+        ex_aequo = autres.count(donnees['moyenne']) > 1
+        assert donnees['rang'] == Code.format_rang(rang, ex_aequo, len(eleves))
+    annuel = system.get_donnees_bulletin(eleves[0].id)
+    assert annuel['periode'] == "Année scolaire 2023-2024"
+    assert annuel['moyenne'] == system.get_moyenne_by_eleve(eleves[0].id)
+
+def test_notes_dans_l_ordre_d_insertion(system):
+    # Même ordre (celui des identifiants) quel que soit le stockage
+    for eleve in system.eleves:
+        notes = system.get_notes_by_eleve(eleve.id)
+        assert [n.id for n in notes] == sorted(n.id for n in notes)
+        for matiere in system.get_matieres_by_classe(eleve.classe):
+            assert system.get_notes_by_matiere(eleve.id, matiere) == [n for n in notes if n.matiere == matiere]
@@ -0,0 +1,93 @@
+from functools import partial
+from io import BytesIO
+
+import pytest
+
+import Code
+
+def fichier_csv(*lignes):
+    return BytesIO("\n".join(lignes).encode("utf-8"))
+
+@pytest.fixture
+def system(parametres):
+    system = Code.SchoolManagementSystem(parametres=parametres)
+    system.notifications = Code.ServiceNotifications(Code.BoiteEnvoi(), {'email': Code.TransportJournal('email')})
+    return system
+
+def test_import_notes_valides_et_rejetees(system):
+    eleve = system.eleves[0]
+    matiere = system.get_matieres_by_classe(eleve.classe)[0]
+    avant = system.count_notes()
+    bilan = Code.importer_fichier(system, fichier_csv(
+        "eleve_id;matiere;note;coefficient;type_note;date;enseignant",
+        f"{eleve.id};{matiere};12,5;2;Devoir;2024-03-01;Prof. Yao",
+        f"{eleve.id};{matiere};abc;1;Devoir;2024-03-01;Prof. Yao",
+        f"{eleve.id};{matiere};14;x;Devoir;2024-03-01;Prof. Yao",
+        f"{eleve.id};{matiere};;1;Devoir;2024-03-01;Prof. Yao",
+        f"999999;{matiere};10;1;Devoir;2024-03-01;Prof. Yao",
+        f"{eleve.id};{matiere};25;1;Devoir;2024-03-01;Prof. Yao",
+        f"{eleve.id};{matiere};10;1;Devoir;2024-13-01;Prof. Yao",
+        f"{eleve.id};{matiere};10;;;;",
+    ), "notes.csv", 'notes')
+    assert (bilan['lignes'], bilan['importees'], bilan['nb_erreurs']) == (8, 2, 6)
+    assert system.count_notes() == avant + 2
+    assert [e['Ligne'] for e in bilan['erreurs']] == [3, 4, 5, 6, 7, 8]
+    erreurs = [e['Erreur'] for e in bilan['erreurs']]
+    assert erreurs[0] == "colonne 'note' : 'abc' n'est pas un nombre"
+    assert erreurs[1] == "colonne 'coefficient' : 'x' n'est pas un nombre"
+    assert erreurs[2] == "colonne 'note' vide"
+    assert erreurs[3] == "élève 999999 inconnu"
+    assert "hors de l'intervalle" in erreurs[4]
+    assert "invalide" in erreurs[5]
+    importee = system.get_notes_by_eleve(eleve.id)[-1]
+    assert (importee.note, importee.coefficient, importee.type_note) == (10.0, 1, 'Devoir')
+
+def test_import_en_tete_incomplet(system):
+    avant = system.count_notes()
+    with pytest.raises(ValueError, match="colonne\\(s\\) manquante\\(s\\) : eleve_id, note"):
+        Code.importer_fichier(system, fichier_csv("id,matiere,valeur", "1,Français,12"), "notes.csv", 'notes')
+    assert system.count_notes() == avant
+
+def test_import_eleves(system):
+    avant = system.count_eleves()
+    bilan = Code.importer_fichier(system, fichier_csv(
+        "nom,prenom,classe,date_naissance,parent_id",
+        "Koné,Awa,6ème A,2012-05-04,parent1",
+        ",Yves,6ème A,,parent1",
+        "Touré,Sékou,6ème A,04/05/2012,parent1",
+    ), "eleves.csv", 'eleves')
+    assert (bilan['importees'], bilan['nb_erreurs']) == (1, 2)
+    assert [e['Erreur'] for e in bilan['erreurs']][0] == "colonne 'nom' vide"
+    assert system.count_eleves() == avant + 1
+
+def test_import_excel(system, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    eleve = system.eleves[0]
+    classeur = openpyxl.Workbook()
+    classeur.active.append(["eleve_id", "matiere", "note"])
+    classeur.active.append([eleve.id, system.get_matieres_by_classe(eleve.classe)[0], 15])
+    classeur.active.append([eleve.id, system.get_matieres_by_classe(eleve.classe)[0], "quinze"])
+    chemin = tmp_path / "notes.xlsx"
+    classeur.save(chemin)
+    with open(chemin, "rb") as fichier:
+        bilan = Code.importer_fichier(system, fichier, "notes.xlsx", 'notes')
+    assert (bilan['importees'], bilan['nb_erreurs']) == (1, 1)
+    assert bilan['erreurs'][0]['Erreur'] == "colonne 'note' : 'quinze' n'est pas un nombre"
+
+def test_import_un_resume_par_parent(system, monkeypatch):
+    # Plusieurs blocs, donc plusieurs écritures, pour un seul message par parent
+    monkeypatch.setattr(Code, "lire_par_blocs", partial(Code.lire_par_blocs, taille=2))
+    enfants = system.add_eleves([{'nom': 'Koné', 'prenom': prenom, 'classe': system.eleves[0].classe,
+                                  'date_naissance': '2012-01-01', 'parent_id': 'parent1'}
+                                 for prenom in ('Awa', 'Yves')])
+    matiere = system.get_matieres_by_classe(enfants[0].classe)[0]
+    lignes = [f"{enfant.id};{matiere};{note}" for enfant in enfants for note in (10, 12, 14)]
+    blocs = []
+    bilan = Code.importer_fichier(system, fichier_csv("eleve_id;matiere;note", *lignes), "notes.csv", 'notes',
+                                  progression=blocs.append)
+    assert bilan['importees'] == 6 and len(blocs) == 3
+    notifications = system.notifications.boite.reserver(100)
+    assert len(notifications) == 1
+    assert notifications[0].destinataire == system.users['parent1'].email
+    assert "Awa : 3 nouvelle(s) note(s)" in notifications[0].message
+    assert "Yves : 3 nouvelle(s) note(s)" in notifications[0].message
@@ -0,0 +1,86 @@
+import os
+import random
+
+import pytest
+
+import Code
+
+def demarrer(dossier, parametres):
+    return Code.SchoolManagementSystem(parametres=parametres, journal=Code.Journal(str(dossier), fsync=False))
+
+def etat(system):
+    return dict(
+        users={nom: Code.enregistrement(u) for nom, u in system.users.items()},
+        eleves=[Code.enregistrement(e) for e in system.eleves],
+        notes=sorted(Code.enregistrement(n) for e in system.eleves for n in system.get_notes_by_eleve(e.id)),
+        rangs=[system.get_rang_by_eleve(e.id) for e in system.eleves],
+        activites=[Code.enregistrement(a) for a in system.activites],
+        prochain_id_note=system._prochain_id_note)
+
+def modifier(system, rng, nombre):
+    for i in range(nombre):
+        eleve = rng.choice(system.eleves)
+        notes = system.get_notes_by_eleve(eleve.id)
+        tirage = rng.random()
+        if tirage < 0.5 or not notes:
+            system.add_notes([dict(eleve_id=eleve.id, matiere=rng.choice(system.get_matieres_by_classe(eleve.classe)),
+                                   note=rng.randint(0, 40) / 2, coefficient=rng.randint(1, 4), type_note='Devoir',
+                                   date=f"2024-04-{rng.randint(1, 28):02d}", enseignant='Prof. Yao')],
+                             notifier=False)
+        elif tirage < 0.7:
+            system.update_note(rng.choice(notes).id, note=rng.randint(0, 40) / 2)
+        elif tirage < 0.85:
+            system.delete_note(rng.choice(notes).id)
+        else:
+            system.add_eleve("Koné", f"Awa{i}", eleve.classe, "2010-01-01", "parent1")
+
+def segments(dossier):
+    return sorted(nom for nom in os.listdir(dossier) if nom.startswith("journal-"))
+
+def test_redemarrage_depuis_instantane_et_journal(tmp_path, parametres, monkeypatch):
+    monkeypatch.setattr(Code, "OPERATIONS_PAR_INSTANTANE", 40)
+    system = demarrer(tmp_path, parametres)
+    modifier(system, random.Random(1), 150)
+    system.journal.fermer()
+    attendu = etat(system)
+    # Des instantanés ont été écrits en route, suivis d'opérations à rejouer
+    assert [nom for nom in os.listdir(tmp_path) if nom.startswith("instantane-")]
+    system = demarrer(tmp_path, parametres)
+    assert system.journal.depuis_instantane > 0
+    assert etat(system) == attendu
+
+@pytest.mark.parametrize("position", ["fin_de_segment", "debut_de_segment"])
+def test_ligne_tronquee_puis_nouvelles_ecritures(tmp_path, parametres, position):
+    rng = random.Random(2)
+    system = demarrer(tmp_path, parametres)
+    if position == "fin_de_segment":
+        modifier(system, rng, 20)
+    system.journal.fermer()
+    attendu = etat(system)
+    # Arrêt brutal pendant l'écriture d'une opération, en tête du segment
+    # ouvert au démarrage ou après ses premières lignes
+    with open(os.path.join(tmp_path, segments(tmp_path)[-1]), "ab") as f:
+        f.write(b'{"n": 99999, "op": "notes", "d": [{"id"')
+
+    system = demarrer(tmp_path, parametres)
+    assert etat(system) == attendu
+    modifier(system, rng, 20)
+    system.journal.fermer()
+    attendu = etat(system)
+
+    system = demarrer(tmp_path, parametres)
+    assert etat(system) == attendu
+    modifier(system, rng, 5)
+    system.journal.fermer()
+    assert etat(demarrer(tmp_path, parametres)) == etat(system)
+
+def test_ligne_complete_sans_fin_de_ligne_ignoree(tmp_path, parametres):
+    system = demarrer(tmp_path, parametres)
+    system.journal.fermer()
+    attendu = etat(system)
+    chemin = os.path.join(tmp_path, segments(tmp_path)[-1])
+    with open(chemin, "ab") as f:
+        f.write(b'{"n": %d, "op": "note_supprimee", "d": 1}' % (system.journal.sequence + 1))
+    system = demarrer(tmp_path, parametres)
+    assert etat(system) == attendu
+    assert os.path.getsize(chemin) == 0
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+import Code
+
+PARENT = Code.User("parent1", "", "parent", "Kouamé", "Aminata", "parent1@example.ci", "07 12 34 56 78")
+
+def expedier_echues(service):
+    # Un passage du worker, sans son thread : envoi des messages échus
+    lot = service.boite.reserver(service.taille_lot)
+    canaux = {n.canal for n in lot}
+    for canal in canaux:
+        asyncio.run(service._expedier(canal, [n for n in lot if n.canal == canal]))
+    return len(lot)
+
+@pytest.fixture
+def transport():
+    return Code.TransportJournal('email', taux_echec=1.0, seed=1)
+
+@pytest.fixture
+def service(transport):
+    return Code.ServiceNotifications(Code.BoiteEnvoi(), {'email': transport})
+
+def test_pas_de_sms_sans_passerelle():
+    transports = Code.transports_depuis_environnement()
+    assert set(transports) == {'email'}
+    service = Code.ServiceNotifications(Code.BoiteEnvoi(), transports)
+    assert service.notifier([('notes', PARENT, "Sujet", "Texte")]) == 1
+    assert list(service.boite.derniers()['canal']) == ['email']
+
+def test_canal_sans_transport_jamais_marque_envoye(service, horloge):
+    service.canaux_actifs = {'email', 'sms'}
+    service.transports['email'].taux_echec = 0.0
+    assert service.notifier([('notes', PARENT, "Sujet", "Texte")]) == 2
+    assert expedier_echues(service) == 2
+    assert service.boite.compter() == {'en_attente': 1, 'envoyee': 1}
+    erreur, = service.boite.derniers().query("canal == 'sms'")['erreur']
+    assert erreur == "Aucun transport pour le canal sms"
+
+def test_relances_espacees_puis_abandon(service, horloge):
+    service.notifier([('notes', PARENT, "Sujet", "Texte")])
+    for tentative in range(Code.MAX_TENTATIVES_NOTIFICATION):
+        assert expedier_echues(service) == 1
+        if tentative + 1 < Code.MAX_TENTATIVES_NOTIFICATION:
+            delai = Code.DELAI_RELANCE_S * 2 ** tentative
+            assert service.boite.prochaine_echeance() == horloge.maintenant + delai
+            # Rien à renvoyer avant l'échéance
+            horloge.maintenant += delai - 1
+            assert expedier_echues(service) == 0
+            horloge.maintenant += 1
+    assert service.boite.compter() == {'echec': 1}
+    assert service.boite.prochaine_echeance() is None
+    assert list(service.boite.derniers()['tentatives']) == [Code.MAX_TENTATIVES_NOTIFICATION]
+
+    assert service.boite.relancer_echecs() == 1
+    service.transports['email'].taux_echec = 0.0
+    assert expedier_echues(service) == 1
+    assert service.boite.compter() == {'envoyee': 1}
+    assert [n.destinataire for n in service.transports['email'].envoyes] == ["parent1@example.ci"]
+
+def test_envoi_apres_une_panne(service, transport, horloge):
+    service.notifier([('notes', PARENT, "Sujet", "Texte")])
+    expedier_echues(service)
+    transport.taux_echec = 0.0
+    horloge.maintenant += Code.DELAI_RELANCE_S
+    assert expedier_echues(service) == 1
+    ligne = service.boite.derniers().iloc[0]
+    assert (ligne['statut'], ligne['tentatives'], ligne['erreur']) == ('envoyee', 2, None)
+
+def test_boite_persistante_reprend_les_envois_interrompus(tmp_path):
+    chemin = str(tmp_path / "notifications.db")
+    boite = Code.BoiteEnvoi(chemin)
+    boite.deposer([('notes', 'email', "a@example.ci", "Sujet", "Texte"),
+                   ('notes', 'email', "b@example.ci", "Sujet", "Texte")])
+    premier, = boite.reserver(1)
+    # Arrêt pendant l'envoi du premier message : il repart au redémarrage
+    boite = Code.BoiteEnvoi(chemin)
+    assert boite.compter() == {'en_attente': 2}
+    assert [n.id for n in boite.reserver(10)] == [premier.id, premier.id + 1]
@@ -0,0 +1,102 @@
+import random
+import sys
+import threading
+
+import pytest
+
+import Code
+
+@pytest.fixture
+def system(parametres):
+    return Code.SchoolManagementSystem(parametres=parametres)
+
+@pytest.fixture
+def bascules_rapides():
+    # Changements de thread fréquents pour provoquer les entrelacements
+    intervalle = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalle)
+
+def test_pages_coherentes_pendant_les_modifications(system, bascules_rapides):
+    eleves = list(system.eleves)
+    notes = [n for e in eleves for n in system.get_notes_by_eleve(e.id)]
+    arret = threading.Event()
+
+    def modifier():
+        rng = random.Random(3)
+        while not arret.is_set():
+            system.update_note(rng.choice(notes).id, note=rng.randint(0, 40) / 2)
+
+    ecrivain = threading.Thread(target=modifier)
+    ecrivain.start()
+    try:
+        for i in range(3000):
+            page = system.get_page_eleves(0, taille=len(eleves), tri='moyenne', inverse=i % 2 == 1)
+            assert sorted(e.id for e in page) == sorted(e.id for e in eleves)
+            eleve = eleves[i % len(eleves)]
+            rang, _, effectif = system.get_rang_by_eleve(eleve.id)
+            assert 1 <= rang <= effectif
+    finally:
+        arret.set()
+        ecrivain.join()
+
+@pytest.fixture(scope="module")
+def system_avec_sans_notes(parametres):
+    # Partagé par les tests du module, qui ne font que lire
+    system = Code.SchoolManagementSystem(parametres=parametres)
+    classe = system.get_classes()[0]
+    for i in range(3):
+        system.add_eleve("Touré", f"Sans note {i}", classe, "2010-01-01", "parent1")
+    return system
+
+def parcourir(system, taille, **options):
+    eleves, page = [], 0
+    while True:
+        tranche = system.get_page_eleves(page, taille, **options)
+        assert len(tranche) <= taille
+        if not tranche:
+            return eleves
+        eleves.extend(tranche)
+        page += 1
+
+@pytest.mark.parametrize("tri", ['nom', 'classe', 'moyenne'])
+@pytest.mark.parametrize("inverse", [False, True])
+@pytest.mark.parametrize("taille", [1, 7, 50, 1000])
+def test_toutes_les_pages_couvrent_chaque_eleve_une_fois(system_avec_sans_notes, tri, inverse, taille):
+    system = system_avec_sans_notes
+    ids = [e.id for e in parcourir(system, taille, tri=tri, inverse=inverse)]
+    assert sorted(ids) == sorted(e.id for e in system.eleves)
+
+@pytest.mark.parametrize("inverse", [False, True])
+def test_ordre_des_pages(system_avec_sans_notes, inverse):
+    system = system_avec_sans_notes
+    cles = {
+        'nom': lambda e: (Code.normaliser_texte(e.nom), Code.normaliser_texte(e.prenom), e.id),
+        'classe': lambda e: (e.classe, Code.normaliser_texte(e.nom), Code.normaliser_texte(e.prenom), e.id),
+    }
+    for tri, cle in cles.items():
+        attendu = sorted(system.eleves, key=cle, reverse=inverse)
+        assert parcourir(system, 7, tri=tri, inverse=inverse) == attendu
+    eleves = parcourir(system, 7, tri='moyenne', inverse=inverse)
+    notes = [e for e in eleves if system.get_notes_by_eleve(e.id)]
+    # Les élèves sans note restent à la fin, dans les deux sens
+    assert eleves[:len(notes)] == notes
+    assert {e.prenom for e in eleves[len(notes):]} == {f"Sans note {i}" for i in range(3)}
+    moyennes = [system.get_moyenne_by_eleve(e.id) for e in notes]
+    assert moyennes == sorted(moyennes, reverse=not inverse)
+
+@pytest.mark.parametrize("tri", ['nom', 'classe', 'moyenne'])
+@pytest.mark.parametrize("inverse", [False, True])
+def test_filtre_par_classe(system_avec_sans_notes, tri, inverse):
+    system = system_avec_sans_notes
+    classes = system.get_classes()[:2]
+    filtres = parcourir(system, 7, tri=tri, inverse=inverse, classes=classes)
+    tous = parcourir(system, 7, tri=tri, inverse=inverse)
+    # Même ordre que sans filtre, restreint aux classes choisies
+    assert filtres == [e for e in tous if e.classe in classes]
+    assert len(filtres) == sum(len(system.get_eleves_by_classe(c)) for c in classes)
+
+def test_tri_inconnu(system):
+    with pytest.raises(ValueError, match="Tri inconnu"):
+        system.get_page_eleves(0, tri='age')
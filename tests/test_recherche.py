@@ -0,0 +1,90 @@
+import pytest
+
+import Code
+
+ELEVES = [
+    Code.Eleve(1, "Kouamé", "Aminata", "6ème A", "2012-01-01", "parent1"),
+    Code.Eleve(2, "Kouassi", "Éric", "5ème B", "2013-02-02", "parent1"),
+    Code.Eleve(3, "N'Guessan", "Affoué", "Terminale D", "2006-03-03", "parent1"),
+    Code.Eleve(4, "Koné", "Awa", "6ème A", "2012-04-04", "parent1"),
+    Code.Eleve(5, "Traoré", "Sékou", "4ème C", "2010-05-05", "parent1"),
+    Code.Eleve(6, "Adjoua", "Konéba", "5ème B", "2013-06-06", "parent1"),
+]
+
+@pytest.fixture
+def index():
+    index = Code.IndexRecherche()
+    index.ajouter(ELEVES)
+    return index
+
+@pytest.mark.parametrize("requetes, attendu", [
+    (["kouame", "Kouamé", "KOUAMÉ", "kOuAmE"], [1]),
+    (["eric", "Éric", "ÉRIC"], [2]),
+    (["affoue", "Affoué"], [3]),
+    (["sekou", "Sékou", "SEKOU"], [5]),
+])
+def test_accents_et_casse_ignores(index, requetes, attendu):
+    for requete in requetes:
+        assert index.rechercher(requete) == attendu
+
+def test_prefixes_tries_par_nom(index):
+    # Préfixes par nom, puis le fragment « kou » de Sékou
+    assert index.rechercher("kou") == [1, 2, 5]
+    assert index.rechercher("tra") == [5]
+    assert index.rechercher("zz") == []
+
+def test_mot_exact_avant_prefixe(index):
+    # « Adjoua Konéba » précède « Koné » par le nom, mais « kone » est exact pour Koné
+    assert index.rechercher("kone") == [4, 6]
+
+def test_fragments_par_trigrammes(index):
+    assert index.rechercher("ouam") == [1]
+    assert index.rechercher("guess") == [3]
+    assert index.rechercher("ssan") == [3]
+    # Moins de trois lettres : préfixe seulement
+    assert index.rechercher("am") == [1]
+    assert index.rechercher("ua") == []
+
+def test_nom_compose(index):
+    assert index.rechercher("nguessan") == [3]
+    assert index.rechercher("N'Guessan") == [3]
+
+def test_plusieurs_mots(index):
+    assert index.rechercher("kou ami") == [1]
+    assert index.rechercher("6ème koné") == [4]
+    # « a » est exact (lettre de la classe) pour les deux : ordre des noms
+    assert index.rechercher("6eme a") == [4, 1]
+    assert index.rechercher("kouame eric") == []
+
+def test_identifiant_exact(index):
+    assert index.rechercher("3") == [3]
+    assert index.rechercher("42") == []
+
+def test_limite_et_filtre(index):
+    assert index.rechercher("a", limite=2) == [4, 1]
+    assert index.rechercher("kou", accepter=lambda eleve_id: eleve_id != 1) == [2, 5]
+
+def test_eleve_ajoute_trouve(index):
+    assert index.rechercher("kou") == [1, 2, 5]
+    index.ajouter([Code.Eleve(7, "Kouadio", "Jérôme", "3ème A", "2011-07-07", "parent1")])
+    assert len(index) == 7
+    assert index.rechercher("kou") == [7, 1, 2, 5]
+    assert index.rechercher("jerome") == [7]
+    # Nouveau mot : ses trigrammes sont indexés aussi
+    assert index.rechercher("adio") == [7]
+    assert index.rechercher("3eme") == [7]
+    index.ajouter([Code.Eleve(8, "Kouadio", "Awa", "6ème A", "2012-08-08", "parent1")])
+    assert index.rechercher("kouadio") == [8, 7]
+    assert index.rechercher("awa 6eme") == [4, 8]
+
+def test_recherche_du_systeme(parametres):
+    system = Code.SchoolManagementSystem(parametres=parametres)
+    classe = system.get_classes()[0]
+    eleve = system.add_eleve("Zéphirin", "Ahou", classe, "2010-01-01", "parent1")
+    assert [e.id for e in system.rechercher_eleves("zephirin")] == [eleve.id]
+    assert [e.id for e in system.rechercher_eleves("ZÉPHI", classes=[classe])] == [eleve.id]
+    autre = next(c for c in system.get_classes() if c != classe)
+    assert system.rechercher_eleves("zephirin", classes=[autre]) == []
+    # Tous les résultats contiennent bien le terme, sans accents
+    for e in system.rechercher_eleves("kou", limite=200):
+        assert any("kou" in Code.normaliser_texte(champ) for champ in (e.nom, e.prenom))